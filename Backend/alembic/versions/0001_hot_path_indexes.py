@@ -0,0 +1,62 @@
+"""Composite indexes for the activity, screenshot, productivity, attendance and leave hot paths
+
+Revision ID: 0001_hot_path_indexes
+Revises:
+Create Date: 2026-10-18
+
+Existing databases were created with Base.metadata.create_all(), so this
+first revision only adds indexes and uses IF NOT EXISTS to stay safe on
+databases that already picked them up from the models. On PostgreSQL the
+indexes are built CONCURRENTLY so ingestion is not blocked.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_hot_path_indexes"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns) — must match __table_args__ on the models
+INDEXES = [
+    ("ix_activities_employee_id_timestamp", "activities", ["employee_id", "timestamp"]),
+    ("ix_activities_team_id_timestamp", "activities", ["team_id", "timestamp"]),
+    ("ix_activities_department_id_timestamp", "activities", ["department_id", "timestamp"]),
+    ("ix_screenshots_employee_id_timestamp", "screenshots", ["employee_id", "timestamp"]),
+    ("ix_screenshots_department_id_timestamp", "screenshots", ["department_id", "timestamp"]),
+    ("ix_productivity_employee_id_date", "productivity", ["employee_id", "date"]),
+    ("ix_productivity_team_id_date", "productivity", ["team_id", "date"]),
+    ("ix_productivity_department_id_date", "productivity", ["department_id", "date"]),
+    ("ix_attendance_employee_id_date", "attendance", ["employee_id", "date"]),
+    ("ix_leaves_employee_id_start_date_end_date", "leaves", ["employee_id", "start_date", "end_date"]),
+]
+
+
+def upgrade() -> None:
+    concurrently = op.get_bind().dialect.name == "postgresql"
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                if_not_exists=True,
+                postgresql_concurrently=concurrently,
+            )
+
+
+def downgrade() -> None:
+    concurrently = op.get_bind().dialect.name == "postgresql"
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                if_exists=True,
+                postgresql_concurrently=concurrently,
+            )
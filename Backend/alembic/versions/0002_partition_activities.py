@@ -0,0 +1,122 @@
+"""Range-partition activities by month (PostgreSQL)
+
+Revision ID: 0002_partition_activities
+Revises: 0001_hot_path_indexes
+Create Date: 2026-10-18
+
+Rebuilds `activities` as a table partitioned by RANGE (timestamp) with one
+partition per month that holds data, the next few months, and a default
+partition. Partitioned tables need the partition key in the primary key,
+so the PK becomes (id, timestamp); `id` stays unique through its sequence.
+
+Other dialects keep the plain table (see activity_partition_service for
+the retention fallback), so this revision is a no-op there.
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_partition_activities"
+down_revision: Union[str, None] = "0001_hot_path_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 2
+
+INDEXES = [
+    ("ix_activities_id", ["id"]),
+    ("ix_activities_employee_id_timestamp", ["employee_id", "timestamp"]),
+    ("ix_activities_team_id_timestamp", ["team_id", "timestamp"]),
+    ("ix_activities_department_id_timestamp", ["department_id", "timestamp"]),
+]
+
+FOREIGN_KEYS = [
+    ("activities_employee_id_fkey", "employee_id", "employee", "CASCADE"),
+    ("activities_department_id_fkey", "department_id", "departments", "SET NULL"),
+    ("activities_team_id_fkey", "team_id", "teams", "SET NULL"),
+]
+
+
+def _add_months(value: date, months: int) -> date:
+    index = value.year * 12 + (value.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_indexes_and_fks() -> None:
+    for name, columns in INDEXES:
+        op.execute(f"CREATE INDEX {name} ON activities ({', '.join(columns)})")
+    for name, column, target, ondelete in FOREIGN_KEYS:
+        op.execute(
+            f"ALTER TABLE activities ADD CONSTRAINT {name} "
+            f"FOREIGN KEY ({column}) REFERENCES {target} (id) ON DELETE {ondelete}"
+        )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.execute("UPDATE activities SET timestamp = COALESCE(created_at, now()) WHERE timestamp IS NULL")
+
+    # Keep the id sequence alive when the old table is dropped
+    op.execute("ALTER SEQUENCE activities_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE activities RENAME TO activities_unpartitioned")
+    op.execute("ALTER INDEX activities_pkey RENAME TO activities_unpartitioned_pkey")
+    for name, _ in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+
+    op.execute(
+        "CREATE TABLE activities "
+        "(LIKE activities_unpartitioned INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (timestamp)"
+    )
+    op.execute("ALTER TABLE activities ALTER COLUMN timestamp SET NOT NULL")
+    op.execute("ALTER TABLE activities ADD PRIMARY KEY (id, timestamp)")
+
+    oldest = bind.execute(sa.text("SELECT MIN(timestamp) FROM activities_unpartitioned")).scalar()
+    current = date.today().replace(day=1)
+    month = (oldest.date() if oldest else current).replace(day=1)
+    last = _add_months(current, MONTHS_AHEAD)
+    while month <= last:
+        upper = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE activities_y{month.year:04d}m{month.month:02d} "
+            f"PARTITION OF activities FOR VALUES FROM ('{month}') TO ('{upper}')"
+        )
+        month = upper
+    op.execute("CREATE TABLE activities_default PARTITION OF activities DEFAULT")
+
+    op.execute("INSERT INTO activities SELECT * FROM activities_unpartitioned")
+    op.execute("DROP TABLE activities_unpartitioned")
+    op.execute("ALTER SEQUENCE activities_id_seq OWNED BY activities.id")
+
+    _create_indexes_and_fks()
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.execute("ALTER SEQUENCE activities_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE activities RENAME TO activities_partitioned")
+    op.execute("ALTER INDEX activities_pkey RENAME TO activities_partitioned_pkey")
+    for name, _ in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+
+    op.execute(
+        "CREATE TABLE activities "
+        "(LIKE activities_partitioned INCLUDING DEFAULTS)"
+    )
+    op.execute("ALTER TABLE activities ADD PRIMARY KEY (id)")
+    op.execute("INSERT INTO activities SELECT * FROM activities_partitioned")
+    # Drops the parent together with every attached partition
+    op.execute("DROP TABLE activities_partitioned CASCADE")
+    op.execute("ALTER SEQUENCE activities_id_seq OWNED BY activities.id")
+
+    _create_indexes_and_fks()
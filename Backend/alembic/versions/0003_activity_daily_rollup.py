@@ -0,0 +1,44 @@
+"""Add activity_daily_rollup
+
+Revision ID: 0003_activity_daily_rollup
+Revises: 0002_partition_activities
+Create Date: 2026-10-18
+
+The table starts empty; 0007 backfills it from existing activities.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_activity_daily_rollup"
+down_revision: Union[str, None] = "0002_partition_activities"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "activity_daily_rollup",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("employee_id", sa.Integer(), sa.ForeignKey("employee.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("department_id", sa.Integer(), sa.ForeignKey("departments.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("team_id", sa.Integer(), sa.ForeignKey("teams.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("activity_type", sa.String(255), nullable=False),
+        sa.Column("productive", sa.String(50), nullable=False),
+        sa.Column("activity_count", sa.Integer(), nullable=False),
+        sa.Column("duration_seconds", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint("employee_id", "day", "activity_type", "productive", name="uq_activity_daily_rollup_key"),
+        if_not_exists=True,
+    )
+    op.create_index("ix_activity_daily_rollup_id", "activity_daily_rollup", ["id"], if_not_exists=True)
+    op.create_index("ix_activity_daily_rollup_team_id_day", "activity_daily_rollup", ["team_id", "day"], if_not_exists=True)
+    op.create_index("ix_activity_daily_rollup_department_id_day", "activity_daily_rollup", ["department_id", "day"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_table("activity_daily_rollup")
@@ -0,0 +1,28 @@
+"""Store the app/website name on activities
+
+Revision ID: 0004_activity_name
+Revises: 0003_activity_daily_rollup
+Create Date: 2026-10-18
+
+Needed for server-side classification against productive_entities.
+On a partitioned table the column is added to every partition.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_activity_name"
+down_revision: Union[str, None] = "0003_activity_daily_rollup"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("activities", sa.Column("name", sa.String(255), nullable=True), if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_column("activities", "name")
@@ -0,0 +1,42 @@
+"""Index alerts by (employee_id, occurred_at)
+
+Revision ID: 0005_alert_employee_index
+Revises: 0004_activity_name
+Create Date: 2026-10-18
+
+Serves the newest-first alert page of an employee's detail view.
+Built CONCURRENTLY on PostgreSQL, like the indexes in 0001.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_alert_employee_index"
+down_revision: Union[str, None] = "0004_activity_name"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    concurrently = op.get_bind().dialect.name == "postgresql"
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_alerts_employee_id_occurred_at",
+            "alerts",
+            ["employee_id", "occurred_at"],
+            if_not_exists=True,
+            postgresql_concurrently=concurrently,
+        )
+
+
+def downgrade() -> None:
+    concurrently = op.get_bind().dialect.name == "postgresql"
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_alerts_employee_id_occurred_at",
+            table_name="alerts",
+            if_exists=True,
+            postgresql_concurrently=concurrently,
+        )
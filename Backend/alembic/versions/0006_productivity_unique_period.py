@@ -0,0 +1,45 @@
+"""Make productivity unique per (employee_id, period)
+
+Revision ID: 0006_productivity_unique_period
+Revises: 0005_alert_employee_index
+Create Date: 2026-10-18
+
+Repeated POST /productivity/compute calls used to insert a new row per
+employee every time. Duplicates are collapsed to the newest row (highest
+id) before the unique index is built, so the compute upsert can target it.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_productivity_unique_period"
+down_revision: Union[str, None] = "0005_alert_employee_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        DELETE FROM productivity
+        WHERE EXISTS (
+            SELECT 1 FROM productivity newer
+            WHERE newer.employee_id = productivity.employee_id
+              AND newer.period = productivity.period
+              AND newer.id > productivity.id
+        )
+        """
+    )
+    op.create_index(
+        "uq_productivity_employee_id_period",
+        "productivity",
+        ["employee_id", "period"],
+        unique=True,
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_productivity_employee_id_period", table_name="productivity", if_exists=True)
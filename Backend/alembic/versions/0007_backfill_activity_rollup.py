@@ -0,0 +1,56 @@
+"""Backfill activity_daily_rollup from existing activities
+
+Revision ID: 0007_backfill_activity_rollup
+Revises: 0006_productivity_unique_period
+Create Date: 2026-10-18
+
+0003 created the rollup empty, but day-aligned reads use it by default
+(ACTIVITY_ROLLUP_READS_ENABLED), so history read as zero until a manual
+rebuild. Aggregate every (employee, day) that has raw activities but no
+rollup rows yet; days already rolled up, by ingestion or by a rebuild,
+are left alone, and so are rollup days whose raw partitions were
+archived. One INSERT ... SELECT ... GROUP BY; expect it to scan the
+whole activities table.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_backfill_activity_rollup"
+down_revision: Union[str, None] = "0006_productivity_unique_period"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        INSERT INTO activity_daily_rollup (
+            employee_id, team_id, department_id, day, activity_type,
+            productive, activity_count, duration_seconds
+        )
+        SELECT
+            a.employee_id,
+            MAX(a.team_id),
+            MAX(a.department_id),
+            DATE(a.timestamp),
+            a.activity_type,
+            COALESCE(a.productive, ''),
+            COUNT(a.id),
+            COALESCE(SUM(a.duration_seconds), 0)
+        FROM activities a
+        WHERE NOT EXISTS (
+            SELECT 1 FROM activity_daily_rollup r
+            WHERE r.employee_id = a.employee_id
+              AND r.day = DATE(a.timestamp)
+        )
+        GROUP BY a.employee_id, DATE(a.timestamp), a.activity_type, COALESCE(a.productive, '')
+        """
+    )
+
+
+def downgrade() -> None:
+    # The rows are derived data that ingestion keeps maintaining; leave them
+    pass
@@ -0,0 +1,53 @@
+"""Make screenshots.timestamp NOT NULL
+
+Revision ID: 0008_screenshot_timestamp_not_null
+Revises: 0007_backfill_activity_rollup
+Create Date: 2026-10-18
+
+The employee detail view pages screenshots on (timestamp, id); a NULL
+timestamp ended up in the next-page cursor, which was then rejected.
+Rows without one get their employee's oldest screenshot time (or now),
+so they stay at the end of the newest-first list.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_screenshot_timestamp_not_null"
+down_revision: Union[str, None] = "0007_backfill_activity_rollup"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        UPDATE screenshots
+        SET timestamp = COALESCE(
+            (SELECT MIN(other.timestamp) FROM screenshots other
+             WHERE other.employee_id = screenshots.employee_id),
+            CURRENT_TIMESTAMP
+        )
+        WHERE timestamp IS NULL
+        """
+    )
+    with op.batch_alter_table("screenshots") as batch:
+        batch.alter_column(
+            "timestamp",
+            existing_type=sa.DateTime(timezone=True),
+            existing_server_default=sa.func.now(),
+            nullable=False,
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("screenshots") as batch:
+        batch.alter_column(
+            "timestamp",
+            existing_type=sa.DateTime(timezone=True),
+            existing_server_default=sa.func.now(),
+            nullable=True,
+        )
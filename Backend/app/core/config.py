@@ -21,3 +21,91 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60))
 # Upload directory
 UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
 os.makedirs(UPLOAD_DIR, exist_ok=True)  # Ensure folder exists
+
+# Activity ingestion
+ACTIVITY_BATCH_MAX_ITEMS = int(os.getenv("ACTIVITY_BATCH_MAX_ITEMS", 1000))
+ACTIVITY_BATCH_MAX_BYTES = int(os.getenv("ACTIVITY_BATCH_MAX_BYTES", 5 * 1024 * 1024))
+
+# Write-behind buffering for activity ingestion (off by default)
+ACTIVITY_WRITE_BEHIND_ENABLED = os.getenv("ACTIVITY_WRITE_BEHIND_ENABLED", "false").lower() in ("1", "true", "yes")
+ACTIVITY_QUEUE_MAX_ROWS = int(os.getenv("ACTIVITY_QUEUE_MAX_ROWS", 50000))
+ACTIVITY_FLUSH_MAX_ROWS = int(os.getenv("ACTIVITY_FLUSH_MAX_ROWS", 500))
+ACTIVITY_FLUSH_INTERVAL_SECONDS = float(os.getenv("ACTIVITY_FLUSH_INTERVAL_SECONDS", 1.0))
+# Failed flushes are retried with doubling backoff before rows count as dropped
+ACTIVITY_FLUSH_MAX_ATTEMPTS = int(os.getenv("ACTIVITY_FLUSH_MAX_ATTEMPTS", 5))
+ACTIVITY_FLUSH_RETRY_BACKOFF_SECONDS = float(os.getenv("ACTIVITY_FLUSH_RETRY_BACKOFF_SECONDS", 0.5))
+
+# Activity partitioning / retention (months; retention 0 keeps everything)
+ACTIVITY_PARTITION_MONTHS_AHEAD = int(os.getenv("ACTIVITY_PARTITION_MONTHS_AHEAD", 2))
+ACTIVITY_RETENTION_MONTHS = int(os.getenv("ACTIVITY_RETENTION_MONTHS", 0))
+ACTIVITY_RETENTION_ARCHIVE = os.getenv("ACTIVITY_RETENTION_ARCHIVE", "true").lower() in ("1", "true", "yes")
+ACTIVITY_MAINTENANCE_INTERVAL_HOURS = float(os.getenv("ACTIVITY_MAINTENANCE_INTERVAL_HOURS", 24))
+
+# Serve day-aligned productivity/insights reads from activity_daily_rollup
+ACTIVITY_ROLLUP_READS_ENABLED = os.getenv("ACTIVITY_ROLLUP_READS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Seconds between classifier catalogue refreshes (picks up edits from other workers)
+ACTIVITY_CLASSIFIER_REFRESH_SECONDS = float(os.getenv("ACTIVITY_CLASSIFIER_REFRESH_SECONDS", 60))
+
+# Per-process cache of verified tokens and authenticated principals
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", 30))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", 10000))
+
+# Password hashing (bcrypt cost factor and dedicated worker pool)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", 256))
+
+# Bulk employee import
+EMPLOYEE_BULK_MAX_ROWS = int(os.getenv("EMPLOYEE_BULK_MAX_ROWS", 10000))
+EMPLOYEE_BULK_MAX_BYTES = int(os.getenv("EMPLOYEE_BULK_MAX_BYTES", 10 * 1024 * 1024))
+
+# Connection pools (sync engine; the async engine defaults to the same values)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))  # seconds, -1 disables
+# Pre-ping costs a round-trip per checkout; recycling already retires stale connections
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() in ("1", "true", "yes")
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 0))  # PostgreSQL only, 0 = no limit
+# SQLAlchemy compiled-statement cache entries per engine
+DB_QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", 1200))
+
+# Optional read replica for read-only endpoints (unset = use the primary)
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL", "")
+
+# Async engine pool (asyncpg / aiosqlite)
+ASYNC_DB_POOL_SIZE = int(os.getenv("ASYNC_DB_POOL_SIZE", DB_POOL_SIZE))
+ASYNC_DB_MAX_OVERFLOW = int(os.getenv("ASYNC_DB_MAX_OVERFLOW", DB_MAX_OVERFLOW))
+ASYNC_DB_POOL_TIMEOUT = float(os.getenv("ASYNC_DB_POOL_TIMEOUT", DB_POOL_TIMEOUT))
+ASYNC_DB_POOL_RECYCLE = int(os.getenv("ASYNC_DB_POOL_RECYCLE", DB_POOL_RECYCLE))
+
+# Redis (realtime fan-out and the response cache); unreachable -> in-memory fallback
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+
+# Cached dashboard aggregates (seconds; 0 disables caching for that endpoint)
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 10000))
+CACHE_TTL_ORG_SUMMARY = float(os.getenv("CACHE_TTL_ORG_SUMMARY", 30))
+CACHE_TTL_TEAM_SUMMARY = float(os.getenv("CACHE_TTL_TEAM_SUMMARY", 30))
+CACHE_TTL_DEPARTMENT_SUMMARY = float(os.getenv("CACHE_TTL_DEPARTMENT_SUMMARY", 30))
+CACHE_TTL_PRODUCTIVITY_SUMMARY = float(os.getenv("CACHE_TTL_PRODUCTIVITY_SUMMARY", 15))
+
+# POST /productivity/compute
+PRODUCTIVITY_COMPUTE_MAX_DAYS = int(os.getenv("PRODUCTIVITY_COMPUTE_MAX_DAYS", 366))
+PRODUCTIVITY_COMPUTE_CHUNK_EMPLOYEES = int(os.getenv("PRODUCTIVITY_COMPUTE_CHUNK_EMPLOYEES", 1000))
+
+# Realtime WebSocket fan-out
+REALTIME_SEND_QUEUE_SIZE = int(os.getenv("REALTIME_SEND_QUEUE_SIZE", 256))
+# "coalesce" keeps only the latest queued frame per sender/type; "drop_oldest" keeps order
+REALTIME_SLOW_CONSUMER_POLICY = os.getenv("REALTIME_SLOW_CONSUMER_POLICY", "coalesce")
+REALTIME_SEND_TIMEOUT_SECONDS = float(os.getenv("REALTIME_SEND_TIMEOUT_SECONDS", 10))
+# Per-connection ingest limit for frames sent by agents (token bucket; rate <= 0 disables)
+REALTIME_INGEST_RATE = float(os.getenv("REALTIME_INGEST_RATE", 1.0))  # frames per second
+REALTIME_INGEST_BURST = int(os.getenv("REALTIME_INGEST_BURST", 5))
+REALTIME_INGEST_MAX_PENDING = int(os.getenv("REALTIME_INGEST_MAX_PENDING", 32))
+# Presence registry across workers (Redis)
+REALTIME_HEARTBEAT_SECONDS = float(os.getenv("REALTIME_HEARTBEAT_SECONDS", 10))
+REALTIME_PRESENCE_TTL_SECONDS = float(os.getenv("REALTIME_PRESENCE_TTL_SECONDS", 30))
+# Live activity state: deltas kept for resuming dashboards (?since_seq=)
+REALTIME_STATE_HISTORY = int(os.getenv("REALTIME_STATE_HISTORY", 10000))
@@ -1,18 +1,50 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
-from app.core.config import DATABASE_URL
-
-# Detect SQLite for connect_args
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-
-#  Reliable engine with pre-ping and pooling
-engine = create_engine(
+from app.core.config import (
     DATABASE_URL,
-    connect_args=connect_args,
-    pool_pre_ping=True,   # Detect dead connections
-    pool_size=10,         # Maintain small connection pool
-    max_overflow=20,      # Allow temporary overflow
+    DATABASE_REPLICA_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+    DB_STATEMENT_TIMEOUT_MS,
+    DB_QUERY_CACHE_SIZE,
+    ASYNC_DB_POOL_SIZE,
+    ASYNC_DB_MAX_OVERFLOW,
+    ASYNC_DB_POOL_TIMEOUT,
+    ASYNC_DB_POOL_RECYCLE,
 )
+from app.core.pool_metrics import InstrumentedQueuePool, InstrumentedAsyncQueuePool
+
+
+def _connect_args(url: str, is_async: bool = False) -> dict:
+    if url.startswith("sqlite"):
+        # Detect SQLite for connect_args
+        return {} if is_async else {"check_same_thread": False}
+    if url.startswith("postgres") and DB_STATEMENT_TIMEOUT_MS > 0:
+        if is_async:
+            return {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        return {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return {}
+
+
+def _create_sync_engine(url: str):
+    return create_engine(
+        url,
+        connect_args=_connect_args(url),
+        poolclass=InstrumentedQueuePool,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        query_cache_size=DB_QUERY_CACHE_SIZE,
+    )
+
+
+engine = _create_sync_engine(DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -24,3 +56,64 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# ---------------------------
+# Read replica (falls back to the primary when unset)
+# ---------------------------
+read_engine = _create_sync_engine(DATABASE_REPLICA_URL) if DATABASE_REPLICA_URL else engine
+
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+def get_read_db():
+    """Session for read-only endpoints; may lag the primary by replication delay."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# ---------------------------
+# Async engine (same database, async driver)
+# ---------------------------
+def to_async_url(url: str) -> str:
+    """postgresql[+psycopg2]://... -> postgresql+asyncpg://..., sqlite://... -> sqlite+aiosqlite://..."""
+    scheme, sep, rest = url.partition("://")
+    driverless = scheme.split("+", 1)[0]
+    if driverless in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    if driverless == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    return url
+
+
+def _create_async_engine(url: str):
+    return create_async_engine(
+        to_async_url(url),
+        connect_args=_connect_args(url, is_async=True),
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        pool_size=ASYNC_DB_POOL_SIZE,
+        max_overflow=ASYNC_DB_MAX_OVERFLOW,
+        pool_timeout=ASYNC_DB_POOL_TIMEOUT,
+        pool_recycle=ASYNC_DB_POOL_RECYCLE,
+        query_cache_size=DB_QUERY_CACHE_SIZE,
+    )
+
+
+async_engine = _create_async_engine(DATABASE_URL)
+async_read_engine = _create_async_engine(DATABASE_REPLICA_URL) if DATABASE_REPLICA_URL else async_engine
+
+# expire_on_commit=False: responses are serialized after commit, and lazy
+# refreshes are not possible outside the greenlet context
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
@@ -1,11 +1,18 @@
 # app/main.py
+import asyncio
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from app.core.database import Base, engine, SessionLocal
+from app.core.database import Base, engine, SessionLocal, async_engine
 from fastapi.middleware.cors import CORSMiddleware
-from app.models import employee, department, team, activity, productivity, screenshot,project,task
+from app.models import employee, department, team, activity, activity_rollup, productivity, screenshot,project,task
 from app.services.employee_service import create_employee, get_employee_by_email
 from app.schemas.employee_schema import EmployeeCreate
+from app.services.activity_service import write_buffer
+from app.services.activity_partition_service import maintenance_loop
+from app.services.activity_classifier import classifier
+from app.utils.response_cache import response_cache
+from app.core.config import ACTIVITY_WRITE_BEHIND_ENABLED
 from app.routers import (
     alerts_router,
     department_router,
@@ -30,6 +37,9 @@ from app.routers import (
 )
 from fastapi.staticfiles import StaticFiles
 
+# Partition maintenance task, cancelled on shutdown
+maintenance_task = None
+
 # ---------------------------
 # Create tables if they don't exist
 # ---------------------------
@@ -49,6 +59,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Paginated list endpoints return a bare JSON array (the shape existing
+    # clients read) and carry the next page's cursor in this header instead
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -124,11 +137,33 @@ async def startup_event():
     """
     Initialize app — create default admin, start Redis listener, etc.
     """
+    global maintenance_task
     print(" Redis check skipped — using in-memory fallback if not running.")
     create_default_admin()
+    await run_in_threadpool(classifier.matcher)  # warm the productive-entity catalogue
+    await response_cache.init()
+    if ACTIVITY_WRITE_BEHIND_ENABLED:
+        await write_buffer.start()
+    maintenance_task = asyncio.create_task(maintenance_loop())
     print(" Startup event completed: app ready.")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    Drain buffered activity writes before the process exits.
+    """
+    if maintenance_task is not None:
+        maintenance_task.cancel()
+        try:
+            await maintenance_task
+        except asyncio.CancelledError:
+            pass
+    await write_buffer.stop()
+    await response_cache.close()
+    await async_engine.dispose()
+
+
 
 @app.get("/", tags=["Root"])
 def root():
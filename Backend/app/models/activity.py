@@ -1,5 +1,5 @@
 # app/models/activity.py
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -7,6 +7,12 @@ from app.core.database import Base
 
 class Activity(Base):
     __tablename__ = "activities"
+    __table_args__ = (
+        # Hot paths filter by owner plus a timestamp range, newest first
+        Index("ix_activities_employee_id_timestamp", "employee_id", "timestamp"),
+        Index("ix_activities_team_id_timestamp", "team_id", "timestamp"),
+        Index("ix_activities_department_id_timestamp", "department_id", "timestamp"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -17,12 +23,14 @@ class Activity(Base):
 
     # Activity Details
     activity_type = Column(String(255), nullable=False)
+    name = Column(String(255), nullable=True)  # App name or website
     description = Column(String(255), nullable=True)
     activity_metadata = Column(Text, nullable=True)
     start_at = Column(DateTime(timezone=True), nullable=True)
     end_at = Column(DateTime(timezone=True), nullable=True)
     duration_seconds = Column(Integer, nullable=True)
-    timestamp = Column(DateTime(timezone=False), default=datetime.utcnow)
+    # Partition key on PostgreSQL (monthly ranges), so it must always be set
+    timestamp = Column(DateTime(timezone=False), default=datetime.utcnow, nullable=False)
     productive = Column(String(50), nullable=True)  # matches 'character varying'
 
     # Relationships
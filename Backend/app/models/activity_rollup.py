@@ -0,0 +1,29 @@
+# app/models/activity_rollup.py
+from sqlalchemy import Column, Integer, BigInteger, String, Date, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+# ActivityDailyRollup Model
+# Per-employee, per-day, per-activity_type counters maintained on ingestion
+class ActivityDailyRollup(Base):
+    __tablename__ = "activity_daily_rollup"
+    __table_args__ = (
+        UniqueConstraint("employee_id", "day", "activity_type", "productive", name="uq_activity_daily_rollup_key"),
+        Index("ix_activity_daily_rollup_team_id_day", "team_id", "day"),
+        Index("ix_activity_daily_rollup_department_id_day", "department_id", "day"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    employee_id = Column(Integer, ForeignKey("employee.id", ondelete="CASCADE"), nullable=False)
+    department_id = Column(Integer, ForeignKey("departments.id", ondelete="SET NULL"), nullable=True)
+    team_id = Column(Integer, ForeignKey("teams.id", ondelete="SET NULL"), nullable=True)
+
+    day = Column(Date, nullable=False)
+    activity_type = Column(String(255), nullable=False)
+    productive = Column(String(50), nullable=False, default="")  # Activity.productive, "" when unset
+
+    activity_count = Column(Integer, nullable=False, default=0)
+    duration_seconds = Column(BigInteger, nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
 # Attendance Model
 class Attendance(Base):
     __tablename__ = "attendance"
+    __table_args__ = (
+        Index("ix_attendance_employee_id_date", "employee_id", "date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     employee_id = Column(Integer,ForeignKey("employee.id", ondelete="CASCADE"),nullable=False,index=True)
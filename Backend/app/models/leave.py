@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 # Leave ModelESS
 class Leave(Base):
     __tablename__ = "leaves"
+    __table_args__ = (
+        Index("ix_leaves_employee_id_start_date_end_date", "employee_id", "start_date", "end_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     employee_id = Column(Integer, ForeignKey("employee.id", ondelete="CASCADE")) 
@@ -6,6 +6,7 @@ from sqlalchemy import (
     Date,
     DateTime,
     ForeignKey,
+    Index,
 )
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -15,6 +16,13 @@ from app.core.database import Base
 
 class Productivity(Base):
     __tablename__ = "productivity"
+    __table_args__ = (
+        Index("ix_productivity_employee_id_date", "employee_id", "date"),
+        Index("ix_productivity_team_id_date", "team_id", "date"),
+        Index("ix_productivity_department_id_date", "department_id", "date"),
+        # One row per employee per period; target of the compute upsert
+        Index("uq_productivity_employee_id_period", "employee_id", "period", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -1,14 +1,18 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
 # Screenshot Model
 class Screenshot(Base):
     __tablename__ = "screenshots"
+    __table_args__ = (
+        Index("ix_screenshots_employee_id_timestamp", "employee_id", "timestamp"),
+        Index("ix_screenshots_department_id_timestamp", "department_id", "timestamp"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     image_path = Column(String, nullable=False)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    timestamp = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
 
     # Foreign keys
     employee_id = Column(Integer, ForeignKey("employee.id", ondelete="CASCADE"), nullable=False)
@@ -1,50 +1,234 @@
 # app/routers/activity_router.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime
 from typing import List, Optional
+import json
+import zlib
 
-from app.core.database import get_db
-from app.models.activity import Activity
-from app.schemas.activity import ActivityCreate, ActivityResponse
-from app.utils.auth import get_current_user
+from app.core.config import ACTIVITY_BATCH_MAX_ITEMS, ACTIVITY_BATCH_MAX_BYTES
+from app.core.database import get_read_db, get_async_db
+from app.schemas.activity import (
+    ActivityCreate,
+    ActivityResponse,
+    ActivityBatchItemResult,
+    ActivityBatchResponse,
+)
+from app.services.activity_service import (
+    build_activity_values,
+    bulk_insert_activities,
+    insert_activity,
+    list_activities_page,
+    stream_activities_ndjson,
+    timestamp_range_filters,
+    write_buffer,
+)
+from app.services.activity_write_buffer import QueueFullError
+from app.services.realtime_state import changes_from_activity, live_state
+from app.utils.auth import get_current_user, require_roles
 
 router = APIRouter(prefix="/activities", tags=["activities"])
 
+
+def _enqueue_or_429(rows: list) -> JSONResponse:
+    """Hand rows to the write-behind buffer; 429 + Retry-After when it is full."""
+    try:
+        write_buffer.submit(rows)
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Activity ingest queue is full, retry later",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={"status": "queued", "queued": len(rows)},
+    )
+
+
 # Log / Create activity
 
 @router.post("/", response_model=ActivityResponse, status_code=status.HTTP_201_CREATED)
-def create_activity(
+async def create_activity(
     activity: ActivityCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_user)
 ):
-    new_activity = Activity(
-        employee_id=current_user.id,
-        department_id=current_user.department_id,
-        team_id=current_user.team_id,
-        activity_type=activity.activity_type,
-        description=activity.description,
-        timestamp=datetime.utcnow()
+    values = build_activity_values(activity, current_user, timestamp=datetime.utcnow())
+
+    # Write-behind mode: acknowledge now, persist on the next flush
+    if write_buffer.running:
+        response = _enqueue_or_429([values])
+    else:
+        response = await db.run_sync(insert_activity, values)
+
+    await live_state.update_principal(current_user, changes_from_activity(values))
+    return response
+
+
+# ---------------------------
+# Batched ingestion
+# ---------------------------
+def _read_batch_records(raw: bytes, content_type: str) -> list:
+    """Decode a batch body: a JSON array, {"activities": [...]}, or NDJSON lines."""
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        records = []
+        for line in raw.splitlines():
+            line = line.strip()
+            if line:
+                records.append(json.loads(line))
+        return records
+
+    payload = json.loads(raw)
+    if isinstance(payload, dict):
+        payload = payload.get("activities")
+    if not isinstance(payload, list):
+        raise ValueError("Expected a JSON array of activities")
+    return payload
+
+
+@router.post("/batch", response_model=ActivityBatchResponse)
+async def create_activities_batch(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user)
+):
+    """
+    Ingest many activities in one request and one multi-row INSERT.
+
+    Accepts a JSON array (or {"activities": [...]}) or NDJSON when the
+    Content-Type is application/x-ndjson; the body may be gzip-compressed
+    (Content-Encoding: gzip). Invalid records are rejected individually,
+    valid ones are written together in a single transaction.
+    """
+    raw = await request.body()
+
+    if request.headers.get("content-encoding", "").lower() == "gzip":
+        try:
+            # Bound the inflated size so a small body can't expand unchecked
+            inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            raw = inflater.decompress(raw, ACTIVITY_BATCH_MAX_BYTES + 1)
+        except zlib.error:
+            raise HTTPException(status_code=400, detail="Invalid gzip body")
+
+    if len(raw) > ACTIVITY_BATCH_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="Batch body too large")
+
+    try:
+        records = _read_batch_records(raw, request.headers.get("content-type", "").lower())
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Malformed batch: {e}")
+
+    if len(records) > ACTIVITY_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds {ACTIVITY_BATCH_MAX_ITEMS} activities",
+        )
+
+    now = datetime.utcnow()
+    rows = []
+    results = []
+    for index, record in enumerate(records):
+        try:
+            activity = ActivityCreate.model_validate(record)
+        except ValidationError as e:
+            err = e.errors()[0]
+            loc = ".".join(str(part) for part in err.get("loc", ()))
+            results.append(ActivityBatchItemResult(
+                index=index,
+                status="rejected",
+                error=f"{loc}: {err.get('msg')}" if loc else err.get("msg"),
+            ))
+            continue
+
+        # Batched records keep the client's capture time when provided
+        rows.append(build_activity_values(activity, current_user, timestamp=activity.timestamp or now))
+        results.append(ActivityBatchItemResult(index=index, status="accepted"))
+
+    if write_buffer.running:
+        _enqueue_or_429(rows)
+    else:
+        await db.run_sync(bulk_insert_activities, rows)
+
+    # Live dashboards only care about the latest record of the batch
+    if rows:
+        latest = max(rows, key=lambda r: r["timestamp"])
+        await live_state.update_principal(current_user, changes_from_activity(latest))
+
+    return ActivityBatchResponse(
+        accepted=len(rows),
+        rejected=len(results) - len(rows),
+        results=results,
     )
-    db.add(new_activity)
-    db.commit()
-    db.refresh(new_activity)
-    return new_activity
+
+
+# Write-behind buffer metrics (queue depth, flush latency, dropped rows)
+
+@router.get("/ingest/stats")
+def ingest_stats(_: object = Depends(require_roles("Admin"))):
+    return write_buffer.stats()
+
+# ---------------------------
+# Listing (cursor-paginated or streamed)
+# ---------------------------
+NDJSON = "application/x-ndjson"
+
+
+def _list_activities(
+    request: Request,
+    response: Response,
+    db: Session,
+    employee_id: int,
+    start: Optional[str],
+    end: Optional[str],
+    limit: int,
+    cursor: Optional[str],
+):
+    """
+    Newest-first activities for one employee with timestamps in [start, end).
+
+    `Accept: application/x-ndjson` streams the whole range row by row;
+    otherwise one page of `limit` rows is returned and the cursor for the
+    next page is sent in the X-Next-Cursor header.
+    """
+    if NDJSON in request.headers.get("accept", ""):
+        # Validate up front: once streaming starts the status is already 200
+        try:
+            timestamp_range_filters(start, end)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return StreamingResponse(
+            stream_activities_ndjson(employee_id, start, end),
+            media_type=NDJSON,
+        )
+
+    try:
+        rows, next_cursor = list_activities_page(db, employee_id, start, end, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return rows
+
 
 # Get logged-in employee's activities
 
 @router.get("/me", response_model=List[ActivityResponse])
 def get_my_activities(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
     current_user=Depends(get_current_user)
 ):
-    return (
-        db.query(Activity)
-        .filter(Activity.employee_id == current_user.id)
-        .order_by(Activity.timestamp.desc())
-        .all()
-    )
+    return _list_activities(request, response, db, current_user.id, start, end, limit, cursor)
 
 
 # Get activities by employee (optional date range)
@@ -52,17 +236,12 @@ def get_my_activities(
 @router.get("/employee/{employee_id}", response_model=List[ActivityResponse])
 def get_activities_by_employee(
     employee_id: int,
+    request: Request,
+    response: Response,
     start: Optional[str] = None,
     end: Optional[str] = None,
-    db: Session = Depends(get_db)
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db)
 ):
-    query = db.query(Activity).filter(Activity.employee_id == employee_id)
-    
-    if start:
-        start_dt = datetime.fromisoformat(start)
-        query = query.filter(Activity.timestamp >= start_dt)
-    if end:
-        end_dt = datetime.fromisoformat(end)
-        query = query.filter(Activity.timestamp <= end_dt)
-    
-    return query.order_by(Activity.timestamp.desc()).all()
+    return _list_activities(request, response, db, employee_id, start, end, limit, cursor)
@@ -3,9 +3,16 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 
-from app.core.database import get_db
+from app.core.database import get_db, engine, read_engine, async_engine, async_read_engine
+from app.core.pool_metrics import pool_stats
 from app.services.admin_config_service import add_entity, list_entities, get_entity, update_entity, delete_entity
-from app.schemas.admin_schemas import ProductiveEntityCreate, ProductiveEntityResponse
+from app.services.reclassification_service import start_reclassification, get_job, resume_job, cancel_job
+from app.schemas.admin_schemas import (
+    ProductiveEntityCreate,
+    ProductiveEntityResponse,
+    ReclassifyRequest,
+    ReclassifyJobResponse,
+)
 from app.utils.auth import require_roles
 
 router = APIRouter(prefix="/admin/config", tags=["Admin Config"])
@@ -44,3 +51,47 @@ def remove_entity(entity_id: int, db: Session = Depends(get_db), _=Depends(requi
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     return {}
+
+
+# ---------------------------
+# Reclassification of historical activities
+# ---------------------------
+@router.post("/reclassify", response_model=ReclassifyJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def reclassify_activities(payload: ReclassifyRequest, _=Depends(require_roles("Admin"))):
+    """Re-evaluate Activity.productive for [start, end] against the current catalogue."""
+    if payload.end < payload.start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    job = start_reclassification(payload.start, payload.end, payload.chunk_size)
+    return job.to_dict()
+
+@router.get("/reclassify/{job_id}", response_model=ReclassifyJobResponse)
+def reclassify_status(job_id: str, _=Depends(require_roles("Admin"))):
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Not found")
+    return job.to_dict()
+
+@router.post("/reclassify/{job_id}/resume", response_model=ReclassifyJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def reclassify_resume(job_id: str, _=Depends(require_roles("Admin"))):
+    try:
+        return resume_job(job_id).to_dict()
+    except ValueError as e:
+        code = 404 if str(e) == "Not found" else 409
+        raise HTTPException(status_code=code, detail=str(e))
+
+@router.post("/reclassify/{job_id}/cancel", response_model=ReclassifyJobResponse)
+def reclassify_cancel(job_id: str, _=Depends(require_roles("Admin"))):
+    try:
+        return cancel_job(job_id).to_dict()
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.get("/db-pool")
+def db_pool_stats(_=Depends(require_roles("Admin"))):
+    """Occupancy and checkout wait times per connection pool (replicas share the primary's pool when unset)."""
+    return {
+        "primary": pool_stats(engine),
+        "replica": pool_stats(read_engine) if read_engine is not engine else None,
+        "async_primary": pool_stats(async_engine.sync_engine),
+        "async_replica": pool_stats(async_read_engine.sync_engine) if async_read_engine is not async_engine else None,
+    }
@@ -1,23 +1,99 @@
 # app/routers/admin_productivity_router.py
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import Dict
+from typing import List, Optional
+from datetime import date
 
-from app.core.database import get_db
-from app.services.admin_productivity_service import get_org_summary, get_team_summary, get_department_summary
-from app.schemas.admin_schemas import OrgSummary
+from app.core.database import get_read_db
+from app.core.config import CACHE_TTL_ORG_SUMMARY, CACHE_TTL_TEAM_SUMMARY, CACHE_TTL_DEPARTMENT_SUMMARY
+from app.services.admin_productivity_service import (
+    get_org_summary,
+    get_team_summary,
+    get_department_summary,
+    get_team_summaries,
+    get_department_summaries,
+)
+from app.schemas.admin_schemas import OrgSummary, TeamSummary, DepartmentSummary
 from app.utils.auth import require_roles
+from app.utils.response_cache import response_cache
 
 router = APIRouter(prefix="/admin/productivity", tags=["Admin Productivity"])
 
+# Summaries are cached (see app/utils/response_cache.py) and invalidated when
+# productivity or employee rows are written; the session only connects on a
+# cache miss.
+# `start` / `end` filter on Productivity.date (inclusive).
+
+def _range_key(start: Optional[date], end: Optional[date]) -> str:
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="start must be on or before end")
+    return f"{start or ''}:{end or ''}"
+
 @router.get("/overview", response_model=OrgSummary)
-def overview(db: Session = Depends(get_db), _=Depends(require_roles("Admin"))):
-    return get_org_summary(db)
+async def overview(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: Session = Depends(get_read_db),
+    _=Depends(require_roles("Admin")),
+):
+    return await response_cache.get_or_compute(
+        "productivity", f"org:{_range_key(start, end)}", CACHE_TTL_ORG_SUMMARY,
+        lambda: run_in_threadpool(get_org_summary, db, start, end),
+    )
+
+@router.get("/teams", response_model=List[TeamSummary])
+async def all_team_summaries(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: Session = Depends(get_read_db),
+    _=Depends(require_roles("Admin")),
+):
+    """Summary per team with productivity rows in the range, in one grouped query."""
+    return await response_cache.get_or_compute(
+        "productivity", f"teams:{_range_key(start, end)}", CACHE_TTL_TEAM_SUMMARY,
+        lambda: run_in_threadpool(get_team_summaries, db, start, end),
+    )
+
+@router.get("/departments", response_model=List[DepartmentSummary])
+async def all_department_summaries(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: Session = Depends(get_read_db),
+    _=Depends(require_roles("Admin")),
+):
+    """Summary per department with productivity rows in the range, in one grouped query."""
+    return await response_cache.get_or_compute(
+        "productivity", f"departments:{_range_key(start, end)}", CACHE_TTL_DEPARTMENT_SUMMARY,
+        lambda: run_in_threadpool(get_department_summaries, db, start, end),
+    )
 
 @router.get("/team/{team_id}")
-def team_summary(team_id: int, db: Session = Depends(get_db), _=Depends(require_roles("Admin"))):
-    return get_team_summary(db, team_id)
+async def team_summary(
+    team_id: int,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: Session = Depends(get_read_db),
+    _=Depends(require_roles("Admin")),
+):
+    return await response_cache.get_or_compute(
+        "productivity", f"team:{team_id}:{_range_key(start, end)}", CACHE_TTL_TEAM_SUMMARY,
+        lambda: run_in_threadpool(get_team_summary, db, team_id, start, end),
+    )
 
 @router.get("/department/{department_id}")
-def department_summary(department_id: int, db: Session = Depends(get_db), _=Depends(require_roles("Admin"))):
-    return get_department_summary(db, department_id)
+async def department_summary(
+    department_id: int,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: Session = Depends(get_read_db),
+    _=Depends(require_roles("Admin")),
+):
+    return await response_cache.get_or_compute(
+        "productivity", f"department:{department_id}:{_range_key(start, end)}", CACHE_TTL_DEPARTMENT_SUMMARY,
+        lambda: run_in_threadpool(get_department_summary, db, department_id, start, end),
+    )
+
+@router.get("/cache-stats")
+def cache_stats(_=Depends(require_roles("Admin"))):
+    return response_cache.stats()
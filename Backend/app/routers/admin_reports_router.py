@@ -4,7 +4,7 @@ from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 from typing import Optional
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.services.admin_reports_service import generate_productivity_report
 from app.utils.auth import require_roles
 from app.schemas.admin_schemas import ReportRequest
@@ -12,7 +12,12 @@ from app.schemas.admin_schemas import ReportRequest
 router = APIRouter(prefix="/admin/reports", tags=["Admin Reports"])
 
 @router.post("/productivity/export")
-def export_productivity(req: ReportRequest, db: Session = Depends(get_db), _=Depends(require_roles("Admin"))):
+def export_productivity(
+    req: ReportRequest,
+    db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db),
+    _=Depends(require_roles("Admin")),
+):
     # Optionally use req fields to filter
     scope = {}
     if req.employee_id: scope["employee_id"] = req.employee_id
@@ -21,7 +26,7 @@ def export_productivity(req: ReportRequest, db: Session = Depends(get_db), _=Dep
 
     try:
         # generated_by: could be current user id, but we allow None here
-        path = generate_productivity_report(db, generated_by=None, scope=scope)
+        path = generate_productivity_report(db, generated_by=None, scope=scope, read_db=read_db)
         return FileResponse(path, filename=path.split("/")[-1])
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,103 +1,100 @@
 # app/routers/analytics_router.py
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import date
 from typing import Optional, Dict
 
-from app.core.database import get_db
+from app.core.database import get_db, get_async_read_db
 from app.models.activity import Activity
+from app.services.analytics_service import aggregate_activity_counts
+from app.services.rollup_service import rebuild_rollup, check_rollup_consistency
+from app.utils.auth import require_roles
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
+# `start` / `end` are ISO datetimes bounding Activity.timestamp as [start, end):
+# an activity at exactly `end` belongs to the next range.
+
 
 # Employee Analytics
 
 @router.get("/employee/{employee_id}")
-def employee_analytics(
+async def employee_analytics(
     employee_id: int,
     start: Optional[str] = None,
     end: Optional[str] = None,
-    db: Session = Depends(get_db)
+    bucket: Optional[str] = Query(None, pattern="^(hour|day|week)$"),
+    db: AsyncSession = Depends(get_async_read_db)
 ) -> Dict:
-    query = db.query(Activity).filter(Activity.employee_id == employee_id)
-    
-    if start:
-        start_dt = datetime.fromisoformat(start)
-        query = query.filter(Activity.timestamp >= start_dt)
-    if end:
-        end_dt = datetime.fromisoformat(end)
-        query = query.filter(Activity.timestamp <= end_dt)
-    
-    activities = query.all()
-    
-    activities_by_type = {}
-    for act in activities:
-        activities_by_type[act.activity_type] = activities_by_type.get(act.activity_type, 0) + 1
-    
+    counts = await db.run_sync(
+        aggregate_activity_counts, Activity.employee_id, employee_id, start=start, end=end, bucket=bucket
+    )
     return {
         "employee_id": employee_id,
-        "total_activities": len(activities),
-        "activities_by_type": activities_by_type
+        **counts,
     }
 
 # ---------------------------
 # Team Analytics
 # ---------------------------
 @router.get("/team/{team_id}")
-def team_analytics(
+async def team_analytics(
     team_id: int,
     start: Optional[str] = None,
     end: Optional[str] = None,
-    db: Session = Depends(get_db)
+    bucket: Optional[str] = Query(None, pattern="^(hour|day|week)$"),
+    db: AsyncSession = Depends(get_async_read_db)
 ) -> Dict:
-    query = db.query(Activity).filter(Activity.team_id == team_id)
-    
-    if start:
-        start_dt = datetime.fromisoformat(start)
-        query = query.filter(Activity.timestamp >= start_dt)
-    if end:
-        end_dt = datetime.fromisoformat(end)
-        query = query.filter(Activity.timestamp <= end_dt)
-    
-    activities = query.all()
-    
-    activities_by_type = {}
-    for act in activities:
-        activities_by_type[act.activity_type] = activities_by_type.get(act.activity_type, 0) + 1
-    
+    counts = await db.run_sync(
+        aggregate_activity_counts, Activity.team_id, team_id, start=start, end=end, bucket=bucket
+    )
     return {
         "team_id": team_id,
-        "total_activities": len(activities),
-        "activities_by_type": activities_by_type
+        **counts,
     }
 
 # ---------------------------
 # Department Analytics
 # ---------------------------
 @router.get("/department/{department_id}")
-def department_analytics(
+async def department_analytics(
     department_id: int,
     start: Optional[str] = None,
     end: Optional[str] = None,
-    db: Session = Depends(get_db)
+    bucket: Optional[str] = Query(None, pattern="^(hour|day|week)$"),
+    db: AsyncSession = Depends(get_async_read_db)
 ) -> Dict:
-    query = db.query(Activity).filter(Activity.department_id == department_id)
-    
-    if start:
-        start_dt = datetime.fromisoformat(start)
-        query = query.filter(Activity.timestamp >= start_dt)
-    if end:
-        end_dt = datetime.fromisoformat(end)
-        query = query.filter(Activity.timestamp <= end_dt)
-    
-    activities = query.all()
-    
-    activities_by_type = {}
-    for act in activities:
-        activities_by_type[act.activity_type] = activities_by_type.get(act.activity_type, 0) + 1
-    
+    counts = await db.run_sync(
+        aggregate_activity_counts, Activity.department_id, department_id, start=start, end=end, bucket=bucket
+    )
     return {
         "department_id": department_id,
-        "total_activities": len(activities),
-        "activities_by_type": activities_by_type
+        **counts,
     }
+
+# ---------------------------
+# Daily rollup maintenance
+# ---------------------------
+@router.post("/rollup/rebuild")
+def rebuild_daily_rollup(
+    start: date,
+    end: date,
+    db: Session = Depends(get_db),
+    _: object = Depends(require_roles("Admin")),
+) -> Dict:
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    rows = rebuild_rollup(db, start, end)
+    return {"start": start, "end": end, "rollup_rows": rows}
+
+
+@router.get("/rollup/check")
+def check_daily_rollup(
+    start: date,
+    end: date,
+    sample_size: int = Query(20, ge=1, le=500),
+    db: Session = Depends(get_db),
+    _: object = Depends(require_roles("Admin")),
+) -> Dict:
+    return check_rollup_consistency(db, start, end, sample_size=sample_size)
@@ -7,8 +7,8 @@ from sqlalchemy import func
 from app.core.database import SessionLocal
 from app.models.attendance import Attendance
 from app.models.leave import Leave         
-from app.models.employee import Employee
 from app.utils.auth import get_current_user
+from app.utils.auth_cache import Principal
 from app.schemas.attendance import AttendanceResponse
 from app.core.database import get_db
 
@@ -26,7 +26,7 @@ def calculate_hours(login_time: datetime, logout_time: datetime) -> str:
 @router.post("/punch_in", response_model=AttendanceResponse)
 def punch_in(
     db: Session = Depends(get_db),
-    current_user: Employee = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     today = datetime.now(timezone.utc).date()
 
@@ -72,7 +72,7 @@ def punch_in(
 @router.post("/punch_out", response_model=AttendanceResponse)
 def punch_out(
     db: Session = Depends(get_db),
-    current_user: Employee = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     today = datetime.now(timezone.utc).date()
 
@@ -115,7 +115,7 @@ def punch_out(
 @router.get("/today", response_model=AttendanceResponse)
 def get_today_attendance(
     db: Session = Depends(get_db),
-    current_user: Employee = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     today = datetime.now(timezone.utc).date()
 
@@ -163,7 +163,7 @@ def get_today_attendance(
 @router.get("/summary", response_model=List[AttendanceResponse])
 def get_summary(
     db: Session = Depends(get_db),
-    current_user: Employee = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
     limit: int = Query(30, ge=1, le=100)
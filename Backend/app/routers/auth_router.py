@@ -1,26 +1,23 @@
 # app/routers/auth.py
 from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
-from app.services.employee_service import get_employee_by_email, verify_password
-from app.utils.auth import create_access_token
+from app.services.employee_service import get_employee_by_email
+from app.utils.auth import create_access_token, require_roles
+from app.utils.security import password_hasher, PasswordHasherBusy
 from app.schemas.auth import LoginRequest, TokenResponse, UserResponse
 
 router = APIRouter()
 
 
-@router.post("/login", response_model=TokenResponse)
-def login(data: LoginRequest, response: Response, db: Session = Depends(get_db)):
-
-    # Validate user credentials
-    user = get_employee_by_email(db, data.email)
-    if not user or not verify_password(data.password, user.password):
-        raise HTTPException(status_code=401, detail="Incorrect email or password")
+def _rehash_password(db: Session, user, new_hash: str) -> None:
+    user.password = new_hash
+    db.commit()
 
-    # Generate JWT token
-    access_token = create_access_token(email=user.email, role=user.role)
 
+def _user_payload(user) -> UserResponse:
     # Build clean user response (avoid ORM relationship issues)
     name = (
         (f"{user.first_name or ''} {user.last_name or ''}").strip()
@@ -45,7 +42,35 @@ def login(data: LoginRequest, response: Response, db: Session = Depends(get_db))
     }
 
     # Convert to Pydantic response model
-    user_payload = UserResponse.model_validate(user_dict)
+    return UserResponse.model_validate(user_dict)
+
+
+@router.post("/login", response_model=TokenResponse)
+async def login(data: LoginRequest, response: Response, db: Session = Depends(get_db)):
+    # DB work stays on the threadpool; bcrypt runs on its own bounded pool
+    user = await run_in_threadpool(get_employee_by_email, db, data.email)
+    if not user:
+        raise HTTPException(status_code=401, detail="Incorrect email or password")
+
+    try:
+        valid, new_hash = await password_hasher.verify_and_update_async(data.password, user.password)
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent logins, retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    if not valid:
+        raise HTTPException(status_code=401, detail="Incorrect email or password")
+
+    # Hash was made with a different BCRYPT_ROUNDS; store the upgraded one
+    if new_hash:
+        await run_in_threadpool(_rehash_password, db, user, new_hash)
+
+    # Generate JWT token
+    access_token = create_access_token(email=user.email, role=user.role)
+
+    user_payload = await run_in_threadpool(_user_payload, user)
 
     # Set HTTP-Only cookie
     response.set_cookie(
@@ -63,3 +88,9 @@ def login(data: LoginRequest, response: Response, db: Session = Depends(get_db))
         "token_type": "bearer",
         "user": user_payload,
     }
+
+
+@router.get("/hash-stats")
+def hash_stats(_=Depends(require_roles("Admin"))):
+    """Password hashing pool utilisation."""
+    return password_hasher.stats()
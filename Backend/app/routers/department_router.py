@@ -8,6 +8,7 @@ from app.schemas.department import (
 )
 from app.models.department import Department
 from app.utils.auth import require_roles
+from app.utils.auth_cache import invalidate_principals_in
 
 router = APIRouter(prefix="/departments", tags=["Departments"])
  
@@ -75,6 +76,9 @@ def delete_department(
     if not dept:
         raise HTTPException(status_code=404, detail="Department not found")
 
+    # Its teams go with it
+    team_ids = [team.id for team in dept.teams]
     db.delete(dept)
     db.commit()
+    invalidate_principals_in(team_ids=team_ids, department_ids=[dept_id])
     return {"message": "Department deleted successfully"}
@@ -1,24 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
 from sqlalchemy.orm import Session, selectinload
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Union
+import csv
+import io
+import json
 import shutil
 
-from app.core.database import get_db
-from app.core.config import UPLOAD_DIR
+from app.core.database import get_db, get_read_db
+from app.core.config import UPLOAD_DIR, EMPLOYEE_BULK_MAX_ROWS, EMPLOYEE_BULK_MAX_BYTES
 from app.schemas.employee_schema import (
     EmployeeCreate,
     EmployeeResponse,
     EmployeeListResponse,
     EmployeeUpdate,
+    EmployeeBulkRowResult,
+    EmployeeBulkResponse,
+    AttendanceOut,
+    LeaveOut,
+    ActivityOut,
+    ProductivityOut,
 )
+from app.schemas.screenshot import ScreenshotResponse
+from app.schemas.alert import AlertRead
 from app.services.employee_service import (
     create_employee,
+    bulk_create_employees,
     get_employee_by_email,
     get_employee_by_id,
+    list_employees_page,
+    get_employee_detail,
+    list_employee_collection_page,
     update_profile,
 )
 from app.utils.auth import require_roles, get_current_user
+from app.utils.security import PasswordHasherBusy
 from app.models.employee import Employee
 
 router = APIRouter(prefix="/employees", tags=["employees"])
@@ -50,6 +68,99 @@ def register_employee(
     return attach_extra_fields(emp)
 
 
+# ====================================================
+# Bulk import (JSON or CSV)
+# ====================================================
+def _read_csv_row(row: dict) -> Union[dict, ValueError]:
+    # DictReader puts surplus cells in a list under None and fills missing ones with None
+    if None in row:
+        return ValueError(f"row has {len(row[None])} more cell(s) than the header")
+    missing = [k.strip() for k, v in row.items() if v is None]
+    if missing:
+        return ValueError(f"row is missing cell(s) for {', '.join(missing)}")
+    # Empty cells mean "not provided"
+    return {k.strip(): (v.strip() or None) for k, v in row.items() if k}
+
+
+def _read_bulk_records(raw: bytes, content_type: str) -> List[Union[dict, ValueError]]:
+    """Records to validate; a CSV row whose shape does not match the header is a ValueError."""
+    text = raw.decode("utf-8-sig")
+    if content_type.startswith("text/csv"):
+        return [_read_csv_row(row) for row in csv.DictReader(io.StringIO(text))]
+    payload = json.loads(text)
+    if isinstance(payload, dict):
+        payload = payload.get("employees")
+    if not isinstance(payload, list):
+        raise ValueError("Expected a JSON array of employees")
+    return payload
+
+
+@router.post("/bulk", response_model=EmployeeBulkResponse)
+async def bulk_register_employees(
+    request: Request,
+    db: Session = Depends(get_db),
+    _: object = Depends(require_roles("Admin")),
+):
+    """
+    Register many employees in one request.
+
+    Body: a JSON array (or {"employees": [...]}) of EmployeeCreate objects,
+    or CSV with an EmployeeCreate header row when Content-Type is text/csv.
+    Every row gets a result; invalid rows do not stop the rest.
+    """
+    raw = await request.body()
+    if len(raw) > EMPLOYEE_BULK_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="Import body too large")
+
+    try:
+        records = _read_bulk_records(raw, request.headers.get("content-type", "").lower())
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Malformed import: {e}")
+
+    if len(records) > EMPLOYEE_BULK_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"Import exceeds {EMPLOYEE_BULK_MAX_ROWS} employees")
+
+    results: List[Optional[EmployeeBulkRowResult]] = [None] * len(records)
+    valid_rows, employees = [], []
+    for row, record in enumerate(records):
+        if isinstance(record, ValueError):
+            results[row] = EmployeeBulkRowResult(row=row, status="error", error=str(record))
+            continue
+        try:
+            employees.append(EmployeeCreate.model_validate(record))
+            valid_rows.append(row)
+        except ValidationError as e:
+            err = e.errors()[0]
+            loc = ".".join(str(part) for part in err.get("loc", ()))
+            results[row] = EmployeeBulkRowResult(
+                row=row,
+                status="error",
+                email=record.get("email") if isinstance(record, dict) else None,
+                error=f"{loc}: {err.get('msg')}" if loc else err.get("msg"),
+            )
+
+    try:
+        outcomes = await run_in_threadpool(bulk_create_employees, db, employees)
+    except PasswordHasherBusy:
+        # Raised before anything is written; the whole import can be retried
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Password hashing is saturated, retry the import shortly",
+            headers={"Retry-After": "5"},
+        )
+    for row, employee, (emp_id, error) in zip(valid_rows, employees, outcomes):
+        results[row] = EmployeeBulkRowResult(
+            row=row,
+            status="error" if error else "created",
+            email=employee.email,
+            id=emp_id,
+            error=error,
+        )
+
+    created = sum(1 for r in results if r.status == "created")
+    return EmployeeBulkResponse(created=created, failed=len(results) - created, results=results)
+
+
 # ====================================================
 # Get own profile
 # ====================================================
@@ -81,22 +192,35 @@ def read_own_profile(
 # ====================================================
 @router.get("/", response_model=List[EmployeeListResponse])
 def list_all_employees(
-    db: Session = Depends(get_db),
+    response: Response,
+    department_id: Optional[int] = None,
+    team_id: Optional[int] = None,
+    role: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    name: Optional[str] = Query(None, description="Prefix of first name, last name or email"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
     _: object = Depends(require_roles("Admin")),
 ):
-    employees = (
-        db.query(Employee)
-        .options(
-            
-            selectinload(Employee.productivity),
-          
-            selectinload(Employee.department),
-            selectinload(Employee.team),
+    """Paginated directory; the next page's cursor is sent in X-Next-Cursor."""
+    try:
+        rows, next_cursor = list_employees_page(
+            db,
+            limit=limit,
+            cursor=cursor,
+            department_id=department_id,
+            team_id=team_id,
+            role=role,
+            is_active=is_active,
+            name=name,
         )
-        .all()
-    )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    return [attach_extra_fields(e) for e in employees]
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return rows
 
 
 # ====================================================
@@ -105,28 +229,113 @@ def list_all_employees(
 @router.get("/{emp_id}", response_model=EmployeeResponse)
 def get_employee(
     emp_id: int,
-    db: Session = Depends(get_db),
+    recent: int = Query(5, ge=0, le=50, description="Newest items to include per collection"),
+    db: Session = Depends(get_read_db),
     _: object = Depends(require_roles("Admin")),
 ):
-    emp = (
-        db.query(Employee)
-        .options(
-            selectinload(Employee.attendances),
-            selectinload(Employee.leaves),
-            selectinload(Employee.activities),
-            selectinload(Employee.productivity),
-            selectinload(Employee.alerts),
-            selectinload(Employee.department),
-            selectinload(Employee.team),
-        )
-        .filter(Employee.id == emp_id)
-        .first()
-    )
+    """
+    Profile, per-collection counts and the `recent` newest attendances,
+    leaves, activities, productivity records, screenshots and alerts.
+    Page through a full collection with GET /employees/{emp_id}/<collection>.
+    """
+    detail = get_employee_detail(db, emp_id, recent=recent)
+    if not detail:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    return detail
 
-    if not emp:
+
+# ====================================================
+# Employee sub-collections (cursor-paginated, newest first)
+# ====================================================
+def _collection_page(
+    db: Session,
+    response: Response,
+    emp_id: int,
+    collection: str,
+    limit: int,
+    cursor: Optional[str],
+):
+    if not get_employee_by_id(db, emp_id):
         raise HTTPException(status_code=404, detail="Employee not found")
+    try:
+        rows, next_cursor = list_employee_collection_page(db, emp_id, collection, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return rows
 
-    return attach_extra_fields(emp)
+
+@router.get("/{emp_id}/attendances", response_model=List[AttendanceOut])
+def list_employee_attendances(
+    emp_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    _: object = Depends(require_roles("Admin")),
+):
+    return _collection_page(db, response, emp_id, "attendances", limit, cursor)
+
+
+@router.get("/{emp_id}/leaves", response_model=List[LeaveOut])
+def list_employee_leaves(
+    emp_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    _: object = Depends(require_roles("Admin")),
+):
+    return _collection_page(db, response, emp_id, "leaves", limit, cursor)
+
+
+@router.get("/{emp_id}/activities", response_model=List[ActivityOut])
+def list_employee_activities(
+    emp_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    _: object = Depends(require_roles("Admin")),
+):
+    return _collection_page(db, response, emp_id, "activities", limit, cursor)
+
+
+@router.get("/{emp_id}/productivity", response_model=List[ProductivityOut])
+def list_employee_productivity(
+    emp_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    _: object = Depends(require_roles("Admin")),
+):
+    return _collection_page(db, response, emp_id, "productivity", limit, cursor)
+
+
+@router.get("/{emp_id}/screenshots", response_model=List[ScreenshotResponse])
+def list_employee_screenshots(
+    emp_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    _: object = Depends(require_roles("Admin")),
+):
+    return _collection_page(db, response, emp_id, "screenshots", limit, cursor)
+
+
+@router.get("/{emp_id}/alerts", response_model=List[AlertRead])
+def list_employee_alerts(
+    emp_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    _: object = Depends(require_roles("Admin")),
+):
+    return _collection_page(db, response, emp_id, "alerts", limit, cursor)
 
 
 # ====================================================
@@ -1,17 +1,28 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from datetime import datetime
+from typing import Optional
+from app.core.database import get_read_db
 from app.utils.auth import get_current_user
-from app.models.activity import Activity
-from app.services.ai_service import identify_productivity_bottlenecks, workload_distribution
+from app.services.ai_service import workload_distribution_from_counts
+from app.services.analytics_service import unproductive_counts
+from app.services.rollup_service import productive_counts
 
 router = APIRouter(prefix="/insights", tags=["insights"])
 
 @router.get("/employee/{employee_id}")
-def employee_insights(employee_id: int, db: Session = Depends(get_db)):
-    activities = db.query(Activity).filter(Activity.employee_id == employee_id).all()
-    data = [{"app_name": a.app_name, "website_url": a.website_url, "productive": a.productive} for a in activities]
+def employee_insights(
+    employee_id: int,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+):
+    start_dt = datetime.fromisoformat(start) if start else None
+    end_dt = datetime.fromisoformat(end) if end else None
+
+    total, productive = productive_counts(db, [employee_id], start_dt, end_dt).get(employee_id, (0, 0))
+    top_unproductive = unproductive_counts(db, [employee_id], start_dt, end_dt, limit=5)
     return {
-        "bottlenecks": identify_productivity_bottlenecks(data),
-        "workload_distribution": workload_distribution(data)
+        "bottlenecks": list(top_unproductive.items()),  # Top 5 bottlenecks
+        "workload_distribution": workload_distribution_from_counts(total, productive)
     }
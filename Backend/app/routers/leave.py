@@ -7,6 +7,7 @@ from app.models.leave import Leave
 from app.models.employee import Employee
 from app.models.attendance import Attendance
 from app.utils.auth import get_current_user
+from app.utils.auth_cache import Principal
 from app.core.database import get_db
 
 router = APIRouter(prefix="/leave", tags=["Leave Management"])
@@ -22,7 +23,7 @@ def apply_leave(
     end_date: date,
     reason: str = None,
     db: Session = Depends(get_db),
-    current_user: Employee = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     # --- Validation ---
     if start_date > end_date:
@@ -88,7 +89,7 @@ def apply_leave(
 @router.get("/all")
 def get_all_leaves(
     db: Session = Depends(get_db),
-    current_user: Employee = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     if current_user.role.lower() != "admin":
         raise HTTPException(status_code=403, detail="Access denied. Admins only.")
@@ -120,7 +121,7 @@ def get_all_leaves(
 @router.get("/my")
 def get_my_leaves(
     db: Session = Depends(get_db),
-    current_user: Employee = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     leaves = db.query(Leave).filter(Leave.employee_id == current_user.id).order_by(Leave.start_date.desc()).all()
 
@@ -148,7 +149,7 @@ def update_leave_status(
     leave_id: int,
     action: str,
     db: Session = Depends(get_db),
-    current_user: Employee = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     if current_user.role.lower() != "admin":
         raise HTTPException(status_code=403, detail="Access denied. Admins only.")
@@ -185,7 +186,7 @@ def get_monthly_summary(
     year: int,
     month: int,
     db: Session = Depends(get_db),
-    current_user: Employee = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     if current_user.role.lower() != "admin":
         raise HTTPException(status_code=403, detail="Access denied. Admins only.")
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import date
 from typing import Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import get_async_db, get_async_read_db
+from app.core.config import CACHE_TTL_PRODUCTIVITY_SUMMARY, PRODUCTIVITY_COMPUTE_MAX_DAYS
 from app.utils.auth import get_current_user
 from app.schemas.productivity import SummaryMetrics, ProductivityOut
 from app.services.productivity_service import (
@@ -12,40 +13,65 @@ from app.services.productivity_service import (
     compute_and_store_productivity,
     get_productivity_by_employee,
 )
+from app.utils.response_cache import response_cache
 
 router = APIRouter(prefix="/productivity", tags=["productivity"])
 
 
 # --------------------------------------------------
-# Logged-in user's productivity (SYNC)
+# Logged-in user's productivity (sync service on the async session)
 # --------------------------------------------------
 @router.get("/", response_model=ProductivityOut)
-def my_productivity(
-    db: Session = Depends(get_db),
+async def my_productivity(
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_user),
 ):
-    return calculate_employee_productivity(db, user.id)
+    return await db.run_sync(calculate_employee_productivity, user.id)
 
 
 # --------------------------------------------------
-# Summary metrics (ASYNC)
+# Summary metrics (ASYNC, cached)
 # --------------------------------------------------
 @router.get("/summary", response_model=SummaryMetrics)
-async def summary(db: AsyncSession = Depends(get_db)):
-    return await get_summary_metrics(db)
+async def summary(db: AsyncSession = Depends(get_async_read_db)):
+    async def compute():
+        return (await get_summary_metrics(db)).model_dump()
+
+    return await response_cache.get_or_compute(
+        "productivity", "summary", CACHE_TTL_PRODUCTIVITY_SUMMARY, compute
+    )
 
 
 # --------------------------------------------------
-# Recompute productivity (ASYNC)
+# Recompute productivity (ASYNC, idempotent)
 # --------------------------------------------------
 @router.post("/compute")
 async def compute(
-    period: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    period: Optional[date] = Query(None, description="Single day; shorthand for start=end=period"),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    count = await compute_and_store_productivity(db, period)
-    await db.commit()
-    return {"status": "ok", "computed": count}
+    """
+    Upsert one productivity row per employee and day in [start, end]
+    (default: today). Re-running a range updates rows instead of adding them.
+    """
+    start = start or period or date.today()
+    end = end or period or start
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must be on or before end")
+    if (end - start).days + 1 > PRODUCTIVITY_COMPUTE_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range exceeds {PRODUCTIVITY_COMPUTE_MAX_DAYS} days")
+
+    result = await compute_and_store_productivity(db, start, end)
+    return {
+        "status": "ok",
+        "start": start,
+        "end": end,
+        "computed": result["written"],
+        "inserted": result["inserted"],
+        "updated": result["updated"],
+    }
 
 
 # --------------------------------------------------
@@ -57,6 +83,6 @@ async def compute(
 )
 async def employee_productivity(
     employee_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     return await get_productivity_by_employee(db, employee_id)
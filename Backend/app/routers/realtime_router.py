@@ -1,40 +1,31 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException
-from typing import List
-import json, asyncio, os
 import redis.asyncio as aioredis
-from jose import jwt, JWTError
-from app.core.config import SECRET_KEY, ALGORITHM
+from app.core.config import REDIS_URL
+from app.services.realtime_service import (
+    manager,
+    Frame,
+    IngestLimiter,
+    frame_topics,
+    default_topics,
+    can_subscribe,
+    negotiate_encoding,
+    receive_frame,
+)
+from app.services.realtime_presence import RedisFanout, PresenceRegistry
+from app.services.realtime_state import STATE_CHANNEL, changes_from_frame, live_state
+from app.utils.auth import authenticate_token, require_roles
 
 router = APIRouter(prefix="/realtime", tags=["realtime"])
 
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-
-    def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-
-    async def broadcast(self, message: dict):
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception:
-                pass
-
-manager = ConnectionManager()
-
 
 redis_client = None
+fanout = None                      # RedisFanout when Redis is available
+presence = PresenceRegistry(None)  # replaced with a Redis-backed registry on startup
 
 async def init_redis():
     global redis_client
     try:
-        redis_client = aioredis.from_url("redis://localhost:6379", decode_responses=True)
+        redis_client = aioredis.from_url(REDIS_URL, decode_responses=False)  # binary envelopes
         await redis_client.ping()
         print(" Connected to Redis")
     except Exception:
@@ -42,8 +33,36 @@ async def init_redis():
         redis_client = None
 
 
+def _parse_topics(raw) -> list:
+    if isinstance(raw, str):
+        raw = raw.split(",")
+    return [t.strip() for t in raw or [] if isinstance(t, str) and t.strip()]
+
+
+def _parse_seq(raw):
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        return None
+
+
 @router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
+    """
+    Agents send frames; dashboards receive the frames of the topics they
+    subscribe to (?topics=team:3,employee:7, or the role's default scope).
+    Send {"type": "subscribe" | "unsubscribe", "topics": [...]} to change
+    subscriptions on an open socket.
+
+    Offer the "msgpack" subprotocol (or ?encoding=msgpack) to exchange
+    binary MessagePack frames instead of JSON text.
+
+    Add ?state=1 for the live employee state of those topics: a
+    "state.snapshot" first, then "state.delta" frames. Reconnect with
+    ?since_seq=<last seq>&epoch=<epoch> to receive only the missed deltas
+    (after a "state.resume" frame) when they are still buffered; send
+    {"type": "state.resync", "since_seq": ..., "epoch": ...} on a gap.
+    """
     #  JWT validation on connect
     token = websocket.query_params.get("token")
     if not token:
@@ -51,54 +70,123 @@ async def websocket_endpoint(websocket: WebSocket):
         return
 
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email = payload.get("sub")
-        if not email:
-            raise HTTPException(status_code=401, detail="Invalid token")
-    except JWTError:
+        principal = await authenticate_token(token)
+    except HTTPException:
         await websocket.close(code=4002)
         return
 
+    topics = _parse_topics(websocket.query_params.get("topics")) or default_topics(principal)
+    if not all(can_subscribe(principal, t) for t in topics):
+        await websocket.close(code=4003)
+        return
+
     # Accept connection
-    await manager.connect(websocket)
-    user_channel = f"stream:{email}"
+    encoding, subprotocol = negotiate_encoding(websocket)
+    await websocket.accept(subprotocol=subprotocol)
+    sub = manager.connect(websocket, principal, topics, encoding)
+    await presence.connected(principal)
+    publish_topics = frame_topics(principal)
+
+    live = websocket.query_params.get("state", "").lower() in ("1", "true", "yes")
+    if live:
+        live_state.sync(
+            sub,
+            since_seq=_parse_seq(websocket.query_params.get("since_seq")),
+            epoch=websocket.query_params.get("epoch"),
+        )
+
+    async def publish(data: dict, key: str):
+        # Publish to the topic channels in Redis or fan out directly; either way encoded once per format
+        frame = Frame(data)
+        if fanout:
+            await fanout.publish(frame, publish_topics, key)
+        else:
+            manager.publish(frame, publish_topics, key)
+        await live_state.update_principal(principal, changes_from_frame(data))
+
+    # Rate-limited per connection (live state included); bursts are coalesced, not slept on
+    limiter = IngestLimiter(publish)
 
     try:
-        # Loop to receive messages (compressed or limited)
+        # Loop to receive messages
         while True:
-            data = await websocket.receive_json()
-            data["user"] = email
+            data = await receive_frame(websocket, encoding)
+
+            if data.get("type") in ("subscribe", "unsubscribe"):
+                requested = _parse_topics(data.get("topics"))
+                if data["type"] == "unsubscribe":
+                    manager.unsubscribe(sub, requested)
+                else:
+                    manager.subscribe(sub, [t for t in requested if can_subscribe(principal, t)])
+                if live:
+                    live_state.sync(sub)
+                sub.enqueue({"type": "subscriptions", "topics": sorted(sub.topics)})
+                continue
+
+            if data.get("type") == "state.resync":
+                live = True
+                live_state.sync(sub, since_seq=_parse_seq(data.get("since_seq")), epoch=data.get("epoch"))
+                continue
+
+            data["user"] = principal.email
+            data["employee_id"] = principal.id
             data["timestamp"] = data.get("timestamp", None)
-
-            # Publish to Redis or broadcast directly
-            if redis_client:
-                await redis_client.publish(user_channel, json.dumps(data))
-            else:
-                await manager.broadcast(data)
-
-            #  Throttle frame rate (1 frame/second)
-            await asyncio.sleep(1)
+            # Coalescing key: only the latest frame per sender and type matters
+            key = f"{principal.id}:{data.get('type', 'frame')}"
+            await limiter.submit(data, key)
 
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
+        pass
     except Exception as e:
         print("WebSocket Error:", e)
         await websocket.close()
-
-
-async def redis_subscriber():
-    if not redis_client:
-        return
-    pubsub = redis_client.pubsub()
-    await pubsub.psubscribe("stream:*")
-    async for message in pubsub.listen():
-        if message and message["type"] == "pmessage":
-            data = json.loads(message["data"])
-            await manager.broadcast(data)
+    finally:
+        await limiter.close()
+        await manager.disconnect(sub)
+        await presence.disconnected(principal)
+
+
+@router.get("/stats")
+def realtime_stats(_=Depends(require_roles("Admin"))):
+    """Connections, queue depth and dropped/coalesced frame counts for this worker."""
+    return manager.stats()
+
+
+@router.get("/online")
+async def online_employees(current_user=Depends(require_roles("Admin", "Manager"))):
+    """
+    Employees with an open realtime connection on any worker, with the
+    workers holding them. Managers see their own team and department.
+    """
+    entries = await presence.online()
+    if current_user.role != "Admin":
+        entries = [
+            e for e in entries
+            if (current_user.team_id is not None and e["team_id"] == current_user.team_id)
+            or (current_user.department_id is not None and e["department_id"] == current_user.department_id)
+        ]
+    return entries
 
 
 @router.on_event("startup")
 async def on_startup():
+    global fanout, presence
     await init_redis()
     if redis_client:
-        asyncio.create_task(redis_subscriber())
+        live_state.client = redis_client
+        fanout = RedisFanout(redis_client, manager)
+        fanout.channel_handlers[STATE_CHANNEL] = live_state.handle_redis
+        await fanout.start()
+        await live_state.request_rows()
+        presence = PresenceRegistry(redis_client)
+        presence.start()
+
+
+@router.on_event("shutdown")
+async def on_shutdown():
+    if fanout:
+        await fanout.stop()
+    live_state.client = None
+    await presence.stop()
+    if redis_client:
+        await redis_client.aclose()
@@ -5,6 +5,7 @@ from app.schemas.team import TeamCreate, TeamUpdate, TeamResponse
 from app.models.team import Team
 from app.models.department import Department
 from app.utils.auth import require_roles
+from app.utils.auth_cache import invalidate_principals_in
 
 router = APIRouter(prefix="/teams", tags=["Teams"])
 
@@ -78,4 +79,5 @@ def delete_team(
 
     db.delete(team)
     db.commit()
+    invalidate_principals_in(team_ids=[team_id])
     return {"message": "Team deleted successfully"}
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 # ---------------------------
@@ -36,3 +36,18 @@ class ActivityResponse(ActivityBase):
     class Config:
         # ✅ Pydantic v2 syntax
         from_attributes = True  # replaces orm_mode=True
+
+
+# ---------------------------
+# Schemas for batched ingestion
+# ---------------------------
+class ActivityBatchItemResult(BaseModel):
+    index: int                   # position of the record in the submitted batch
+    status: str                  # "accepted" or "rejected"
+    error: Optional[str] = None
+
+
+class ActivityBatchResponse(BaseModel):
+    accepted: int
+    rejected: int
+    results: List[ActivityBatchItemResult]
@@ -1,7 +1,7 @@
 # app/schemas/admin_schemas.py
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
 
 class ProductiveEntityCreate(BaseModel):
     name: str
@@ -35,5 +35,31 @@ class ReportLogResponse(BaseModel):
 
 class OrgSummary(BaseModel):
     average_productivity_score: float
-    total_tasks_completed: int
     average_hours_logged: float
+
+class TeamSummary(OrgSummary):
+    team_id: int
+    team_name: Optional[str] = None
+
+class DepartmentSummary(OrgSummary):
+    department_id: int
+    department_name: Optional[str] = None
+
+class ReclassifyRequest(BaseModel):
+    start: date
+    end: date
+    chunk_size: int = Field(5000, ge=100, le=50000)
+
+class ReclassifyJobResponse(BaseModel):
+    id: str
+    start: date
+    end: date
+    chunk_size: int
+    status: str  # "running", "completed", "failed", "cancelled"
+    progress: float  # percent of the id range processed
+    scanned: int
+    updated: int
+    last_id: Optional[int] = None
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -1,7 +1,10 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, EmailStr
 from datetime import datetime, date
 
+from app.schemas.screenshot import ScreenshotResponse
+from app.schemas.alert import AlertRead
+
 
 class AttendanceOut(BaseModel):
     id: int
@@ -32,7 +35,9 @@ class LeaveOut(BaseModel):
 
 class ActivityOut(BaseModel):
     id: int
-    description: str
+    activity_type: Optional[str] = None
+    name: Optional[str] = None
+    description: Optional[str] = None
     timestamp: datetime
 
     class Config:
@@ -42,7 +47,7 @@ class ActivityOut(BaseModel):
 
 class ProductivityOut(BaseModel):
     id: int
-    score: float
+    score: Optional[float] = None
     date: date
 
     class Config:
@@ -95,8 +100,9 @@ class EmployeeResponse(BaseModel):
     leaves: List[LeaveOut] = []
     activities: List[ActivityOut] = []
     productivity: List[ProductivityOut] = []
-    screenshots: list = []
-    alerts: list = []
+    screenshots: List[ScreenshotResponse] = []
+    alerts: List[AlertRead] = []
+    counts: Dict[str, int] = {}  # full size of each collection above
 
     productivity_score: float = 0
     tasks_completed: int = 0
@@ -107,7 +113,7 @@ class EmployeeResponse(BaseModel):
 
 
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import List, Optional
 
 class EmployeeListResponse(BaseModel):
     id: int
@@ -130,6 +136,21 @@ class EmployeeListResponse(BaseModel):
     productivity_score: float = 0
     tasks_completed: int = 0
     hours_logged: float = 0
+    latest_productivity_score: Optional[float] = None
 
     class Config:
         from_attributes = True
+
+
+class EmployeeBulkRowResult(BaseModel):
+    row: int                   # 0-based position in the uploaded list / CSV data rows
+    status: str                # "created" or "error"
+    email: Optional[str] = None
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class EmployeeBulkResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[EmployeeBulkRowResult]
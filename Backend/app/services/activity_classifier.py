@@ -0,0 +1,210 @@
+# app/services/activity_classifier.py
+"""
+Server-side productive/unproductive classification of activities.
+
+The ProductiveEntity catalogue is compiled into an in-memory matcher:
+  - apps:     exact, case-insensitive name lookup
+  - websites: domain-suffix trie, so "youtube.com" also covers "m.youtube.com"
+              (the longest matching suffix wins)
+  - names containing * or ? are wildcard patterns, checked after the exact
+    structures through one combined regex per entity type
+
+Reloads build a new matcher and swap it in, so classification never
+waits on a lock. Periodic refreshes run on a background thread: callers,
+including async request handlers, only ever read the cached matcher.
+Every load is numbered when it starts and a load never replaces one that
+started after it, so a slow refresh cannot undo an admin's edit.
+"""
+import fnmatch
+import re
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+
+from sqlalchemy.orm import Session
+
+from app.core.config import ACTIVITY_CLASSIFIER_REFRESH_SECONDS
+from app.core.database import SessionLocal
+from app.models.productive_entity import ProductiveEntity
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_TERMINAL = "$"
+_CACHE_LIMIT = 50000
+
+
+def normalize_host(value: str) -> str:
+    """'https://www.Example.com:443/path' -> 'www.example.com'"""
+    value = value.strip().lower()
+    if "://" in value:
+        value = urlsplit(value).hostname or ""
+    else:
+        value = value.split("/", 1)[0].rsplit("@", 1)[-1].split(":", 1)[0]
+    return value.rstrip(".")
+
+
+def _compile_patterns(patterns) -> Tuple[Optional[re.Pattern], list]:
+    if not patterns:
+        return None, []
+    parts = [f"(?P<p{i}>{fnmatch.translate(p)})" for i, (p, _) in enumerate(patterns)]
+    return re.compile("|".join(parts)), [productive for _, productive in patterns]
+
+
+class ProductiveMatcher:
+    def __init__(self, entities: Iterable[Tuple[str, str, bool]]):
+        """entities: (name, entity_type, productive) rows from the catalogue."""
+        self.apps: Dict[str, bool] = {}
+        self.domains: dict = {}
+        app_patterns, site_patterns = [], []
+
+        for name, entity_type, productive in entities:
+            name = (name or "").strip().lower()
+            if not name:
+                continue
+            is_pattern = "*" in name or "?" in name
+            if entity_type == "website":
+                if is_pattern:
+                    site_patterns.append((name, productive))
+                else:
+                    self._add_domain(normalize_host(name), productive)
+            elif is_pattern:
+                app_patterns.append((name, productive))
+            else:
+                self.apps[name] = productive
+
+        self.app_regex, self.app_values = _compile_patterns(app_patterns)
+        self.site_regex, self.site_values = _compile_patterns(site_patterns)
+        self._cache: Dict[Tuple[bool, str], Optional[bool]] = {}
+
+    def _add_domain(self, host: str, productive: bool) -> None:
+        node = self.domains
+        for label in reversed(host.split(".")):
+            node = node.setdefault(label, {})
+        node[_TERMINAL] = productive
+
+    def _match_domain(self, host: str) -> Optional[bool]:
+        node = self.domains
+        found = None
+        for label in reversed(host.split(".")):
+            node = node.get(label)
+            if node is None:
+                break
+            found = node.get(_TERMINAL, found)
+        return found
+
+    @staticmethod
+    def _match_pattern(regex, values, value: str) -> Optional[bool]:
+        if regex is None:
+            return None
+        m = regex.match(value)
+        return values[int(m.lastgroup[1:])] if m else None
+
+    def match(self, activity_type: Optional[str], name: Optional[str]) -> Optional[bool]:
+        """True/False when the catalogue knows `name`, None otherwise."""
+        if not name:
+            return None
+        is_site = (activity_type or "").lower() == "website"
+        key = (is_site, name)
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+
+        if is_site:
+            host = normalize_host(name)
+            result = self._match_domain(host)
+            if result is None:
+                result = self._match_pattern(self.site_regex, self.site_values, host)
+        else:
+            lowered = name.strip().lower()
+            result = self.apps.get(lowered)
+            if result is None:
+                result = self._match_pattern(self.app_regex, self.app_values, lowered)
+
+        if len(self._cache) >= _CACHE_LIMIT:
+            self._cache.clear()
+        self._cache[key] = result
+        return result
+
+
+class ActivityClassifier:
+    """Process-wide holder of the current matcher, reloaded on catalogue changes."""
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._matcher: Optional[ProductiveMatcher] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()  # one background refresh at a time
+        self._swap_lock = threading.Lock()
+        self._started = 0  # number of the latest load to start
+        self._installed = 0  # number of the load behind self._matcher
+
+    def reload(self, db: Optional[Session] = None) -> None:
+        with self._swap_lock:
+            self._started += 1
+            load = self._started
+        own_session = db is None
+        if own_session:
+            db = SessionLocal()
+        try:
+            rows = db.query(
+                ProductiveEntity.name,
+                ProductiveEntity.entity_type,
+                ProductiveEntity.productive,
+            ).all()
+        finally:
+            if own_session:
+                db.close()
+        matcher = ProductiveMatcher(rows)
+        with self._swap_lock:
+            if load < self._installed:
+                # A later load (e.g. after a catalogue edit) already swapped in newer rows
+                logger.info("Discarded a stale activity classifier load")
+                return
+            self._matcher = matcher
+            self._installed = load
+            self._loaded_at = time.monotonic()
+        logger.info("Loaded %d productive entities into the activity classifier", len(rows))
+
+    def _refresh(self) -> None:
+        # Runs on its own thread with self._lock held
+        try:
+            self.reload()
+        except Exception as e:
+            # Never fail ingestion over the catalogue; retry on the next refresh
+            logger.error("Activity classifier reload failed: %s", e)
+            self._loaded_at = time.monotonic()
+        finally:
+            self._lock.release()
+
+    def matcher(self) -> ProductiveMatcher:
+        matcher = self._matcher
+        if matcher is None:
+            # First use only; startup warms it off the event loop
+            with self._lock:
+                if self._matcher is None:
+                    try:
+                        self.reload()
+                    except Exception as e:
+                        logger.error("Activity classifier reload failed: %s", e)
+                        self._matcher = ProductiveMatcher([])
+                        self._loaded_at = time.monotonic()
+            return self._matcher
+
+        # Periodic refresh picks up catalogue edits made by other worker
+        # processes; the stale matcher keeps serving until it is swapped
+        if time.monotonic() - self._loaded_at > self.refresh_seconds and self._lock.acquire(blocking=False):
+            threading.Thread(target=self._refresh, name="classifier-refresh", daemon=True).start()
+        return matcher
+
+    def classify(self, activity_type: Optional[str], name: Optional[str]) -> Optional[str]:
+        """'Yes' / 'No' for catalogued apps and sites, None when unknown."""
+        result = self.matcher().match(activity_type, name)
+        if result is None:
+            return None
+        return "Yes" if result else "No"
+
+
+classifier = ActivityClassifier(refresh_seconds=ACTIVITY_CLASSIFIER_REFRESH_SECONDS)
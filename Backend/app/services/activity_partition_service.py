@@ -0,0 +1,282 @@
+# app/services/activity_partition_service.py
+"""
+Monthly range partitioning and retention for the `activities` table.
+
+On PostgreSQL the table is converted to a declaratively partitioned table
+by the `0002_partition_activities` migration (one partition per calendar
+month of `timestamp`, plus `activities_default` for stragglers). This
+module keeps upcoming partitions created and retires old ones by
+detaching them — dropping or archiving a whole month is a catalog
+operation, not a row-by-row DELETE.
+
+Other dialects (SQLite in development/tests) have no native partitioning;
+there retention falls back to moving a month's rows into a per-month
+`activities_archive_yYYYYmMM` table and deleting them by timestamp range.
+
+Every worker runs the maintenance loop; on PostgreSQL a session advisory
+lock lets one of them do a given round while the others skip it.
+"""
+import asyncio
+from datetime import date, datetime
+from typing import List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    ACTIVITY_PARTITION_MONTHS_AHEAD,
+    ACTIVITY_RETENTION_MONTHS,
+    ACTIVITY_RETENTION_ARCHIVE,
+    ACTIVITY_MAINTENANCE_INTERVAL_HOURS,
+)
+from app.core.database import SessionLocal, engine
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PARENT_TABLE = "activities"
+DEFAULT_PARTITION = "activities_default"
+MAINTENANCE_LOCK_KEY = 0x61637469766974  # pg_try_advisory_lock key, "activit"
+
+
+# ---------------------------
+# Month helpers
+# ---------------------------
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + (value.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def archive_name(month: date) -> str:
+    return f"{PARENT_TABLE}_archive_y{month.year:04d}m{month.month:02d}"
+
+
+def _month_from_name(name: str) -> Optional[date]:
+    # activities_y2026m10 -> 2026-10-01
+    suffix = name[len(PARENT_TABLE) + 1:]
+    if len(suffix) != 8 or suffix[0] != "y" or suffix[5] != "m":
+        return None
+    try:
+        return date(int(suffix[1:5]), int(suffix[6:8]), 1)
+    except ValueError:
+        return None
+
+
+# ---------------------------
+# Introspection
+# ---------------------------
+def is_partitioned(db: Session) -> bool:
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return db.execute(
+        text(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = :name AND pg_table_is_visible(c.oid)"
+        ),
+        {"name": PARENT_TABLE},
+    ).first() is not None
+
+
+def list_partitions(db: Session) -> List[date]:
+    """Months that currently have an attached partition, oldest first."""
+    rows = db.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE parent.relname = :name AND pg_table_is_visible(parent.oid)"
+        ),
+        {"name": PARENT_TABLE},
+    ).scalars().all()
+    months = [_month_from_name(name) for name in rows]
+    return sorted(m for m in months if m is not None)
+
+
+# ---------------------------
+# Partition creation
+# ---------------------------
+def create_month_partition(db: Session, month: date) -> None:
+    """
+    Create and attach the partition for `month`.
+
+    Rows for that month that landed in the default partition are moved
+    first, otherwise ATTACH would reject the overlapping range.
+    """
+    name = partition_name(month)
+    lower, upper = month, add_months(month, 1)
+    params = {"lower": datetime.combine(lower, datetime.min.time()),
+              "upper": datetime.combine(upper, datetime.min.time())}
+
+    db.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {name} "
+        f"(LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    ))
+    db.execute(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+        f"WHERE timestamp >= :lower AND timestamp < :upper RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    ), params)
+    db.execute(text(
+        f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{params['lower'].isoformat(sep=' ')}') "
+        f"TO ('{params['upper'].isoformat(sep=' ')}')"
+    ))
+    db.commit()
+    logger.info("Created activity partition %s", name)
+
+
+def ensure_partitions(db: Session, months_ahead: int = ACTIVITY_PARTITION_MONTHS_AHEAD) -> List[str]:
+    """Make sure partitions exist for the current month and `months_ahead` after it."""
+    if not is_partitioned(db):
+        return []
+
+    existing = set(list_partitions(db))
+    current = month_start(datetime.utcnow().date())
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if month not in existing:
+            create_month_partition(db, month)
+            created.append(partition_name(month))
+    return created
+
+
+# ---------------------------
+# Retention
+# ---------------------------
+def apply_retention(
+    db: Session,
+    keep_months: int = ACTIVITY_RETENTION_MONTHS,
+    archive: bool = ACTIVITY_RETENTION_ARCHIVE,
+) -> List[str]:
+    """
+    Retire activity months older than `keep_months` (the current month counts as one).
+
+    Partitioned: detach each expired partition, then rename it to
+    activities_archive_yYYYYmMM (archive=True) or drop it.
+    Returns the names of the retired months' tables.
+    """
+    if keep_months <= 0:
+        return []
+
+    cutoff = add_months(month_start(datetime.utcnow().date()), -(keep_months - 1))
+
+    if not is_partitioned(db):
+        return _apply_retention_unpartitioned(db, cutoff, archive)
+
+    retired = []
+    for month in list_partitions(db):
+        if month >= cutoff:
+            continue
+        name = partition_name(month)
+        db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+        if archive:
+            db.execute(text(f"ALTER TABLE {name} RENAME TO {archive_name(month)}"))
+        else:
+            db.execute(text(f"DROP TABLE {name}"))
+        db.commit()
+        retired.append(name)
+        logger.info("Retired activity partition %s (%s)", name, "archived" if archive else "dropped")
+    return retired
+
+
+def _apply_retention_unpartitioned(db: Session, cutoff: date, archive: bool) -> List[str]:
+    """Fallback for dialects without partitioning: move/delete expired rows month by month."""
+    cutoff_dt = datetime.combine(cutoff, datetime.min.time())
+    oldest = db.execute(
+        text(f"SELECT MIN(timestamp) FROM {PARENT_TABLE} WHERE timestamp < :cutoff"),
+        {"cutoff": cutoff_dt},
+    ).scalar()
+    if oldest is None:
+        return []
+    if isinstance(oldest, str):
+        oldest = datetime.fromisoformat(oldest)
+
+    retired = []
+    month = month_start(oldest.date() if isinstance(oldest, datetime) else oldest)
+    while month < cutoff:
+        params = {"lower": datetime.combine(month, datetime.min.time()),
+                  "upper": datetime.combine(add_months(month, 1), datetime.min.time())}
+        if archive:
+            name = archive_name(month)
+            db.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name} AS "
+                f"SELECT * FROM {PARENT_TABLE} WHERE 1 = 0"
+            ))
+            db.execute(text(
+                f"INSERT INTO {name} SELECT * FROM {PARENT_TABLE} "
+                f"WHERE timestamp >= :lower AND timestamp < :upper"
+            ), params)
+        deleted = db.execute(text(
+            f"DELETE FROM {PARENT_TABLE} WHERE timestamp >= :lower AND timestamp < :upper"
+        ), params).rowcount
+        db.commit()
+        if deleted:
+            retired.append(partition_name(month))
+        month = add_months(month, 1)
+    return retired
+
+
+# ---------------------------
+# Background maintenance
+# ---------------------------
+def run_maintenance() -> dict:
+    """
+    One maintenance round. On PostgreSQL it runs only while holding the
+    maintenance advisory lock; when another worker holds it, the round is
+    skipped ({"skipped": True}).
+    """
+    lock_conn = None
+    if engine.dialect.name == "postgresql":
+        # Session-level lock on its own autocommit connection: the round
+        # commits several times, and the lock must outlive each of them
+        lock_conn = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        acquired = lock_conn.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": MAINTENANCE_LOCK_KEY}
+        ).scalar()
+        if not acquired:
+            lock_conn.close()
+            return {"created": [], "retired": [], "skipped": True}
+
+    db = SessionLocal()
+    try:
+        created = ensure_partitions(db)
+        retired = apply_retention(db)
+        return {"created": created, "retired": retired, "skipped": False}
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+        if lock_conn is not None:
+            try:
+                lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MAINTENANCE_LOCK_KEY})
+            finally:
+                lock_conn.close()
+
+
+async def maintenance_loop() -> None:
+    """
+    Create upcoming partitions and apply retention every
+    ACTIVITY_MAINTENANCE_INTERVAL_HOURS, until cancelled.
+    """
+    while True:
+        try:
+            result = await run_in_threadpool(run_maintenance)
+            if result["created"] or result["retired"]:
+                logger.info("Activity partition maintenance: %s", result)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Activity partition maintenance failed: %s", e)
+        await asyncio.sleep(ACTIVITY_MAINTENANCE_INTERVAL_HOURS * 3600)
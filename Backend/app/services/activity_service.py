@@ -1,34 +1,35 @@
 # app/services/activity_service.py
 
-from typing import List, Optional
-from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+from datetime import datetime, timezone
 
 # Async imports
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert, tuple_
 
 # Sync imports
 from sqlalchemy.orm import Session
 
+from app.core.config import (
+    ACTIVITY_QUEUE_MAX_ROWS,
+    ACTIVITY_FLUSH_MAX_ROWS,
+    ACTIVITY_FLUSH_INTERVAL_SECONDS,
+    ACTIVITY_FLUSH_MAX_ATTEMPTS,
+    ACTIVITY_FLUSH_RETRY_BACKOFF_SECONDS,
+)
+from app.core.database import ReadSessionLocal
 from app.models.activity import Activity
-from app.schemas.activity import ActivityCreate
+from app.schemas.activity import ActivityCreate, ActivityResponse
+from app.services.activity_classifier import classifier
+from app.services.activity_write_buffer import ActivityWriteBuffer
+from app.services.rollup_service import apply_rollup_deltas
+from app.utils.pagination import encode_cursor, decode_cursor
 
 
 
 async def create_activity(db: AsyncSession, act_in: ActivityCreate) -> Activity:
     """Create a new activity record (async)."""
-    act = Activity(
-        employee_id=act_in.employee_id,
-        activity_type=act_in.activity_type,
-        name=act_in.name,
-        start_at=act_in.start_at,
-        end_at=act_in.end_at,
-        duration_seconds=act_in.duration_seconds,
-        metadata=act_in.metadata,
-    )
-    db.add(act)
-    await db.flush()  
-    return act
+    return await db.run_sync(insert_activity, build_activity_values(act_in))
 
 async def list_activities(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Activity]:
     """List all activities with pagination (async)."""
@@ -55,10 +56,183 @@ async def list_activities_by_employee(
     return q.scalars().all()
 
 
-def log_activity(db: Session, activity: ActivityCreate) -> Activity:
-    """Record employee activity (sync)."""
-    db_activity = Activity(**activity.dict())
+# ---------------------------
+# Query helpers
+# ---------------------------
+def timestamp_range_filters(start: Optional[str] = None, end: Optional[str] = None) -> list:
+    """
+    Filters on Activity.timestamp for an optional ISO start/end, as the
+    half-open range [start, end) used by every activity query (see
+    `productive_counts`): back-to-back ranges never count a row twice.
+
+    `timestamp` is the partition key, so bounding queries with these lets
+    PostgreSQL skip months outside the range.
+    """
+    filters = []
+    if start:
+        filters.append(Activity.timestamp >= datetime.fromisoformat(start))
+    if end:
+        filters.append(Activity.timestamp < datetime.fromisoformat(end))
+    return filters
+
+
+def list_activities_page(
+    db: Session,
+    employee_id: int,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Activity], Optional[str]]:
+    """
+    One page of an employee's activities, newest first, keyset-paginated on
+    (timestamp, id). Returns the rows and the cursor for the next page
+    (None on the last page). Raises ValueError for a malformed cursor.
+    """
+    stmt = select(Activity).where(
+        Activity.employee_id == employee_id,
+        *timestamp_range_filters(start, end),
+    )
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != 2:
+            raise ValueError("Invalid cursor")
+        try:
+            last_ts, last_id = datetime.fromisoformat(values[0]), int(values[1])
+        except (TypeError, ValueError, IndexError):
+            raise ValueError("Invalid cursor")
+        stmt = stmt.where(tuple_(Activity.timestamp, Activity.id) < tuple_(last_ts, last_id))
+
+    rows = db.execute(
+        stmt.order_by(Activity.timestamp.desc(), Activity.id.desc()).limit(limit + 1)
+    ).scalars().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].id)
+    return rows, next_cursor
+
+
+def stream_activities_ndjson(
+    employee_id: int,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    chunk_size: int = 1000,
+) -> Iterator[str]:
+    """
+    Yield an employee's activities as NDJSON lines from a server-side cursor.
+
+    Opens its own (read replica) session because the response body is
+    produced after the request's dependencies have finished.
+    """
+    db = ReadSessionLocal()
+    try:
+        stmt = (
+            select(Activity)
+            .where(Activity.employee_id == employee_id, *timestamp_range_filters(start, end))
+            .order_by(Activity.timestamp.desc(), Activity.id.desc())
+            .execution_options(yield_per=chunk_size)
+        )
+        for activity in db.execute(stmt).scalars():
+            yield ActivityResponse.model_validate(activity).model_dump_json() + "\n"
+    finally:
+        db.close()
+
+
+# ---------------------------
+# Ingestion helpers (sync)
+# ---------------------------
+def build_activity_values(
+    activity: ActivityCreate,
+    employee=None,
+    timestamp: Optional[datetime] = None,
+) -> dict:
+    """
+    Map an ActivityCreate onto Activity column values.
+
+    When `employee` is given, the row is stamped with that employee's
+    id, department and team (client-supplied ids are ignored). `productive`
+    comes from the ProductiveEntity catalogue when it knows the app/site,
+    otherwise the client's value is kept.
+    """
+    if employee is not None:
+        employee_id = employee.id
+        department_id = employee.department_id
+        team_id = employee.team_id
+    else:
+        employee_id = activity.employee_id
+        department_id = activity.department_id
+        team_id = activity.team_id
+
+    ts = timestamp or activity.timestamp or datetime.utcnow()
+    # `activities.timestamp` is a naive UTC column
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return {
+        "employee_id": employee_id,
+        "department_id": department_id,
+        "team_id": team_id,
+        "activity_type": activity.activity_type,
+        "name": activity.name,
+        "description": activity.description,
+        "activity_metadata": activity.activity_metadata,
+        "start_at": activity.start_at,
+        "end_at": activity.end_at,
+        "duration_seconds": activity.duration_seconds,
+        "timestamp": ts,
+        "productive": classifier.classify(activity.activity_type, activity.name) or activity.productive,
+    }
+
+
+def bulk_insert_activities(db: Session, rows: List[dict]) -> int:
+    """
+    Insert many activity rows in one transaction (sync).
+
+    Uses a Core INSERT with a parameter list, which SQLAlchemy sends as
+    multi-row VALUES batches instead of one round-trip per row.
+    """
+    if not rows:
+        return 0
+    db.execute(insert(Activity), rows)
+    apply_rollup_deltas(db, rows)
+    db.commit()
+    return len(rows)
+
+
+def insert_activity(db: Session, values: dict) -> Activity:
+    """Insert a single activity row and update the daily rollup (sync)."""
+    db_activity = Activity(**values)
     db.add(db_activity)
+    apply_rollup_deltas(db, [values])
     db.commit()
     db.refresh(db_activity)
     return db_activity
+
+
+# Shared write-behind buffer; started from app startup when enabled
+write_buffer = ActivityWriteBuffer(
+    writer=bulk_insert_activities,
+    max_rows=ACTIVITY_QUEUE_MAX_ROWS,
+    flush_rows=ACTIVITY_FLUSH_MAX_ROWS,
+    flush_interval=ACTIVITY_FLUSH_INTERVAL_SECONDS,
+    max_attempts=ACTIVITY_FLUSH_MAX_ATTEMPTS,
+    retry_backoff=ACTIVITY_FLUSH_RETRY_BACKOFF_SECONDS,
+)
+
+
+def log_activity(db: Session, activity: ActivityCreate) -> Activity:
+    """
+    Record employee activity (sync).
+
+    With the write-behind buffer running the row is queued and a transient
+    (not yet persisted) Activity is returned; QueueFullError propagates
+    when the buffer is at capacity.
+    """
+    values = build_activity_values(activity)
+    if write_buffer.running:
+        write_buffer.submit([values])
+        return Activity(**values)
+
+    return insert_activity(db, values)
@@ -0,0 +1,281 @@
+# app/services/activity_write_buffer.py
+"""
+In-process write-behind buffer for activity ingestion.
+
+Request handlers hand rows to `submit()` and return immediately; a
+background asyncio task flushes the buffer in bulk whenever it reaches
+`flush_rows` or every `flush_interval` seconds, whichever comes first.
+
+Clients were already answered 202, so a failed flush is not the end of
+its rows. A batch that fails on a data error is split in halves until
+the offending rows are isolated, and the rest is written. Rows that still
+fail, and whole batches hit by a connection-level error, are retried
+with exponential backoff. They are counted as dropped only after
+`max_attempts` tries.
+"""
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import InterfaceError, OperationalError
+
+from app.core.database import SessionLocal
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised by submit() when accepting the rows would exceed the buffer bound."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Activity ingest queue is full")
+        self.retry_after = retry_after
+
+
+def _is_transient(error: Exception) -> bool:
+    # Connection loss, timeouts, failover: every row would fail the same way, so don't bisect
+    return isinstance(error, (OperationalError, InterfaceError))
+
+
+class ActivityWriteBuffer:
+    def __init__(
+        self,
+        writer: Callable,
+        max_rows: int,
+        flush_rows: int,
+        flush_interval: float,
+        max_attempts: int = 5,
+        retry_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+    ):
+        # writer(db, rows) persists a list of Activity column dicts
+        self.writer = writer
+        self.max_rows = max_rows
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+
+        # submit() is called from threadpool workers and the event loop alike
+        self._rows: deque = deque()
+        # (due monotonic time, attempts so far, rows) of failed writes, oldest first
+        self._retries: Deque[Tuple[float, int, List[dict]]] = deque()
+        self._retry_rows = 0
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+
+        # Metrics
+        self.enqueued_rows = 0
+        self.flushed_rows = 0
+        self.rejected_rows = 0   # refused with 429 because the buffer was full
+        self.dropped_rows = 0    # accepted but lost after max_attempts failed writes
+        self.retried_rows = 0    # row writes re-queued after a failure
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    @property
+    def depth(self) -> int:
+        # Rows awaiting a retry still hold their place, so an outage turns into 429s
+        return len(self._rows) + self._retry_rows
+
+    # ---------------------------
+    # Producer side
+    # ---------------------------
+    def submit(self, rows: List[dict]) -> None:
+        """Queue rows for the next flush, or raise QueueFullError (backpressure)."""
+        with self._lock:
+            if self.depth + len(rows) > self.max_rows:
+                self.rejected_rows += len(rows)
+                raise QueueFullError(self._retry_after())
+            self._rows.extend(rows)
+            self.enqueued_rows += len(rows)
+            depth = len(self._rows)
+
+        if depth >= self.flush_rows:
+            self._wake()
+
+    def _retry_after(self) -> int:
+        # Time for the flusher to work the current backlog down at the last observed speed
+        batches = math.ceil(self.depth / self.flush_rows)
+        per_batch = max(self.last_flush_ms / 1000, self.flush_interval / 10)
+        return max(1, math.ceil(batches * per_batch))
+
+    def _wake(self) -> None:
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    # ---------------------------
+    # Consumer side
+    # ---------------------------
+    def _take(self, limit: int) -> List[dict]:
+        with self._lock:
+            count = min(limit, len(self._rows))
+            return [self._rows.popleft() for _ in range(count)]
+
+    def _take_retry(self, force: bool = False) -> Optional[Tuple[int, List[dict]]]:
+        with self._lock:
+            if not self._retries or (not force and self._retries[0][0] > time.monotonic()):
+                return None
+            _, attempts, rows = self._retries.popleft()
+            self._retry_rows -= len(rows)
+            return attempts, rows
+
+    def _next_retry_in(self) -> Optional[float]:
+        with self._lock:
+            if not self._retries:
+                return None
+            return max(0.0, self._retries[0][0] - time.monotonic())
+
+    def _requeue(self, rows: List[dict], attempts: int, error: Exception) -> None:
+        if attempts >= self.max_attempts:
+            self.dropped_rows += len(rows)
+            logger.error("Dropping %d activity rows after %d failed writes: %s", len(rows), attempts, error)
+            return
+        delay = min(self.retry_backoff * 2 ** (attempts - 1), self.max_backoff)
+        with self._lock:
+            self._retries.append((time.monotonic() + delay, attempts, rows))
+            self._retry_rows += len(rows)
+        self.retried_rows += len(rows)
+        logger.warning("Activity write of %d rows failed (attempt %d), retrying in %.1fs: %s", len(rows), attempts, delay, error)
+
+    def _insert(self, rows: List[dict]) -> Optional[Exception]:
+        db = SessionLocal()
+        try:
+            self.writer(db, rows)
+            return None
+        except Exception as e:
+            db.rollback()
+            return e
+        finally:
+            db.close()
+
+    def _write(self, rows: List[dict], attempts: int = 0) -> None:
+        """
+        Write `rows`; `attempts` is how many times they already failed.
+
+        On a data error the batch is bisected so only the rows that fail on
+        their own are re-queued; on a transient error everything not yet
+        written is re-queued as is.
+        """
+        started = time.perf_counter()
+        try:
+            pending = [rows]
+            while pending:
+                chunk = pending.pop()
+                error = self._insert(chunk)
+                if error is None:
+                    self.flushed_rows += len(chunk)
+                elif _is_transient(error):
+                    for rest in pending:
+                        chunk = chunk + rest
+                    pending.clear()
+                    self._requeue(chunk, attempts + 1, error)
+                elif len(chunk) > 1:
+                    middle = len(chunk) // 2
+                    pending += [chunk[middle:], chunk[:middle]]
+                else:
+                    self._requeue(chunk, attempts + 1, error)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.flushes += 1
+            self.last_flush_ms = elapsed
+            self.max_flush_ms = max(self.max_flush_ms, elapsed)
+            self.total_flush_ms += elapsed
+
+    async def flush(self, force_retries: bool = False) -> None:
+        """
+        Write due retries, then everything currently buffered, in batches
+        of `flush_rows`. `force_retries` ignores the backoff (used on stop).
+        """
+        # Bounded, so rows re-queued by this pass wait for the next one
+        for _ in range(len(self._retries)):
+            retry = self._take_retry(force_retries)
+            if retry is None:
+                break
+            attempts, rows = retry
+            await run_in_threadpool(self._write, rows, attempts)
+
+        while True:
+            batch = self._take(self.flush_rows)
+            if not batch:
+                return
+            await run_in_threadpool(self._write, batch)
+
+    async def _run(self) -> None:
+        while self._running:
+            timeout = self.flush_interval
+            next_retry = self._next_retry_in()
+            if next_retry is not None:
+                timeout = min(timeout, next_retry)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def start(self) -> None:
+        if self._running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._running = True
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            "Activity write-behind buffer started (max_rows=%d, flush_rows=%d, interval=%.2fs)",
+            self.max_rows, self.flush_rows, self.flush_interval,
+        )
+
+    async def stop(self) -> None:
+        """
+        Stop accepting rows and drain whatever is still buffered. Pending
+        retries get one more try without waiting out their backoff; rows
+        that fail again are re-queued and then dropped (and logged) here.
+        """
+        if not self._running:
+            return
+        self._running = False
+        self._wakeup.set()
+        await self._task
+        await self.flush(force_retries=True)
+        while True:
+            retry = self._take_retry(force=True)
+            if retry is None:
+                break
+            _, rows = retry
+            self.dropped_rows += len(rows)
+            logger.error("Dropping %d activity rows still failing at shutdown", len(rows))
+        self._task = None
+        logger.info("Activity write-behind buffer drained and stopped")
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self._running,
+            "queue_depth": self.depth,
+            "queue_capacity": self.max_rows,
+            "enqueued_rows": self.enqueued_rows,
+            "flushed_rows": self.flushed_rows,
+            "rejected_rows": self.rejected_rows,
+            "dropped_rows": self.dropped_rows,
+            "retrying_rows": self._retry_rows,
+            "retried_rows": self.retried_rows,
+            "flushes": self.flushes,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "max_flush_ms": round(self.max_flush_ms, 2),
+            "avg_flush_ms": round(self.total_flush_ms / self.flushes, 2) if self.flushes else 0.0,
+        }
@@ -4,6 +4,7 @@ from typing import List, Optional
 
 from app.models.productive_entity import ProductiveEntity
 from app.schemas.admin_schemas import ProductiveEntityCreate
+from app.services.activity_classifier import classifier
 
 def add_entity(db: Session, data: ProductiveEntityCreate) -> ProductiveEntity:
     # Check duplicates
@@ -14,6 +15,7 @@ def add_entity(db: Session, data: ProductiveEntityCreate) -> ProductiveEntity:
     db.add(ent)
     db.commit()
     db.refresh(ent)
+    classifier.reload(db)
     return ent
 
 def list_entities(db: Session) -> List[ProductiveEntity]:
@@ -31,6 +33,7 @@ def update_entity(db: Session, entity_id: int, updates: dict) -> ProductiveEntit
             setattr(ent, k, v)
     db.commit()
     db.refresh(ent)
+    classifier.reload(db)
     return ent
 
 def delete_entity(db: Session, entity_id: int) -> None:
@@ -39,3 +42,4 @@ def delete_entity(db: Session, entity_id: int) -> None:
         raise ValueError("Not found")
     db.delete(ent)
     db.commit()
+    classifier.reload(db)
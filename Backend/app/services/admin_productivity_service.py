@@ -1,39 +1,70 @@
 # app/services/admin_productivity_service.py
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from typing import Dict
+from typing import Dict, List, Optional
+from datetime import date
 
 from app.models.productivity import Productivity
-from app.models.employee import Employee
+from app.models.team import Team
+from app.models.department import Department
 
-def get_org_summary(db: Session) -> Dict:
-    avg_score = db.query(func.avg(Productivity.score)).scalar() or 0.0
-    total_tasks = db.query(func.sum(Productivity.tasks_completed)).scalar() or 0
-    avg_hours = db.query(func.avg(Productivity.hours_logged)).scalar() or 0.0
-    return {
-        "average_productivity_score": round(float(avg_score), 2),
-        "total_tasks_completed": int(total_tasks),
-        "average_hours_logged": round(float(avg_hours), 2),
-    }
 
-def get_team_summary(db: Session, team_id: int) -> Dict:
-    avg_score = db.query(func.avg(Productivity.score)).filter(Productivity.team_id == team_id).scalar() or 0.0
-    total_tasks = db.query(func.sum(Productivity.tasks_completed)).filter(Productivity.team_id == team_id).scalar() or 0
-    avg_hours = db.query(func.avg(Productivity.hours_logged)).filter(Productivity.team_id == team_id).scalar() or 0.0
-    return {
-        "team_id": team_id,
-        "average_productivity_score": round(float(avg_score), 2),
-        "total_tasks_completed": int(total_tasks),
-        "average_hours_logged": round(float(avg_hours), 2),
-    }
+# No tasks total: daily productivity rows have no per-day task source
+def _metric_columns():
+    return (
+        func.avg(Productivity.score).label("avg_score"),
+        func.avg(Productivity.hours_logged).label("avg_hours"),
+    )
+
+def _in_range(query, start: Optional[date], end: Optional[date]):
+    if start:
+        query = query.filter(Productivity.date >= start)
+    if end:
+        query = query.filter(Productivity.date <= end)
+    return query
 
-def get_department_summary(db: Session, department_id: int) -> Dict:
-    avg_score = db.query(func.avg(Productivity.score)).filter(Productivity.department_id == department_id).scalar() or 0.0
-    total_tasks = db.query(func.sum(Productivity.tasks_completed)).filter(Productivity.department_id == department_id).scalar() or 0
-    avg_hours = db.query(func.avg(Productivity.hours_logged)).filter(Productivity.department_id == department_id).scalar() or 0.0
+def _metrics(row) -> Dict:
     return {
-        "department_id": department_id,
-        "average_productivity_score": round(float(avg_score), 2),
-        "total_tasks_completed": int(total_tasks),
-        "average_hours_logged": round(float(avg_hours), 2),
+        "average_productivity_score": round(float(row.avg_score or 0.0), 2),
+        "average_hours_logged": round(float(row.avg_hours or 0.0), 2),
     }
+
+
+# One aggregate scan per summary
+def get_org_summary(db: Session, start: Optional[date] = None, end: Optional[date] = None) -> Dict:
+    row = _in_range(db.query(*_metric_columns()), start, end).one()
+    return _metrics(row)
+
+def get_team_summary(db: Session, team_id: int, start: Optional[date] = None, end: Optional[date] = None) -> Dict:
+    query = db.query(*_metric_columns()).filter(Productivity.team_id == team_id)
+    return {"team_id": team_id, **_metrics(_in_range(query, start, end).one())}
+
+def get_department_summary(db: Session, department_id: int, start: Optional[date] = None, end: Optional[date] = None) -> Dict:
+    query = db.query(*_metric_columns()).filter(Productivity.department_id == department_id)
+    return {"department_id": department_id, **_metrics(_in_range(query, start, end).one())}
+
+
+# One GROUP BY for every team / department that has productivity rows
+def get_team_summaries(db: Session, start: Optional[date] = None, end: Optional[date] = None) -> List[Dict]:
+    query = (
+        db.query(Productivity.team_id, Team.name, *_metric_columns())
+        .join(Team, Team.id == Productivity.team_id)
+        .group_by(Productivity.team_id, Team.name)
+        .order_by(Productivity.team_id)
+    )
+    return [
+        {"team_id": row.team_id, "team_name": row.name, **_metrics(row)}
+        for row in _in_range(query, start, end)
+    ]
+
+def get_department_summaries(db: Session, start: Optional[date] = None, end: Optional[date] = None) -> List[Dict]:
+    query = (
+        db.query(Productivity.department_id, Department.name, *_metric_columns())
+        .join(Department, Department.id == Productivity.department_id)
+        .group_by(Productivity.department_id, Department.name)
+        .order_by(Productivity.department_id)
+    )
+    return [
+        {"department_id": row.department_id, "department_name": row.name, **_metrics(row)}
+        for row in _in_range(query, start, end)
+    ]
@@ -11,12 +11,19 @@ from app.models.report_log import ReportLog
 DEFAULT_REPORT_DIR = os.getenv("REPORT_DIR", "reports")
 os.makedirs(DEFAULT_REPORT_DIR, exist_ok=True)
 
-def generate_productivity_report(db: Session, generated_by: int | None = None, scope: dict | None = None) -> str:
+def generate_productivity_report(
+    db: Session,
+    generated_by: int | None = None,
+    scope: dict | None = None,
+    read_db: Session | None = None,
+) -> str:
     """
     Generate an Excel (xlsx) report of productivity rows filtered by scope.
+    Rows are read through `read_db` (e.g. a replica session) when given;
+    the ReportLog entry is always written through `db`.
     Returns file path.
     """
-    query = db.query(Productivity)
+    query = (read_db or db).query(Productivity)
     if scope:
         # simple filtering keys: employee_id, team_id, department_id, period etc.
         if scope.get("employee_id"):
@@ -14,10 +14,15 @@ def workload_distribution(activities: List[dict]):
     """
     Returns percentage of time spent on productive vs unproductive
     """
-    total = len(activities)
+    productive_count = sum(1 for a in activities if a.get("productive")=="Yes")
+    return workload_distribution_from_counts(len(activities), productive_count)
+
+def workload_distribution_from_counts(total: int, productive_count: int):
+    """
+    Same as workload_distribution, from pre-aggregated counts
+    """
     if total == 0:
         return {"productive": 0, "unproductive": 0}
-    productive_count = sum(1 for a in activities if a.get("productive")=="Yes")
     unproductive_count = total - productive_count
     return {
         "productive": round(productive_count/total*100,2),
@@ -1,44 +1,171 @@
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from app.models.activity import Activity
 from app.models.employee import Employee
 from app.models.team import Team
 from app.models.department import Department
+from app.services.activity_service import timestamp_range_filters
+from app.services.rollup_service import productive_counts
 from datetime import datetime
-from collections import defaultdict
+from typing import Dict, List, Optional
 
-def calculate_employee_productivity(db: Session, employee_id: int):
-    activities = db.query(Activity).filter(Activity.employee_id == employee_id).all()
-    total = len(activities)
-    productive_count = sum(1 for a in activities if a.productive == "Yes")
+
+def _time_bucket(db: Session, column, bucket: str):
+    """SQL expression truncating `column` to the start of its hour/day/week."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return func.date_trunc(bucket, column)
+    if dialect == "sqlite":
+        if bucket == "hour":
+            return func.strftime("%Y-%m-%d %H:00:00", column)
+        if bucket == "day":
+            return func.date(column)
+        # ISO weeks start on Monday
+        return func.date(column, "weekday 0", "-6 days")
+    raise ValueError(f"Time bucketing is not supported on {dialect}")
+
+
+def aggregate_activity_counts(
+    db: Session,
+    scope_column,
+    scope_id: int,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    bucket: Optional[str] = None,
+) -> Dict:
+    """
+    Count activities per activity_type in [start, end) with GROUP BY in the database.
+
+    `scope_column` is the Activity column to filter on (employee_id,
+    team_id or department_id). With `bucket` ("hour", "day", "week") the
+    counts are additionally broken down per time bucket.
+    """
+    filters = [scope_column == scope_id, *timestamp_range_filters(start, end)]
+
+    rows = (
+        db.query(Activity.activity_type, func.count(Activity.id))
+        .filter(*filters)
+        .group_by(Activity.activity_type)
+        .all()
+    )
+    activities_by_type = {activity_type: count for activity_type, count in rows}
+    result = {
+        "total_activities": sum(activities_by_type.values()),
+        "activities_by_type": activities_by_type,
+    }
+
+    if bucket:
+        bucket_col = _time_bucket(db, Activity.timestamp, bucket).label("bucket")
+        rows = (
+            db.query(bucket_col, Activity.activity_type, func.count(Activity.id))
+            .filter(*filters)
+            .group_by(bucket_col, Activity.activity_type)
+            .order_by(bucket_col)
+            .all()
+        )
+        buckets = {}
+        for bucket_start, activity_type, count in rows:
+            key = bucket_start.isoformat() if hasattr(bucket_start, "isoformat") else str(bucket_start)
+            entry = buckets.setdefault(key, {"bucket": key, "total_activities": 0, "activities_by_type": {}})
+            entry["total_activities"] += count
+            entry["activities_by_type"][activity_type] = count
+        result["buckets"] = list(buckets.values())
+
+    return result
+
+
+def unproductive_counts(
+    db: Session,
+    employee_ids,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    Unproductive activity counts per app/site for the given employees in
+    [start, end), most frequent first.
+    """
+    key = func.coalesce(Activity.name, Activity.description, Activity.activity_type)
+    count = func.count(Activity.id)
+    stmt = (
+        select(key, count)
+        .where(Activity.employee_id.in_(employee_ids), Activity.productive == "No")
+        .group_by(key)
+        .order_by(count.desc())
+    )
+    if start:
+        stmt = stmt.where(Activity.timestamp >= start)
+    if end:
+        stmt = stmt.where(Activity.timestamp < end)
+    if limit:
+        stmt = stmt.limit(limit)
+    return {k: c for k, c in db.execute(stmt).all()}
+
+
+def calculate_employee_productivity(
+    db: Session,
+    employee_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    total, productive_count = productive_counts(db, [employee_id], start, end).get(employee_id, (0, 0))
     score = round((productive_count / total) * 100, 2) if total else 0
     # Bottleneck detection
-    bottlenecks = defaultdict(int)
-    for a in activities:
-        if a.productive == "No":
-            key = a.app_name or a.website_url
-            bottlenecks[key] += 1
-    return {"score": score, "bottlenecks": dict(bottlenecks)}
-
-def calculate_team_productivity(db: Session, team_id: int):
-    employees = db.query(Employee).filter(Employee.team_id == team_id).all()
-    team_scores = []
-    bottlenecks = defaultdict(int)
-    for emp in employees:
-        result = calculate_employee_productivity(db, emp.id)
-        team_scores.append(result["score"])
-        for k, v in result["bottlenecks"].items():
-            bottlenecks[k] += v
-    avg_score = round(sum(team_scores) / len(team_scores), 2) if team_scores else 0
-    return {"team_score": avg_score, "bottlenecks": dict(bottlenecks)}
-
-def calculate_department_productivity(db: Session, department_id: int):
-    teams = db.query(Team).filter(Team.department_id == department_id).all()
-    dept_scores = []
-    bottlenecks = defaultdict(int)
-    for team in teams:
-        result = calculate_team_productivity(db, team.id)
-        dept_scores.append(result["team_score"])
-        for k, v in result["bottlenecks"].items():
-            bottlenecks[k] += v
-    avg_score = round(sum(dept_scores) / len(dept_scores), 2) if dept_scores else 0
-    return {"department_score": avg_score, "bottlenecks": dict(bottlenecks)}
+    bottlenecks = unproductive_counts(db, [employee_id], start, end)
+    return {"score": score, "bottlenecks": bottlenecks}
+
+def calculate_group_productivity(
+    db: Session,
+    team_ids: List[int],
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> Dict:
+    """
+    Scores for every employee of the given teams in a constant number of queries.
+
+    Returns per-employee scores, per-team averages (teams without members
+    score 0) and the combined unproductive bottleneck map.
+    """
+    members = db.query(Employee.id, Employee.team_id).filter(Employee.team_id.in_(team_ids)).all()
+    member_ids = select(Employee.id).where(Employee.team_id.in_(team_ids))
+
+    counts = productive_counts(db, member_ids, start, end)
+    employee_scores = {}
+    team_members = {team_id: [] for team_id in team_ids}
+    for emp_id, team_id in members:
+        total, productive_count = counts.get(emp_id, (0, 0))
+        employee_scores[emp_id] = round((productive_count / total) * 100, 2) if total else 0
+        team_members[team_id].append(employee_scores[emp_id])
+
+    team_scores = {
+        team_id: round(sum(scores) / len(scores), 2) if scores else 0
+        for team_id, scores in team_members.items()
+    }
+    return {
+        "employee_scores": employee_scores,
+        "team_scores": team_scores,
+        "bottlenecks": unproductive_counts(db, member_ids, start, end),
+    }
+
+def calculate_team_productivity(
+    db: Session,
+    team_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    result = calculate_group_productivity(db, [team_id], start, end)
+    return {"team_score": result["team_scores"][team_id], "bottlenecks": result["bottlenecks"]}
+
+def calculate_department_productivity(
+    db: Session,
+    department_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    team_ids = [team_id for (team_id,) in db.query(Team.id).filter(Team.department_id == department_id)]
+    if not team_ids:
+        return {"department_score": 0, "bottlenecks": {}}
+    result = calculate_group_productivity(db, team_ids, start, end)
+    dept_scores = list(result["team_scores"].values())
+    avg_score = round(sum(dept_scores) / len(dept_scores), 2)
+    return {"department_score": avg_score, "bottlenecks": result["bottlenecks"]}
@@ -1,22 +1,51 @@
 # app/services/employee_service.py
 
-from typing import Optional
+from datetime import date, datetime
+from itertools import chain
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event, func, insert, or_, select, tuple_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from passlib.context import CryptContext
+from app.utils.security import password_hasher
 
 from app.models.employee import Employee
 from app.models.department import Department
 from app.models.team import Team
+from app.models.productivity import Productivity
+from app.models.attendance import Attendance
+from app.models.leave import Leave
+from app.models.activity import Activity
+from app.models.activity_rollup import ActivityDailyRollup
+from app.models.screenshot import Screenshot
+from app.models.alert import Alert
+from app.core.config import ACTIVITY_ROLLUP_READS_ENABLED
 from app.schemas.employee_schema import EmployeeCreate, EmployeeUpdate
+from app.utils.auth_cache import invalidate_principal
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.response_cache import invalidate_on_commit
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# /productivity/summary and the admin productivity summaries aggregate
+# Employee rows, so any write to them invalidates those cached responses:
+# unit-of-work changes at flush, bulk INSERT/UPDATE/DELETE statements as run.
+@event.listens_for(Session, "before_flush")
+def _invalidate_summaries_on_flush(session, flush_context, instances):
+    if any(isinstance(obj, Employee) for obj in chain(session.new, session.dirty, session.deleted)):
+        invalidate_on_commit(session, "productivity")
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidate_summaries_on_statement(state):
+    if (state.is_insert or state.is_update or state.is_delete) and state.bind_mapper is not None \
+            and state.bind_mapper.class_ is Employee:
+        invalidate_on_commit(state.session, "productivity")
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.verify(plain_password, hashed_password)
 
 
 def create_employee(db: Session, employee_data: dict) -> Employee:
@@ -51,18 +80,291 @@ def create_employee(db: Session, employee_data: dict) -> Employee:
     db.refresh(new_employee)
     return new_employee
 
+def bulk_create_employees(
+    db: Session,
+    employees: List[EmployeeCreate],
+    batch_size: int = 500,
+) -> List[Tuple[Optional[int], Optional[str]]]:
+    """
+    Create many employees at once.
+
+    Departments and teams are looked up (and created when missing, as in
+    `create_employee`) once per distinct id, existing emails are checked
+    case-insensitively in one query per chunk, passwords are hashed in
+    parallel and employees are inserted in transactions of `batch_size`.
+    Hashing happens before anything is written, so PasswordHasherBusy
+    leaves the database untouched.
+
+    Returns one (employee_id, error) pair per input, in input order.
+    """
+    results: List[Tuple[Optional[int], Optional[str]]] = [(None, None)] * len(employees)
+
+    def fail(i: int, message: str) -> None:
+        results[i] = (None, message)
+
+    # Emails: duplicates within the import and already registered ones
+    emails = [e.email.lower() for e in employees]
+    existing = set()
+    unique = list(set(emails))
+    for i in range(0, len(unique), 1000):
+        existing.update(
+            email.lower() for (email,) in
+            db.query(Employee.email).filter(func.lower(Employee.email).in_(unique[i:i + 1000])).all()
+        )
+    seen = set()
+    pending = []
+    for i, email in enumerate(emails):
+        if email in existing:
+            fail(i, "Email already exists")
+        elif email in seen:
+            fail(i, "Duplicate email in import")
+        else:
+            seen.add(email)
+            pending.append(i)
+
+    # Departments and teams, once per distinct id
+    dept_ids = {employees[i].department_id for i in pending if employees[i].department_id}
+    known_depts = {d for (d,) in db.query(Department.id).filter(Department.id.in_(dept_ids)).all()} if dept_ids else set()
+
+    team_ids = {employees[i].team_id for i in pending if employees[i].team_id}
+    known_teams = {t for (t,) in db.query(Team.id).filter(Team.id.in_(team_ids)).all()} if team_ids else set()
+    missing_teams = {}
+    for i in pending:
+        team_id = employees[i].team_id
+        if team_id and team_id not in known_teams and employees[i].department_id:
+            missing_teams.setdefault(team_id, employees[i].department_id)
+    known_teams.update(missing_teams)
+
+    valid = []
+    for i in pending:
+        team_id = employees[i].team_id
+        if team_id and team_id not in known_teams:
+            fail(i, f"Team {team_id} does not exist and no department_id was given to create it")
+        else:
+            valid.append(i)
+
+    hashes = password_hasher.hash_many([employees[i].password for i in valid])
+
+    for dept_id in dept_ids - known_depts:
+        db.add(Department(id=dept_id, name=f"Dept-{dept_id}"))
+    for team_id, dept_id in missing_teams.items():
+        db.add(Team(id=team_id, name=f"Team-{team_id}", department_id=dept_id))
+    db.commit()
+
+    for start in range(0, len(valid), batch_size):
+        chunk = valid[start:start + batch_size]
+        rows = [
+            {**employees[i].model_dump(exclude={"password"}), "password": hashes[start + n]}
+            for n, i in enumerate(chunk)
+        ]
+        try:
+            # RETURNING order isn't guaranteed for multi-row inserts; map ids back by email
+            inserted = db.execute(insert(Employee).returning(Employee.id, Employee.email), rows).all()
+            db.commit()
+            ids = {email.lower(): emp_id for emp_id, email in inserted}
+            for i in chunk:
+                results[i] = (ids.get(emails[i]), None)
+        except IntegrityError:
+            # e.g. an email registered concurrently; retry the batch row by row
+            db.rollback()
+            for i, row in zip(chunk, rows):
+                try:
+                    emp_id = db.execute(insert(Employee).returning(Employee.id), row).scalar_one()
+                    db.commit()
+                    results[i] = (emp_id, None)
+                except IntegrityError as e:
+                    db.rollback()
+                    fail(i, f"Could not insert: {e.orig}")
+
+    return results
+
 def get_employee_by_email(db: Session, email: str) -> Optional[Employee]:
     return db.query(Employee).filter(Employee.email == email).first()
 
 def get_employee_by_id(db: Session, emp_id: int) -> Optional[Employee]:
     return db.query(Employee).filter(Employee.id == emp_id).first()
 
+def list_employees_page(
+    db: Session,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    department_id: Optional[int] = None,
+    team_id: Optional[int] = None,
+    role: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    name: Optional[str] = None,
+) -> Tuple[list, Optional[str]]:
+    """
+    One page of the employee directory, ordered by id and keyset-paginated.
+
+    Selects only the listing columns, joins department/team names in SQL and
+    takes the latest productivity score from a correlated subquery (served by
+    ix_productivity_employee_id_date), so no collections are loaded.
+    `name` is a case-insensitive prefix of first name, last name or email.
+    Returns the rows and the cursor for the next page (None on the last page).
+    Raises ValueError for a malformed cursor.
+    """
+    latest_score = (
+        select(func.coalesce(Productivity.score, Productivity.average_score))
+        .where(Productivity.employee_id == Employee.id)
+        .order_by(Productivity.date.desc(), Productivity.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    stmt = (
+        select(
+            Employee.id,
+            Employee.first_name,
+            Employee.last_name,
+            Employee.email,
+            Employee.role,
+            Employee.contact,
+            Employee.designation,
+            Employee.department_id,
+            Department.name.label("department_name"),
+            Employee.team_id,
+            Team.name.label("team_name"),
+            Employee.is_active,
+            Employee.productivity_score,
+            Employee.tasks_completed,
+            Employee.hours_logged,
+            latest_score.label("latest_productivity_score"),
+        )
+        .outerjoin(Department, Department.id == Employee.department_id)
+        .outerjoin(Team, Team.id == Employee.team_id)
+    )
+
+    if department_id is not None:
+        stmt = stmt.where(Employee.department_id == department_id)
+    if team_id is not None:
+        stmt = stmt.where(Employee.team_id == team_id)
+    if role:
+        stmt = stmt.where(Employee.role == role)
+    if is_active is not None:
+        stmt = stmt.where(Employee.is_active == is_active)
+    if name:
+        prefix = name.strip().lower().replace("%", r"\%").replace("_", r"\_") + "%"
+        stmt = stmt.where(or_(
+            func.lower(Employee.first_name).like(prefix, escape="\\"),
+            func.lower(Employee.last_name).like(prefix, escape="\\"),
+            func.lower(Employee.email).like(prefix, escape="\\"),
+        ))
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != 1:
+            raise ValueError("Invalid cursor")
+        stmt = stmt.where(Employee.id > int(values[0]))
+
+    rows = db.execute(stmt.order_by(Employee.id).limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].id)
+    return rows, next_cursor
+
+# Per-employee collections: (model, newest-first sort column). Each sort
+# column leads an (employee_id, column) index.
+EMPLOYEE_COLLECTIONS = {
+    "attendances": (Attendance, Attendance.date),
+    "leaves": (Leave, Leave.start_date),
+    "activities": (Activity, Activity.timestamp),
+    "productivity": (Productivity, Productivity.date),
+    "screenshots": (Screenshot, Screenshot.timestamp),
+    "alerts": (Alert, Alert.occurred_at),
+}
+
+
+def list_employee_collection_page(
+    db: Session,
+    emp_id: int,
+    collection: str,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+) -> Tuple[list, Optional[str]]:
+    """
+    Newest-first page of one of EMPLOYEE_COLLECTIONS, keyset-paginated on
+    (sort column, id). Raises ValueError for a malformed cursor.
+    """
+    model, sort_col = EMPLOYEE_COLLECTIONS[collection]
+    stmt = select(model).where(model.employee_id == emp_id)
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != 2:
+            raise ValueError("Invalid cursor")
+        parse = date.fromisoformat if sort_col.type.python_type is date else datetime.fromisoformat
+        try:
+            last_key, last_id = parse(values[0]), int(values[1])
+        except (TypeError, ValueError):
+            raise ValueError("Invalid cursor")
+        stmt = stmt.where(tuple_(sort_col, model.id) < tuple_(last_key, last_id))
+
+    rows = db.execute(
+        stmt.order_by(sort_col.desc(), model.id.desc()).limit(limit + 1)
+    ).scalars().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(getattr(rows[-1], sort_col.key), rows[-1].id)
+    return rows, next_cursor
+
+
+def count_employee_collections(db: Session, emp_id: int) -> Dict[str, int]:
+    """Row counts of every EMPLOYEE_COLLECTIONS entry, in one statement."""
+    counts = {
+        name: select(func.count(model.id)).where(model.employee_id == emp_id).scalar_subquery()
+        for name, (model, _) in EMPLOYEE_COLLECTIONS.items()
+    }
+    if ACTIVITY_ROLLUP_READS_ENABLED:
+        # Summing daily rollup rows is far cheaper than counting raw activities
+        counts["activities"] = (
+            select(func.coalesce(func.sum(ActivityDailyRollup.activity_count), 0))
+            .where(ActivityDailyRollup.employee_id == emp_id)
+            .scalar_subquery()
+        )
+    row = db.execute(select(*(expr.label(name) for name, expr in counts.items()))).one()
+    return {name: int(value or 0) for name, value in row._mapping.items()}
+
+
+def get_employee_detail(db: Session, emp_id: int, recent: int = 5) -> Optional[dict]:
+    """
+    Profile, collection counts and the `recent` newest items per collection.
+    Collections are never loaded in full; use list_employee_collection_page
+    for more.
+    """
+    row = db.execute(
+        select(Employee, Department.name, Team.name)
+        .outerjoin(Department, Department.id == Employee.department_id)
+        .outerjoin(Team, Team.id == Employee.team_id)
+        .where(Employee.id == emp_id)
+    ).first()
+    if not row:
+        return None
+    emp, department_name, team_name = row
+
+    detail = {column.key: getattr(emp, column.key) for column in Employee.__table__.columns}
+    detail["department_name"] = department_name
+    detail["team_name"] = team_name
+    detail["counts"] = count_employee_collections(db, emp_id)
+    for name in EMPLOYEE_COLLECTIONS:
+        detail[name] = (
+            list_employee_collection_page(db, emp_id, name, limit=recent)[0]
+            if recent and detail["counts"][name] else []
+        )
+    return detail
+
+
 def update_profile(db: Session, emp: Employee, updates: dict, profile_picture_path: str | None = None) -> Employee:
     """Update employee profile fields."""
+    previous_email = emp.email
     for k, v in updates.items():
         setattr(emp, k, v)
     if profile_picture_path:
         emp.profile_picture = profile_picture_path
     db.commit()
     db.refresh(emp)
+    # Role, team, status etc. may have changed; drop the cached principal
+    invalidate_principal(previous_email)
+    invalidate_principal(emp.email)
     return emp
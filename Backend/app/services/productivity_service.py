@@ -1,14 +1,19 @@
-from typing import List, Optional
-from datetime import date, datetime
+from typing import Dict, List, Optional
+from datetime import date, datetime, time, timedelta
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func
+from sqlalchemy import Numeric, String, and_, case, cast, func, literal, select, union
 
 from app.models.employee import Employee
 from app.models.productivity import Productivity
 from app.models.activity import Activity
+from app.models.activity_rollup import ActivityDailyRollup
+from app.models.attendance import Attendance
+from app.core.config import ACTIVITY_ROLLUP_READS_ENABLED, PRODUCTIVITY_COMPUTE_CHUNK_EMPLOYEES
 from app.schemas.productivity import SummaryMetrics
+from app.services.rollup_service import productive_counts, upsert_insert
+from app.utils.response_cache import invalidate_on_commit
 
 
 # ==================================================
@@ -37,30 +42,13 @@ async def get_summary_metrics(db: AsyncSession) -> SummaryMetrics:
 
 async def compute_and_store_productivity(
     db: AsyncSession,
-    period: Optional[str] = None,
-) -> int:
-    if not period:
-        period = str(date.today())
-
-    result = await db.execute(select(Employee))
-    employees = result.scalars().all()
-
-    count = 0
-    for e in employees:
-        record = Productivity(
-            employee_id=e.id,
-            department_id=e.department_id,
-            team_id=e.team_id,
-            period=period,
-            average_score=e.productivity_score or 0.0,
-            tasks_completed=e.tasks_completed or 0,
-            hours_logged=e.hours_logged or 0.0,
-        )
-        db.add(record)
-        count += 1
-
-    await db.flush()
-    return count
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    chunk_size: int = PRODUCTIVITY_COMPUTE_CHUNK_EMPLOYEES,
+) -> Dict[str, int]:
+    """Upsert daily productivity rows for [start, end]; see `upsert_daily_productivity`."""
+    start = start or date.today()
+    return await db.run_sync(upsert_daily_productivity, start, end or start, chunk_size)
 
 
 async def get_productivity_by_employee(
@@ -79,33 +67,192 @@ async def get_productivity_by_employee(
 # SYNC SERVICES
 # ==================================================
 
+def _hours_between(dialect: str, started, ended):
+    if dialect == "postgresql":
+        return func.extract("epoch", ended - started) / 3600.0
+    return (func.julianday(ended) - func.julianday(started)) * 24.0
+
+
+def _daily_sources(db: Session, start: date, end: date, lo_id: int, hi_id: int):
+    """(activity, attendance) per (employee_id, day) subqueries for one employee id window."""
+    if ACTIVITY_ROLLUP_READS_ENABLED:
+        table = ActivityDailyRollup
+        day = table.day
+        total = func.sum(table.activity_count)
+        # SUM over no productive rows is NULL, not 0
+        productive = func.coalesce(func.sum(table.activity_count).filter(table.productive == "Yes"), 0)
+        in_range = [day >= start, day <= end]
+    else:
+        table = Activity
+        day = func.date(table.timestamp)
+        total = func.count(table.id)
+        productive = func.count(table.id).filter(table.productive == "Yes")
+        lower = datetime.combine(start, time.min)
+        upper = datetime.combine(end + timedelta(days=1), time.min)
+        in_range = [table.timestamp >= lower, table.timestamp < upper]
+
+    activity = (
+        select(
+            table.employee_id.label("employee_id"),
+            day.label("day"),
+            total.label("total"),
+            productive.label("productive"),
+        )
+        .where(table.employee_id >= lo_id, table.employee_id < hi_id, *in_range)
+        .group_by(table.employee_id, day)
+        .subquery("daily_activity")
+    )
+
+    hours = _hours_between(db.get_bind().dialect.name, Attendance.login_time, Attendance.logout_time)
+    attendance = (
+        select(
+            Attendance.employee_id.label("employee_id"),
+            Attendance.date.label("day"),
+            func.sum(hours).label("hours"),
+        )
+        .where(
+            Attendance.employee_id >= lo_id,
+            Attendance.employee_id < hi_id,
+            Attendance.date >= start,
+            Attendance.date <= end,
+            Attendance.login_time.isnot(None),
+            Attendance.logout_time.isnot(None),
+        )
+        .group_by(Attendance.employee_id, Attendance.date)
+        .subquery("daily_attendance")
+    )
+    return activity, attendance
+
+
+def upsert_daily_productivity(
+    db: Session,
+    start: date,
+    end: date,
+    chunk_size: int = PRODUCTIVITY_COMPUTE_CHUNK_EMPLOYEES,
+) -> Dict[str, int]:
+    """
+    Write one Productivity row per (employee, day) with activity or attendance
+    in [start, end]; period is the ISO day, so re-running a range updates the
+    same rows instead of adding new ones.
+
+      score           productive / total activities * 100 (NULL without activity)
+      hours_logged    sum of logout - login over the day's attendance records
+      average_score,  0; there is no per-day source for them, and copying the
+      tasks_completed employee's lifetime totals would count them once per day
+
+    Runs one INSERT ... SELECT ... ON CONFLICT (employee_id, period) DO UPDATE
+    per window of `chunk_size` employee ids, committing after each.
+    Returns {"inserted", "updated", "written"}.
+    """
+    lo, hi = db.execute(select(func.min(Employee.id), func.max(Employee.id))).one()
+    inserted = updated = 0
+    if lo is None:
+        return {"inserted": 0, "updated": 0, "written": 0}
+
+    for lo_id in range(lo, hi + 1, chunk_size):
+        hi_id = lo_id + chunk_size
+        activity, attendance = _daily_sources(db, start, end, lo_id, hi_id)
+        keys = union(
+            select(activity.c.employee_id, activity.c.day),
+            select(attendance.c.employee_id, attendance.c.day),
+        ).subquery("daily_keys")
+        period = cast(keys.c.day, String(20))
+
+        existing = db.execute(
+            select(func.count(Productivity.id))
+            .select_from(keys)
+            .join(Productivity, and_(Productivity.employee_id == keys.c.employee_id, Productivity.period == period))
+        ).scalar()
+
+        score = case(
+            (activity.c.total > 0, func.round(cast(activity.c.productive * 100.0 / activity.c.total, Numeric), 2)),
+            else_=None,
+        )
+        source = (
+            select(
+                keys.c.employee_id,
+                Employee.department_id,
+                Employee.team_id,
+                keys.c.day,
+                period,
+                score,
+                literal(0.0),
+                literal(0),
+                func.round(cast(func.coalesce(attendance.c.hours, 0.0), Numeric), 2),
+            )
+            .select_from(keys)
+            .join(Employee, Employee.id == keys.c.employee_id)
+            .outerjoin(activity, and_(activity.c.employee_id == keys.c.employee_id, activity.c.day == keys.c.day))
+            .outerjoin(attendance, and_(attendance.c.employee_id == keys.c.employee_id, attendance.c.day == keys.c.day))
+            # Also keeps SQLite from reading ON CONFLICT as a join constraint
+            .where(Employee.id >= lo_id, Employee.id < hi_id)
+        )
+        stmt = upsert_insert(db, Productivity).from_select(
+            [
+                "employee_id", "department_id", "team_id", "date", "period",
+                "score", "average_score", "tasks_completed", "hours_logged",
+            ],
+            source,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["employee_id", "period"],
+            set_={
+                "department_id": stmt.excluded.department_id,
+                "team_id": stmt.excluded.team_id,
+                "date": stmt.excluded.date,
+                "score": stmt.excluded.score,
+                "average_score": stmt.excluded.average_score,
+                "tasks_completed": stmt.excluded.tasks_completed,
+                "hours_logged": stmt.excluded.hours_logged,
+                "updated_at": func.now(),
+            },
+        )
+        written = db.execute(stmt).rowcount
+        invalidate_on_commit(db, "productivity")
+        db.commit()
+        updated += existing
+        inserted += max(written - existing, 0)
+
+    return {"inserted": inserted, "updated": updated, "written": inserted + updated}
+
+
 def calculate_employee_productivity(
     db: Session,
     employee_id: int,
 ) -> Productivity:
-    activities = (
-        db.query(Activity)
-        .filter(Activity.employee_id == employee_id)
-        .all()
-    )
+    """
+    Score today's activity into the employee's row for today, the same row
+    and meaning `upsert_daily_productivity` writes (NULL without activity).
+    """
+    today = date.today()
+    start = datetime.combine(today, time.min)
+    total, productive_count = productive_counts(
+        db, [employee_id], start, start + timedelta(days=1)
+    ).get(employee_id, (0, 0))
 
-    total = len(activities)
-    productive_count = sum(
-        1 for a in activities if getattr(a, "productive", "Yes") == "Yes"
-    )
-
-    score = round((productive_count / total) * 100, 2) if total else 0.0
+    score = round((productive_count / total) * 100, 2) if total else None
 
     emp = db.query(Employee).get(employee_id)
 
-    record = Productivity(
+    # Today's row is updated in place; (employee_id, period) is unique
+    stmt = upsert_insert(db, Productivity).values(
         employee_id=employee_id,
         department_id=emp.department_id,
         team_id=emp.team_id,
+        date=today,
+        period=str(today),
         score=score,
     )
-
-    db.add(record)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["employee_id", "period"],
+        set_={
+            "department_id": stmt.excluded.department_id,
+            "team_id": stmt.excluded.team_id,
+            "score": stmt.excluded.score,
+            "updated_at": func.now(),
+        },
+    ).returning(Productivity)
+    record = db.scalars(stmt, execution_options={"populate_existing": True}).one()
+    invalidate_on_commit(db, "productivity")
     db.commit()
-    db.refresh(record)
     return record
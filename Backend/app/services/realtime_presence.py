@@ -0,0 +1,253 @@
+# app/services/realtime_presence.py
+"""
+Realtime state shared between workers through Redis.
+
+RedisFanout
+    Frames are published to one channel per topic ("rt:topic:<topic>").
+    Each worker subscribes only to the channels of topics it has local
+    subscribers for, adding and dropping them as sockets come and go, so
+    a worker never processes frames nobody on it is listening to.
+
+PresenceRegistry
+    Each worker keeps a hash of its connected employees under
+    "rt:presence:<worker_id>" and a heartbeat in the "rt:workers" sorted
+    set. Both expire after REALTIME_PRESENCE_TTL_SECONDS without a
+    heartbeat, so a crashed worker's connections disappear on their own.
+    Without Redis the registry answers from this process only.
+
+Both take the Redis client as an argument, so a stand-in such as
+fakeredis.aioredis.FakeRedis can be passed instead.
+"""
+import asyncio
+import json
+import os
+import socket
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+from app.core.config import REALTIME_HEARTBEAT_SECONDS, REALTIME_PRESENCE_TTL_SECONDS
+from app.services.realtime_service import ConnectionManager, Frame, pack_envelope, unpack_envelope
+from app.utils.auth_cache import Principal
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+CHANNEL_PREFIX = "rt:topic:"
+WORKERS_KEY = "rt:workers"
+
+
+def topic_channel(topic: str) -> str:
+    return f"{CHANNEL_PREFIX}{topic}"
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _is_fanout_topic(topic: str) -> bool:
+    # state:* topics carry live-state deltas, which every worker derives locally
+    return not topic.startswith("state:")
+
+
+# ---------------------------
+# Topic-sharded pub/sub
+# ---------------------------
+class RedisFanout:
+    def __init__(self, client, manager: ConnectionManager):
+        self.client = client
+        self.manager = manager
+        self.pubsub = client.pubsub()
+        self._task: Optional[asyncio.Task] = None
+        self._changes: List[asyncio.Task] = []
+        # Fixed channels every worker listens to, with their message handlers
+        self.channel_handlers: Dict[str, Callable[[bytes], None]] = {}
+        manager.topic_listeners.append(self._on_topic_change)
+
+    async def start(self) -> None:
+        channels = [topic_channel(t) for t in self.manager.local_topics if _is_fanout_topic(t)]
+        channels += list(self.channel_handlers)
+        if channels:
+            await self.pubsub.subscribe(*channels)
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._on_topic_change in self.manager.topic_listeners:
+            self.manager.topic_listeners.remove(self._on_topic_change)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+        await self.pubsub.aclose()
+
+    async def publish(self, frame: Frame, topics: List[str], key: Optional[str]) -> None:
+        """One PUBLISH per topic channel, pipelined; the payload is packed once."""
+        message = pack_envelope(frame, topics, key)
+        pipe = self.client.pipeline(transaction=False)
+        for topic in topics:
+            pipe.publish(topic_channel(topic), message)
+        await pipe.execute()
+
+    def _on_topic_change(self, topic: str, added: bool) -> None:
+        if not _is_fanout_topic(topic):
+            return
+        task = asyncio.create_task(self._apply_change(topic_channel(topic), added))
+        self._changes.append(task)
+        task.add_done_callback(self._changes.remove)
+
+    async def _apply_change(self, channel: str, added: bool) -> None:
+        try:
+            if added:
+                await self.pubsub.subscribe(channel)
+            else:
+                await self.pubsub.unsubscribe(channel)
+        except Exception as e:
+            logger.error("Realtime %s %s failed: %r", "subscribe" if added else "unsubscribe", channel, e)
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                # No connection until the first SUBSCRIBE
+                if self.pubsub.connection is None:
+                    await asyncio.sleep(0.1)
+                    continue
+                message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if not message or message["type"] != "message":
+                    continue
+                channel = _text(message["channel"])
+                handler = self.channel_handlers.get(channel)
+                if handler is not None:
+                    handler(message["data"])
+                    continue
+                topic = channel[len(CHANNEL_PREFIX):]
+                frame, topics, key = unpack_envelope(message["data"])
+                self.manager.publish_channel(frame, topic, topics, key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Realtime Redis listener error: %r", e)
+                await asyncio.sleep(1)
+
+
+# ---------------------------
+# Presence
+# ---------------------------
+class PresenceRegistry:
+    def __init__(self, client, worker_id: str = WORKER_ID):
+        self.client = client
+        self.worker_id = worker_id
+        self.key = f"rt:presence:{worker_id}"
+        self._entries: Dict[int, dict] = {}  # employee_id -> entry for sockets on this worker
+        self._task: Optional[asyncio.Task] = None
+
+    async def connected(self, principal: Principal) -> None:
+        entry = self._entries.get(principal.id)
+        if entry is None:
+            entry = self._entries[principal.id] = {
+                "employee_id": principal.id,
+                "email": principal.email,
+                "name": principal.name,
+                "team_id": principal.team_id,
+                "department_id": principal.department_id,
+                "connections": 0,
+                "since": time.time(),
+            }
+        entry["connections"] += 1
+        await self._write_employee(principal.id)
+
+    async def disconnected(self, principal: Principal) -> None:
+        entry = self._entries.get(principal.id)
+        if entry is not None:
+            entry["connections"] -= 1
+            if entry["connections"] <= 0:
+                del self._entries[principal.id]
+        await self._write_employee(principal.id)
+
+    async def _write_employee(self, employee_id: int) -> None:
+        if self.client is None:
+            return
+        entry = self._entries.get(employee_id)
+        try:
+            if entry is None:
+                await self.client.hdel(self.key, str(employee_id))
+            else:
+                pipe = self.client.pipeline(transaction=False)
+                pipe.hset(self.key, str(employee_id), json.dumps(entry))
+                pipe.expire(self.key, int(REALTIME_PRESENCE_TTL_SECONDS))
+                pipe.zadd(WORKERS_KEY, {self.worker_id: time.time()})
+                await pipe.execute()
+        except Exception as e:
+            logger.error("Presence update failed: %r", e)
+
+    async def heartbeat(self) -> None:
+        """Rewrite this worker's entries and refresh their TTL."""
+        if self.client is None:
+            return
+        entries = self._entries
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(self.key)
+        if entries:
+            pipe.hset(self.key, mapping={str(k): json.dumps(v) for k, v in entries.items()})
+            pipe.expire(self.key, int(REALTIME_PRESENCE_TTL_SECONDS))
+        pipe.zadd(WORKERS_KEY, {self.worker_id: time.time()})
+        await pipe.execute()
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            try:
+                await self.heartbeat()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Presence heartbeat failed: %r", e)
+            await asyncio.sleep(REALTIME_HEARTBEAT_SECONDS)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._heartbeat_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+        if self.client is not None:
+            try:
+                pipe = self.client.pipeline(transaction=False)
+                pipe.delete(self.key)
+                pipe.zrem(WORKERS_KEY, self.worker_id)
+                await pipe.execute()
+            except Exception as e:
+                logger.error("Presence cleanup failed: %r", e)
+
+    async def online(self) -> List[dict]:
+        """Connected employees across live workers, merged per employee."""
+        if self.client is None:
+            workers = {self.worker_id: self._entries}
+        else:
+            cutoff = time.time() - REALTIME_PRESENCE_TTL_SECONDS
+            await self.client.zremrangebyscore(WORKERS_KEY, "-inf", cutoff)
+            worker_ids = [_text(w) for w in await self.client.zrange(WORKERS_KEY, 0, -1)]
+            pipe = self.client.pipeline(transaction=False)
+            for worker_id in worker_ids:
+                pipe.hgetall(f"rt:presence:{worker_id}")
+            workers = {
+                worker_id: {int(_text(k)): json.loads(v) for k, v in (raw or {}).items()}
+                for worker_id, raw in zip(worker_ids, await pipe.execute())
+            }
+
+        merged: Dict[int, dict] = {}
+        for worker_id, entries in workers.items():
+            for employee_id, entry in entries.items():
+                current = merged.get(employee_id)
+                if current is None:
+                    current = merged[employee_id] = {**entry, "connections": 0, "workers": {}}
+                current["connections"] += entry["connections"]
+                current["since"] = min(current["since"], entry["since"])
+                current["workers"][worker_id] = entry["connections"]
+        return sorted(merged.values(), key=lambda e: e["employee_id"])
@@ -0,0 +1,500 @@
+# app/services/realtime_service.py
+"""
+Topic-routed WebSocket fan-out.
+
+Every connection is a Subscriber with its own bounded send queue, drained
+by its own task, so publishing never awaits a socket: a slow browser only
+backs up (and eventually loses frames from) its own queue.
+
+Topics are "org", "department:<id>", "team:<id>" and "employee:<id>". A
+frame sent by an employee is published to all four of their topics; each
+subscriber gets it once if it subscribes to any of them. Which topics a
+principal may subscribe to depends on role (see `can_subscribe`).
+
+When a queue is full the oldest frame is dropped. With the "coalesce"
+policy, a new frame whose key (sender + frame type) is already queued
+replaces the queued one in place instead of taking another slot, so a
+slow consumer gets the latest state rather than a backlog.
+
+Inbound frames from agents pass through a per-connection IngestLimiter
+(token bucket). Frames within the limit are forwarded immediately; frames
+over it wait, coalesced to the latest per key, until a token frees up.
+
+Frames travel as Frame objects that encode themselves at most once per
+wire format ("json" text or "msgpack" binary, negotiated per socket), so
+the bytes published to Redis and sent to every subscriber are shared.
+"""
+import asyncio
+import itertools
+import json
+import time
+from collections import OrderedDict, defaultdict
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from fastapi import WebSocket
+from starlette.websockets import WebSocketDisconnect
+
+try:
+    import msgpack
+except ImportError:  # optional; sockets then negotiate JSON only
+    msgpack = None
+
+from app.core.config import (
+    REALTIME_SEND_QUEUE_SIZE,
+    REALTIME_SLOW_CONSUMER_POLICY,
+    REALTIME_SEND_TIMEOUT_SECONDS,
+    REALTIME_INGEST_RATE,
+    REALTIME_INGEST_BURST,
+    REALTIME_INGEST_MAX_PENDING,
+)
+from app.utils.auth_cache import Principal
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+ORG_TOPIC = "org"
+
+
+# ---------------------------
+# Wire formats
+# ---------------------------
+ENCODINGS = ("msgpack", "json") if msgpack is not None else ("json",)
+# Between workers: the most compact format available
+REDIS_ENCODING = ENCODINGS[0]
+
+
+class Frame:
+    """An outgoing message; each wire encoding is computed at most once and shared."""
+
+    __slots__ = ("_data", "_encoded")
+
+    def __init__(self, data: Optional[dict] = None, encoded: Optional[Dict[str, Union[str, bytes]]] = None):
+        self._data = data
+        self._encoded = dict(encoded or {})
+
+    @classmethod
+    def from_wire(cls, encoding: str, payload: bytes) -> "Frame":
+        return cls(encoded={encoding: payload.decode() if encoding == "json" else payload})
+
+    @property
+    def data(self) -> dict:
+        if self._data is None:
+            encoding, payload = next(iter(self._encoded.items()))
+            self._data = decode_payload(encoding, payload)
+        return self._data
+
+    def encode(self, encoding: str) -> Union[str, bytes]:
+        """str for "json" (sent as a text frame), bytes for "msgpack"."""
+        payload = self._encoded.get(encoding)
+        if payload is None:
+            if encoding == "msgpack":
+                payload = msgpack.packb(self.data, default=str)
+            else:
+                payload = json.dumps(self.data, separators=(",", ":"), default=str)
+            self._encoded[encoding] = payload
+        return payload
+
+
+def decode_payload(encoding: str, payload: Union[str, bytes]) -> dict:
+    if encoding == "msgpack" and isinstance(payload, (bytes, bytearray)):
+        return msgpack.unpackb(payload)
+    return json.loads(payload)
+
+
+def negotiate_encoding(websocket: WebSocket) -> Tuple[str, Optional[str]]:
+    """
+    (encoding, subprotocol to accept) from Sec-WebSocket-Protocol
+    ("msgpack" / "json") or ?encoding=; JSON when neither is supported.
+    """
+    for proto in websocket.scope.get("subprotocols") or []:
+        if proto in ENCODINGS:
+            return proto, proto
+    requested = websocket.query_params.get("encoding")
+    return (requested if requested in ENCODINGS else "json"), None
+
+
+async def receive_frame(websocket: WebSocket, encoding: str) -> dict:
+    """Next inbound message as a dict; text frames are JSON, binary ones use `encoding`."""
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    if message.get("bytes") is not None:
+        data = decode_payload(encoding, message["bytes"])
+    else:
+        data = json.loads(message.get("text") or "null")
+    if not isinstance(data, dict):
+        raise ValueError("Realtime frames must be objects")
+    return data
+
+
+def pack_envelope(frame: Frame, topics: List[str], key: Optional[str]) -> bytes:
+    """Redis message: JSON routing header, newline, frame payload in REDIS_ENCODING."""
+    payload = frame.encode(REDIS_ENCODING)
+    if isinstance(payload, str):
+        payload = payload.encode()
+    header = json.dumps({"topics": topics, "key": key, "enc": REDIS_ENCODING}, separators=(",", ":"))
+    return header.encode() + b"\n" + payload
+
+
+def unpack_envelope(message: bytes) -> Tuple[Frame, List[str], Optional[str]]:
+    header, _, payload = message.partition(b"\n")
+    meta = json.loads(header)
+    return Frame.from_wire(meta["enc"], payload), meta["topics"], meta.get("key")
+
+
+# ---------------------------
+# Topics and scope
+# ---------------------------
+def employee_topics(employee_id: int, team_id: Optional[int], department_id: Optional[int]) -> List[str]:
+    topics = [ORG_TOPIC, f"employee:{employee_id}"]
+    if team_id is not None:
+        topics.append(f"team:{team_id}")
+    if department_id is not None:
+        topics.append(f"department:{department_id}")
+    return topics
+
+
+def frame_topics(principal: Principal) -> List[str]:
+    """Topics a frame sent by `principal` is published to."""
+    return employee_topics(principal.id, principal.team_id, principal.department_id)
+
+
+def default_topics(principal: Principal) -> List[str]:
+    if principal.role == "Admin":
+        return [ORG_TOPIC]
+    if principal.role == "Manager":
+        if principal.department_id is not None:
+            return [f"department:{principal.department_id}"]
+        if principal.team_id is not None:
+            return [f"team:{principal.team_id}"]
+    return [f"employee:{principal.id}"]
+
+
+def can_subscribe(principal: Principal, topic: str) -> bool:
+    """Admins see everything, managers their team/department, employees themselves."""
+    if principal.role == "Admin":
+        return topic == ORG_TOPIC or topic.partition(":")[0] in ("department", "team", "employee")
+    allowed = {f"employee:{principal.id}"}
+    if principal.role == "Manager":
+        if principal.team_id is not None:
+            allowed.add(f"team:{principal.team_id}")
+        if principal.department_id is not None:
+            allowed.add(f"department:{principal.department_id}")
+    return topic in allowed
+
+
+# ---------------------------
+# Subscribers
+# ---------------------------
+class Subscriber:
+    def __init__(
+        self,
+        websocket: WebSocket,
+        principal: Principal,
+        encoding: str = "json",
+        max_queue: int = REALTIME_SEND_QUEUE_SIZE,
+        policy: str = REALTIME_SLOW_CONSUMER_POLICY,
+    ):
+        self.websocket = websocket
+        self.principal = principal
+        self.encoding = encoding
+        self.topics: Set[str] = set()
+        self.max_queue = max(1, max_queue)
+        self.coalesce = policy == "coalesce"
+        self._queue: "OrderedDict[tuple, Frame]" = OrderedDict()
+        self._ids = itertools.count()
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        # Set by ConnectionManager.connect; called once when sending fails
+        self.on_failure: Optional[Callable[["Subscriber"], None]] = None
+        self.closed = False
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+    def enqueue(self, frame: Union[Frame, dict], key: Optional[str] = None) -> None:
+        """Queue a frame without waiting; never blocks the publisher."""
+        if self.closed:
+            return
+        if not isinstance(frame, Frame):
+            frame = Frame(frame)
+        if self.coalesce and key is not None:
+            slot = ("key", key)
+            if slot in self._queue:
+                self._queue[slot] = frame
+                self.coalesced += 1
+                return
+        else:
+            slot = ("seq", next(self._ids))
+        if len(self._queue) >= self.max_queue:
+            self._queue.popitem(last=False)
+            self.dropped += 1
+        self._queue[slot] = frame
+        self._ready.set()
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._drain())
+
+    async def _drain(self) -> None:
+        try:
+            while True:
+                await self._ready.wait()
+                while self._queue:
+                    _, frame = self._queue.popitem(last=False)
+                    payload = frame.encode(self.encoding)
+                    if isinstance(payload, str):
+                        send = self.websocket.send_text(payload)
+                    else:
+                        send = self.websocket.send_bytes(payload)
+                    await asyncio.wait_for(send, REALTIME_SEND_TIMEOUT_SECONDS)
+                    self.sent += 1
+                # No await since the queue was seen empty, so no wake-up is lost
+                self._ready.clear()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Dead or stuck socket: stop queueing and close it, which ends the
+            # receive loop (disconnect, presence cleanup) and prompts a reconnect
+            self.closed = True
+            self._queue.clear()
+            logger.info("Realtime send to %s stopped: %r", self.principal.email, e)
+            if self.on_failure is not None:
+                self.on_failure(self)
+            code = 1013 if isinstance(e, asyncio.TimeoutError) else 1011  # try again later / server error
+            try:
+                await asyncio.wait_for(self.websocket.close(code=code), REALTIME_SEND_TIMEOUT_SECONDS)
+            except Exception:
+                pass
+
+    async def stop(self) -> None:
+        self.closed = True
+        self._queue.clear()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+
+# ---------------------------
+# Inbound rate limiting
+# ---------------------------
+class TokenBucket:
+    """`rate` tokens per second, holding at most `burst`; rate <= 0 means unlimited."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = float(max(1, burst))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self) -> bool:
+        if self.rate <= 0:
+            return True
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def wait_time(self) -> float:
+        """Seconds until a token is available."""
+        if self.rate <= 0:
+            return 0.0
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+
+ingest_totals = {"forwarded": 0, "coalesced": 0, "dropped": 0}
+
+
+class IngestLimiter:
+    """
+    Forwards frames through `publish` at no more than the bucket's rate.
+
+    Over the limit, frames are held (latest per key, oldest key first, at
+    most `max_pending` keys) and released by a background task as tokens
+    refill, so nothing sleeps in the receive loop.
+    """
+
+    def __init__(
+        self,
+        publish: Callable[[dict, str], Awaitable[None]],
+        rate: float = REALTIME_INGEST_RATE,
+        burst: int = REALTIME_INGEST_BURST,
+        max_pending: int = REALTIME_INGEST_MAX_PENDING,
+    ):
+        self._publish = publish
+        self.bucket = TokenBucket(rate, burst)
+        self.max_pending = max(1, max_pending)
+        self._pending: "OrderedDict[str, dict]" = OrderedDict()
+        self._flusher: Optional[asyncio.Task] = None
+
+    async def _forward(self, frame: dict, key: str) -> None:
+        ingest_totals["forwarded"] += 1
+        await self._publish(frame, key)
+
+    async def submit(self, frame: dict, key: str) -> None:
+        # Queued frames go first, so a free token must not let this one overtake them
+        if not self._pending and self.bucket.try_acquire():
+            await self._forward(frame, key)
+            return
+        if key in self._pending:
+            self._pending[key] = frame
+            ingest_totals["coalesced"] += 1
+        else:
+            if len(self._pending) >= self.max_pending:
+                self._pending.popitem(last=False)
+                ingest_totals["dropped"] += 1
+            self._pending[key] = frame
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush())
+
+    async def _flush(self) -> None:
+        while self._pending:
+            await asyncio.sleep(self.bucket.wait_time())
+            if not self._pending or not self.bucket.try_acquire():
+                continue
+            key, frame = self._pending.popitem(last=False)
+            try:
+                await self._forward(frame, key)
+            except Exception as e:
+                logger.error("Realtime publish failed: %r", e)
+
+    async def close(self) -> None:
+        self._pending.clear()
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except (asyncio.CancelledError, Exception):
+                pass
+
+
+class ConnectionManager:
+    def __init__(self):
+        self.subscribers: Set[Subscriber] = set()
+        self._by_topic: Dict[str, Set[Subscriber]] = defaultdict(set)
+        self.published = 0
+        self._closed_totals = {"sent": 0, "dropped": 0, "coalesced": 0}
+        # Called with (topic, added) when a topic gains its first / loses its last local subscriber
+        self.topic_listeners: List[Callable[[str, bool], None]] = []
+
+    def connect(
+        self,
+        websocket: WebSocket,
+        principal: Principal,
+        topics: Iterable[str],
+        encoding: str = "json",
+    ) -> Subscriber:
+        """Register an accepted socket and start its sender task."""
+        sub = Subscriber(websocket, principal, encoding)
+        sub.on_failure = self._on_send_failure
+        self.subscribers.add(sub)
+        self.subscribe(sub, topics)
+        sub.start()
+        return sub
+
+    def _on_send_failure(self, sub: Subscriber) -> None:
+        # Stop routing frames to it now; disconnect() finishes once its receive loop ends
+        self.unsubscribe(sub, list(sub.topics))
+
+    async def disconnect(self, sub: Subscriber) -> None:
+        self.unsubscribe(sub, list(sub.topics))
+        if sub in self.subscribers:
+            self.subscribers.discard(sub)
+            for name in self._closed_totals:
+                self._closed_totals[name] += getattr(sub, name)
+        await sub.stop()
+
+    def subscribe(self, sub: Subscriber, topics: Iterable[str]) -> None:
+        if sub.closed:
+            return
+        for topic in topics:
+            sub.topics.add(topic)
+            is_new = topic not in self._by_topic
+            self._by_topic[topic].add(sub)
+            if is_new:
+                for listener in self.topic_listeners:
+                    listener(topic, True)
+
+    def unsubscribe(self, sub: Subscriber, topics: Iterable[str]) -> None:
+        for topic in topics:
+            sub.topics.discard(topic)
+            subs = self._by_topic.get(topic)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._by_topic[topic]
+                    for listener in self.topic_listeners:
+                        listener(topic, False)
+
+    @property
+    def local_topics(self) -> List[str]:
+        return list(self._by_topic)
+
+    def publish(self, frame: Union[Frame, dict], topics: Iterable[str], key: Optional[str] = None) -> int:
+        """Queue `frame` once for every subscriber of any of `topics`; returns the recipient count."""
+        if not isinstance(frame, Frame):
+            frame = Frame(frame)
+        matched = [subs for subs in map(self._by_topic.get, topics) if subs]
+        # Union only when needed; enqueue never mutates the topic sets
+        recipients = matched[0] if len(matched) == 1 else set().union(*matched)
+        for sub in recipients:
+            sub.enqueue(frame, key)
+        self.published += 1
+        return len(recipients)
+
+    def publish_channel(self, frame: Frame, channel_topic: str, topics: List[str], key: Optional[str] = None) -> int:
+        """
+        Deliver a frame that arrived on `channel_topic`'s channel.
+
+        The frame was published to every topic in `topics` (in order); a
+        subscriber that also holds an earlier one gets it from that
+        channel instead, so it is delivered once.
+        """
+        subs = self._by_topic.get(channel_topic)
+        if not subs:
+            return 0
+        earlier = topics[:topics.index(channel_topic)] if channel_topic in topics else []
+        delivered = 0
+        for sub in subs:
+            if earlier and not sub.topics.isdisjoint(earlier):
+                continue
+            sub.enqueue(frame, key)
+            delivered += 1
+        self.published += 1
+        return delivered
+
+    def stats(self) -> dict:
+        subs = list(self.subscribers)
+        return {
+            "connections": len(subs),
+            "topics": len(self._by_topic),
+            "published": self.published,
+            "sent": self._closed_totals["sent"] + sum(s.sent for s in subs),
+            "queued": sum(s.queued for s in subs),
+            "dropped": self._closed_totals["dropped"] + sum(s.dropped for s in subs),
+            "coalesced": self._closed_totals["coalesced"] + sum(s.coalesced for s in subs),
+            "policy": REALTIME_SLOW_CONSUMER_POLICY,
+            "max_queue": REALTIME_SEND_QUEUE_SIZE,
+            "encodings": {e: sum(1 for s in subs if s.encoding == e) for e in ENCODINGS},
+            "ingest": {
+                "rate": REALTIME_INGEST_RATE,
+                "burst": REALTIME_INGEST_BURST,
+                **ingest_totals,
+            },
+        }
+
+
+manager = ConnectionManager()
@@ -0,0 +1,257 @@
+# app/services/realtime_state.py
+"""
+Live "what is everyone doing right now" table for dashboards.
+
+One row per employee (current app/site, activity type, productive flag,
+idle state, last seen), updated from agent WebSocket frames and from
+ingested activities. Every change gets the next sequence number and is
+pushed to dashboards that opted in (?state=1) as a delta holding only the
+changed fields:
+
+    {"type": "state.delta", "epoch": ..., "seq": 42, "prev": 17,
+     "employee_id": 7, "changes": {"current_app": "Slack", "idle": false}}
+
+`prev` is the employee's previous seq, so a client can spot a missed
+delta. On connect a dashboard gets a full snapshot, or, when it passes
+?since_seq=&epoch= still covered by the recent-delta ring buffer, just
+the deltas it missed. The epoch identifies this process's table; a
+different epoch (restart, other worker) always falls back to a snapshot.
+A slow socket may drop queued deltas (REALTIME_SLOW_CONSUMER_POLICY); a
+gap in `prev` tells the client to send {"type": "state.resync"}.
+
+With Redis, updates go through the "rt:state" channel and every worker
+applies them, so any worker can serve a full snapshot. A worker that
+starts later asks the others for their rows ({"request": <epoch>}); they
+answer with {"rows": [...], "for": <epoch>}, and rows it did not have yet
+reach its dashboards as ordinary deltas. Until the first answer arrives
+its snapshots only hold employees updated since it started.
+"""
+import asyncio
+import json
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import REALTIME_STATE_HISTORY
+from app.services.realtime_service import ConnectionManager, Frame, Subscriber, employee_topics, manager
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+STATE_CHANNEL = "rt:state"
+STATE_FIELDS = ("activity_type", "current_app", "productive", "idle", "last_seen")
+EMPLOYEE_FIELDS = ("name", "team_id", "department_id")
+
+
+def state_topic(topic: str) -> str:
+    return f"state:{topic}"
+
+
+def _state_topics(state: dict) -> List[str]:
+    return employee_topics(state["employee_id"], state.get("team_id"), state.get("department_id"))
+
+
+def _iso(value) -> str:
+    """Normalise a timestamp to naive-UTC ISO text so values compare in time order."""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            value = None
+    if not isinstance(value, datetime):
+        value = datetime.utcnow()
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat()
+
+
+def changes_from_frame(data: dict) -> dict:
+    """State fields carried by an agent WebSocket frame."""
+    changes = {"last_seen": _iso(data.get("timestamp"))}
+    activity_type = data.get("activity_type") or data.get("type")
+    if activity_type:
+        changes["activity_type"] = activity_type
+    current_app = data.get("name") or data.get("app") or data.get("url")
+    if current_app:
+        changes["current_app"] = current_app
+    if data.get("productive") is not None:
+        changes["productive"] = data["productive"]
+    if isinstance(data.get("idle"), bool):
+        changes["idle"] = data["idle"]
+    elif activity_type:
+        changes["idle"] = activity_type == "idle"
+    return changes
+
+
+def changes_from_activity(values: dict) -> dict:
+    """State fields from an ingested activity (Activity column values)."""
+    return {
+        "activity_type": values.get("activity_type"),
+        "current_app": values.get("name"),
+        "productive": values.get("productive"),
+        "idle": values.get("activity_type") == "idle",
+        "last_seen": _iso(values.get("timestamp")),
+    }
+
+
+class LiveStateTable:
+    def __init__(self, history: int = REALTIME_STATE_HISTORY):
+        self.epoch = uuid.uuid4().hex[:12]
+        self.seq = 0
+        self._states: Dict[int, dict] = {}
+        self._history: Deque[Tuple[dict, List[str]]] = deque(maxlen=max(1, history))
+
+    def apply(self, employee: dict, changes: dict) -> Optional[dict]:
+        """Merge `changes` into the employee's row; returns the delta, or None if nothing changed."""
+        employee_id = employee["employee_id"]
+        state = self._states.get(employee_id)
+        if state is None:
+            state = {"employee_id": employee_id, "seq": 0, **{f: None for f in EMPLOYEE_FIELDS + STATE_FIELDS}}
+            self._states[employee_id] = state
+
+        # Late uploads (old batches) must not move the row back in time
+        last_seen = changes.get("last_seen")
+        if last_seen and state["last_seen"] and last_seen < state["last_seen"]:
+            return None
+
+        diff = {f: employee[f] for f in EMPLOYEE_FIELDS if f in employee and state[f] != employee[f]}
+        diff.update({f: v for f, v in changes.items() if f in STATE_FIELDS and state[f] != v})
+        if not diff:
+            return None
+
+        self.seq += 1
+        delta = {
+            "type": "state.delta",
+            "epoch": self.epoch,
+            "seq": self.seq,
+            "prev": state["seq"],
+            "employee_id": employee_id,
+            "changes": diff,
+        }
+        state.update(diff)
+        state["seq"] = self.seq
+        self._history.append((delta, _state_topics(state)))
+        return delta
+
+    def snapshot(self, topics: Iterable[str]) -> dict:
+        """Every row visible from `topics`, with the seq it is current as of."""
+        topics = set(topics)
+        return {
+            "type": "state.snapshot",
+            "epoch": self.epoch,
+            "seq": self.seq,
+            "employees": [dict(s) for s in self._states.values() if topics.intersection(_state_topics(s))],
+        }
+
+    def rows(self) -> List[dict]:
+        return [dict(s) for s in self._states.values()]
+
+    def replay(self, since_seq: int, topics: Iterable[str]) -> Optional[List[dict]]:
+        """Deltas after `since_seq` visible from `topics`, or None if the buffer no longer covers them."""
+        if since_seq > self.seq:
+            return None
+        oldest = self._history[0][0]["seq"] if self._history else self.seq + 1
+        if since_seq < oldest - 1:
+            return None
+        topics = set(topics)
+        return [
+            delta for delta, delta_topics in self._history
+            if delta["seq"] > since_seq and topics.intersection(delta_topics)
+        ]
+
+
+class LiveState:
+    def __init__(self, manager: ConnectionManager, history: int = REALTIME_STATE_HISTORY):
+        self.manager = manager
+        self.table = LiveStateTable(history)
+        self.client = None  # Redis client; None applies updates in this process only
+        self._replies: Set[asyncio.Task] = set()
+
+    async def update(self, employee: dict, changes: dict) -> None:
+        """
+        Record a change for `employee` ({"employee_id", "name", "team_id",
+        "department_id"}); with Redis every worker applies it.
+        """
+        message = {"employee": employee, "changes": changes}
+        if self.client is not None:
+            try:
+                await self.client.publish(STATE_CHANNEL, json.dumps(message, default=str))
+                return
+            except Exception as e:
+                logger.error("Live state publish failed, applying locally: %r", e)
+        self.apply(message)
+
+    async def update_principal(self, principal, changes: dict) -> None:
+        await self.update(
+            {
+                "employee_id": principal.id,
+                "name": principal.name,
+                "team_id": principal.team_id,
+                "department_id": principal.department_id,
+            },
+            changes,
+        )
+
+    def apply(self, message: dict) -> None:
+        delta = self.table.apply(message["employee"], message["changes"])
+        if delta is not None:
+            topics = [state_topic(t) for t in _state_topics(self.table._states[delta["employee_id"]])]
+            self.manager.publish(Frame(delta), topics)
+
+    def handle_redis(self, payload: bytes) -> None:
+        message = json.loads(payload)
+        if "request" in message:
+            if message["request"] != self.table.epoch and self.client is not None:
+                reply = {"rows": self.table.rows(), "for": message["request"]}
+                task = asyncio.create_task(self._publish(reply))
+                self._replies.add(task)
+                task.add_done_callback(self._replies.discard)
+        elif "rows" in message:
+            if message["for"] == self.table.epoch:
+                self.seed(message["rows"])
+        else:
+            self.apply(message)
+
+    def seed(self, rows: Iterable[dict]) -> None:
+        """Merge rows from another worker's table; rows already as current here change nothing."""
+        for row in rows:
+            employee = {f: row[f] for f in ("employee_id",) + EMPLOYEE_FIELDS}
+            changes = {f: row[f] for f in STATE_FIELDS if row[f] is not None}
+            self.apply({"employee": employee, "changes": changes})
+
+    async def request_rows(self) -> None:
+        """Ask the workers already running for their rows (called once Redis is subscribed)."""
+        await self._publish({"request": self.table.epoch})
+
+    async def _publish(self, message: dict) -> None:
+        try:
+            await self.client.publish(STATE_CHANNEL, json.dumps(message, default=str))
+        except Exception as e:
+            logger.error("Live state publish failed: %r", e)
+
+    def sync(self, sub: Subscriber, since_seq: Optional[int] = None, epoch: Optional[str] = None) -> None:
+        """
+        Point `sub`'s state subscriptions at its current topics and queue a
+        catch-up: missed deltas when (epoch, since_seq) can be resumed,
+        otherwise a full snapshot. Nothing awaits in between, so no delta
+        can slip between the catch-up and the live stream.
+        """
+        topics = [t for t in sub.topics if not t.startswith("state:")]
+        wanted = {state_topic(t) for t in topics}
+        current = {t for t in sub.topics if t.startswith("state:")}
+        self.manager.unsubscribe(sub, current - wanted)
+        self.manager.subscribe(sub, wanted - current)
+
+        replay = None
+        if since_seq is not None and epoch == self.table.epoch:
+            replay = self.table.replay(since_seq, topics)
+        if replay is None:
+            sub.enqueue(self.table.snapshot(topics))
+            return
+        sub.enqueue({"type": "state.resume", "epoch": self.table.epoch, "since_seq": since_seq, "seq": self.table.seq})
+        for delta in replay:
+            sub.enqueue(Frame(delta))
+
+
+live_state = LiveState(manager)
@@ -0,0 +1,215 @@
+# app/services/reclassification_service.py
+"""
+Background re-evaluation of Activity.productive after catalogue changes.
+
+A job walks the activities of a date range in id windows of `chunk_size`,
+re-classifies each row with the current catalogue and updates only the rows
+whose value changed, committing after every window. Transactions stay short
+and only touch the rows they update, so ingestion is never blocked. A job
+that fails or is cancelled keeps its position and can be resumed.
+
+When the walk finishes, the daily rollup and the daily Productivity rows
+are recomputed for the days whose rows changed, and cached productivity
+responses are invalidated.
+"""
+import threading
+import uuid
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.activity import Activity
+from app.services.activity_classifier import classifier
+from app.services.productivity_service import upsert_daily_productivity
+from app.services.rollup_service import rebuild_rollup
+from app.utils.logger import get_logger
+from app.utils.response_cache import invalidate_on_commit
+
+logger = get_logger(__name__)
+
+
+class ReclassificationJob:
+    def __init__(self, start: date, end: date, chunk_size: int):
+        self.id = uuid.uuid4().hex
+        self.start = start
+        self.end = end
+        self.chunk_size = chunk_size
+        self.status = "pending"   # pending, running, completed, failed, cancelled
+        self.error: Optional[str] = None
+
+        self.min_id: Optional[int] = None
+        self.max_id: Optional[int] = None
+        self.last_id: Optional[int] = None   # highest id already processed
+        self.scanned = 0
+        self.updated = 0
+        self.first_changed_day: Optional[date] = None
+        self.last_changed_day: Optional[date] = None
+
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._cancel = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def progress(self) -> float:
+        if self.status == "completed":
+            return 100.0
+        if self.min_id is None or self.max_id is None or self.last_id is None:
+            return 0.0
+        span = self.max_id - self.min_id + 1
+        return round(min(100.0, (self.last_id - self.min_id + 1) / span * 100), 2)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "start": self.start,
+            "end": self.end,
+            "chunk_size": self.chunk_size,
+            "status": self.status,
+            "progress": self.progress,
+            "scanned": self.scanned,
+            "updated": self.updated,
+            "last_id": self.last_id,
+            "error": self.error,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+jobs: Dict[str, ReclassificationJob] = {}
+_jobs_lock = threading.Lock()
+
+
+def _track_changed_day(job: ReclassificationJob, ts: datetime) -> None:
+    day = ts.date()
+    if job.first_changed_day is None or day < job.first_changed_day:
+        job.first_changed_day = day
+    if job.last_changed_day is None or day > job.last_changed_day:
+        job.last_changed_day = day
+
+
+def _process_window(db: Session, job: ReclassificationJob, lower: datetime, upper: datetime, lo: int, hi: int) -> None:
+    rows = db.execute(
+        select(Activity.id, Activity.timestamp, Activity.activity_type, Activity.name, Activity.productive)
+        .where(
+            Activity.id >= lo,
+            Activity.id <= hi,
+            Activity.timestamp >= lower,
+            Activity.timestamp < upper,
+        )
+    ).all()
+
+    matcher = classifier.matcher()
+    changes = []
+    for act_id, ts, activity_type, name, productive in rows:
+        result = matcher.match(activity_type, name)
+        if result is None:
+            continue
+        value = "Yes" if result else "No"
+        if value != productive:
+            # timestamp in the WHERE lets Postgres go straight to the partition
+            changes.append({"_id": act_id, "_ts": ts, "_productive": value})
+            _track_changed_day(job, ts)
+
+    if changes:
+        table = Activity.__table__
+        db.execute(
+            update(table)
+            .where(table.c.id == bindparam("_id"), table.c.timestamp == bindparam("_ts"))
+            .values(productive=bindparam("_productive")),
+            changes,
+        )
+    db.commit()
+
+    job.scanned += len(rows)
+    job.updated += len(changes)
+    job.last_id = hi
+
+
+def _run(job: ReclassificationJob) -> None:
+    db = SessionLocal()
+    lower = datetime.combine(job.start, time.min)
+    upper = datetime.combine(job.end + timedelta(days=1), time.min)
+    try:
+        if job.min_id is None:
+            job.min_id, job.max_id = db.execute(
+                select(func.min(Activity.id), func.max(Activity.id))
+                .where(Activity.timestamp >= lower, Activity.timestamp < upper)
+            ).one()
+            db.commit()
+
+        if job.min_id is not None:
+            next_id = job.min_id if job.last_id is None else job.last_id + 1
+            while next_id <= job.max_id:
+                if job._cancel.is_set():
+                    job.status = "cancelled"
+                    return
+                hi = min(next_id + job.chunk_size - 1, job.max_id)
+                _process_window(db, job, lower, upper, next_id, hi)
+                next_id = hi + 1
+
+        if job.first_changed_day is not None:
+            # Both recomputations are idempotent, so a resumed job simply redoes them
+            invalidate_on_commit(db, "productivity")
+            rebuild_rollup(db, job.first_changed_day, job.last_changed_day)
+            upsert_daily_productivity(db, job.first_changed_day, job.last_changed_day)
+
+        job.status = "completed"
+        logger.info("Reclassification %s completed: %d scanned, %d updated", job.id, job.scanned, job.updated)
+    except Exception as e:
+        db.rollback()
+        job.status = "failed"
+        job.error = str(e)
+        logger.error("Reclassification %s failed at id %s: %s", job.id, job.last_id, e)
+    finally:
+        job.finished_at = datetime.utcnow()
+        db.close()
+
+
+def _launch(job: ReclassificationJob) -> None:
+    # Callers hold _jobs_lock
+    job.status = "running"
+    job.error = None
+    job.started_at = job.started_at or datetime.utcnow()
+    job.finished_at = None
+    job._cancel.clear()
+    job._thread = threading.Thread(target=_run, args=(job,), name=f"reclassify-{job.id[:8]}", daemon=True)
+    job._thread.start()
+
+
+def start_reclassification(start: date, end: date, chunk_size: int = 5000) -> ReclassificationJob:
+    job = ReclassificationJob(start, end, chunk_size)
+    with _jobs_lock:
+        jobs[job.id] = job
+        _launch(job)
+    return job
+
+
+def get_job(job_id: str) -> Optional[ReclassificationJob]:
+    return jobs.get(job_id)
+
+
+def resume_job(job_id: str) -> ReclassificationJob:
+    """Continue a failed or cancelled job from the last committed window."""
+    job = jobs.get(job_id)
+    if not job:
+        raise ValueError("Not found")
+    # Check and launch atomically, so concurrent resumes start one thread
+    with _jobs_lock:
+        if job.status not in ("failed", "cancelled"):
+            raise ValueError(f"Job is {job.status}, only failed or cancelled jobs can be resumed")
+        if job._thread is not None:
+            job._thread.join()  # the previous run is past its last commit, only closing up
+        _launch(job)
+    return job
+
+
+def cancel_job(job_id: str) -> ReclassificationJob:
+    job = jobs.get(job_id)
+    if not job:
+        raise ValueError("Not found")
+    job._cancel.set()
+    return job
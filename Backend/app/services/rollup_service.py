@@ -0,0 +1,243 @@
+# app/services/rollup_service.py
+"""
+Maintenance and reads of the activity_daily_rollup table.
+
+Ingestion calls `apply_rollup_deltas` in the same transaction as the
+activity INSERT, so the rollup stays in step with the raw table. Reads
+use the rollup whenever the requested range is whole days, and fall back
+to grouped queries over `activities` otherwise.
+"""
+import random
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import ACTIVITY_ROLLUP_READS_ENABLED
+from app.models.activity import Activity
+from app.models.activity_rollup import ActivityDailyRollup
+
+ROLLUP_KEY = ["employee_id", "day", "activity_type", "productive"]
+
+
+def upsert_insert(db: Session, model=ActivityDailyRollup):
+    """Dialect-specific INSERT construct for `model` that supports ON CONFLICT."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise ValueError(f"Upserts are not supported on {dialect}")
+    return insert(model)
+
+
+# ---------------------------
+# Incremental maintenance
+# ---------------------------
+def apply_rollup_deltas(db: Session, rows: List[dict]) -> None:
+    """
+    Fold freshly ingested activity rows (Activity column dicts) into the rollup.
+
+    Does not commit — callers run it inside the transaction that inserts the
+    activities themselves.
+    """
+    deltas: Dict[tuple, dict] = {}
+    for row in rows:
+        key = (row["employee_id"], row["timestamp"].date(), row["activity_type"], row.get("productive") or "")
+        entry = deltas.get(key)
+        if entry is None:
+            entry = deltas[key] = {
+                "employee_id": key[0],
+                "day": key[1],
+                "activity_type": key[2],
+                "productive": key[3],
+                "team_id": row.get("team_id"),
+                "department_id": row.get("department_id"),
+                "activity_count": 0,
+                "duration_seconds": 0,
+            }
+        entry["activity_count"] += 1
+        entry["duration_seconds"] += row.get("duration_seconds") or 0
+
+    if not deltas:
+        return
+
+    stmt = upsert_insert(db).values(list(deltas.values()))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=ROLLUP_KEY,
+        set_={
+            "activity_count": ActivityDailyRollup.activity_count + stmt.excluded.activity_count,
+            "duration_seconds": ActivityDailyRollup.duration_seconds + stmt.excluded.duration_seconds,
+            "team_id": stmt.excluded.team_id,
+            "department_id": stmt.excluded.department_id,
+            "updated_at": func.now(),
+        },
+    )
+    db.execute(stmt)
+
+
+def _day_bounds(start_day: date, end_day: date) -> Tuple[datetime, datetime]:
+    return datetime.combine(start_day, time.min), datetime.combine(end_day + timedelta(days=1), time.min)
+
+
+def rebuild_rollup(db: Session, start_day: date, end_day: date) -> int:
+    """
+    Recompute the rollup for [start_day, end_day] (inclusive) from raw activities.
+
+    Rows ingested while the rebuild is running can be missed for the rebuilt
+    days; run it off-peak, or re-run it for the affected range.
+    Returns the number of rollup rows written.
+    """
+    lower, upper = _day_bounds(start_day, end_day)
+    db.execute(
+        delete(ActivityDailyRollup).where(
+            ActivityDailyRollup.day >= start_day,
+            ActivityDailyRollup.day <= end_day,
+        )
+    )
+
+    day_col = func.date(Activity.timestamp)
+    productive_col = func.coalesce(Activity.productive, "")
+    source = (
+        select(
+            Activity.employee_id,
+            func.max(Activity.team_id),
+            func.max(Activity.department_id),
+            day_col,
+            Activity.activity_type,
+            productive_col,
+            func.count(Activity.id),
+            func.coalesce(func.sum(Activity.duration_seconds), 0),
+        )
+        .where(Activity.timestamp >= lower, Activity.timestamp < upper)
+        .group_by(Activity.employee_id, day_col, Activity.activity_type, productive_col)
+    )
+    stmt = upsert_insert(db).from_select(
+        [
+            "employee_id", "team_id", "department_id", "day", "activity_type",
+            "productive", "activity_count", "duration_seconds",
+        ],
+        source,
+    )
+    # A concurrent ingest may have re-created a key after the DELETE; the
+    # rebuilt totals already include it, so they win.
+    stmt = stmt.on_conflict_do_update(
+        index_elements=ROLLUP_KEY,
+        set_={
+            "activity_count": stmt.excluded.activity_count,
+            "duration_seconds": stmt.excluded.duration_seconds,
+            "updated_at": func.now(),
+        },
+    )
+    result = db.execute(stmt)
+    db.commit()
+    return result.rowcount
+
+
+# ---------------------------
+# Reads
+# ---------------------------
+def is_day_aligned(value: Optional[datetime]) -> bool:
+    return value is None or value.time() == time.min
+
+
+def use_rollup(start: Optional[datetime], end: Optional[datetime]) -> bool:
+    return ACTIVITY_ROLLUP_READS_ENABLED and is_day_aligned(start) and is_day_aligned(end)
+
+
+def productive_counts(
+    db: Session,
+    employee_ids,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> Dict[int, Tuple[int, int]]:
+    """
+    {employee_id: (total_activities, productive_activities)} for [start, end).
+
+    `employee_ids` is a list of ids or a SELECT of ids. Served from the
+    rollup for day-aligned ranges, otherwise grouped over raw activities.
+    """
+    if use_rollup(start, end):
+        table = ActivityDailyRollup
+        total = func.sum(table.activity_count)
+        productive = func.sum(table.activity_count).filter(table.productive == "Yes")
+        filters = [table.employee_id.in_(employee_ids)]
+        if start:
+            filters.append(table.day >= start.date())
+        if end:
+            filters.append(table.day < end.date())
+    else:
+        table = Activity
+        total = func.count(table.id)
+        productive = func.count(table.id).filter(table.productive == "Yes")
+        filters = [table.employee_id.in_(employee_ids)]
+        if start:
+            filters.append(table.timestamp >= start)
+        if end:
+            filters.append(table.timestamp < end)
+
+    rows = db.execute(
+        select(table.employee_id, total, productive)
+        .where(*filters)
+        .group_by(table.employee_id)
+    ).all()
+    return {emp_id: (int(t or 0), int(p or 0)) for emp_id, t, p in rows}
+
+
+# ---------------------------
+# Consistency checking
+# ---------------------------
+def check_rollup_consistency(
+    db: Session,
+    start_day: date,
+    end_day: date,
+    sample_size: int = 20,
+) -> dict:
+    """
+    Compare rollup vs raw counts/durations for a random sample of (employee, day)
+    pairs that have activity in [start_day, end_day].
+    """
+    lower, upper = _day_bounds(start_day, end_day)
+    # Sample from raw data so days missing from the rollup are caught too
+    pairs = db.execute(
+        select(Activity.employee_id, func.date(Activity.timestamp))
+        .where(Activity.timestamp >= lower, Activity.timestamp < upper)
+        .distinct()
+    ).all()
+    sample = random.sample(pairs, min(sample_size, len(pairs)))
+
+    mismatches = []
+    for employee_id, day in sample:
+        if isinstance(day, str):  # SQLite returns date() as text
+            day = date.fromisoformat(day)
+        lower, upper = _day_bounds(day, day)
+        raw_count, raw_duration = db.execute(
+            select(func.count(Activity.id), func.coalesce(func.sum(Activity.duration_seconds), 0))
+            .where(
+                Activity.employee_id == employee_id,
+                Activity.timestamp >= lower,
+                Activity.timestamp < upper,
+            )
+        ).one()
+        rollup_count, rollup_duration = db.execute(
+            select(
+                func.coalesce(func.sum(ActivityDailyRollup.activity_count), 0),
+                func.coalesce(func.sum(ActivityDailyRollup.duration_seconds), 0),
+            )
+            .where(ActivityDailyRollup.employee_id == employee_id, ActivityDailyRollup.day == day)
+        ).one()
+        if (raw_count, raw_duration) != (rollup_count, rollup_duration):
+            mismatches.append({
+                "employee_id": employee_id,
+                "day": str(day),
+                "raw": {"activities": raw_count, "duration_seconds": raw_duration},
+                "rollup": {"activities": rollup_count, "duration_seconds": rollup_duration},
+            })
+
+    return {
+        "checked": len(sample),
+        "consistent": not mismatches,
+        "mismatches": mismatches,
+    }
@@ -1,15 +1,16 @@
 from datetime import datetime, timedelta
 from typing import Optional
+from dataclasses import replace
 import os
+import time
 
 from jose import JWTError, jwt
 from fastapi import HTTPException, Depends ,Cookie, Header
 
-from sqlalchemy.orm import Session
-
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from app.core.database import get_db
+from app.core.database import AsyncSessionLocal
 from app.services.employee_service import get_employee_by_email
+from app.utils.auth_cache import Principal, token_cache, principal_cache
 
 
 SECRET_KEY = os.getenv("SECRET_KEY", "supersecretkey")
@@ -29,17 +30,19 @@ def create_access_token(email: str, role: str, expires_delta: Optional[timedelta
     payload = {"sub": email, "role": role, "exp": expire}
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
-def get_current_user(
+async def get_current_user(
     bearer: HTTPAuthorizationCredentials = Depends(bearer_scheme),
     access_cookie: str | None = Cookie(default=None, alias="access_token"),
-    db: Session = Depends(get_db)
 ):
     """
     Accept JWT from:
     - Authorization: Bearer <token>
     - Cookie: access_token=<token>
 
-    Returns the authenticated user object.
+    Returns the authenticated user as a Principal (a cached, read-only
+    snapshot of the employee); load the Employee row when it is needed.
+    Async, so a cache hit never takes a threadpool worker; misses load the
+    employee through the async engine.
     """
 
     
@@ -53,31 +56,45 @@ def get_current_user(
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
 
-    
+    return await authenticate_token(token)
+
+
+async def authenticate_token(token: str) -> Principal:
+    """
+    Verify a JWT and return its Principal; raises HTTPException(401).
+    Shared by get_current_user and the realtime WebSocket handshake.
+    """
     credentials_exception = HTTPException(
         status_code=401, detail="Could not validate credentials"
     )
 
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        role: str = payload.get("role")
-
-        if not email:
+    claims = token_cache.get(token)
+    if claims is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
             raise credentials_exception
-
-    except JWTError:
-        raise credentials_exception
-
- 
-    user = get_employee_by_email(db, email)
-
-    if not user:
-        raise credentials_exception
+        if not payload.get("sub"):
+            raise credentials_exception
+        claims = (payload["sub"], payload.get("role"))
+        # Never keep a token cached past its own expiry
+        ttl = None
+        if payload.get("exp") is not None:
+            ttl = min(token_cache.ttl, payload["exp"] - time.time())
+        token_cache.set(token, claims, ttl=ttl)
+    email, role = claims
+
+    user = principal_cache.get(email)
+    if user is None:
+        async with AsyncSessionLocal() as db:
+            employee = await db.run_sync(get_employee_by_email, email)
+        if not employee:
+            raise credentials_exception
+        user = Principal.from_employee(employee)
+        principal_cache.set(email, user)
 
     if role and user.role != role:
-        print(f"Syncing role for user {email}: {user.role} -> {role}")
-        user.role = role
+        user = replace(user, role=role)
 
     return user
 
@@ -90,7 +107,6 @@ def require_roles(*roles: str):
     """
 
     def role_checker(current_user=Depends(get_current_user)):
-        print(f"Checking roles for user {current_user.email}: required={roles}, user_role={current_user.role}")
         if current_user.role not in roles:
             raise HTTPException(
                 status_code=403,
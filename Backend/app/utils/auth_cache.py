@@ -0,0 +1,119 @@
+# app/utils/auth_cache.py
+"""
+Per-process caches used by `get_current_user`.
+
+  - verified tokens:  raw JWT -> (email, role, exp), so the signature is
+                      checked once per token rather than once per request
+  - principals:       email -> Principal, a detached snapshot of the
+                      employee fields request handlers read
+
+Both are LRU-bounded with a TTL. Entries are dropped explicitly when an
+employee is updated, or their team or department deleted, in this
+process; other worker processes pick the change up when the TTL expires.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+from app.core.config import AUTH_CACHE_TTL_SECONDS, AUTH_CACHE_MAX_ENTRIES
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Read-only view of the authenticated employee."""
+    id: int
+    email: str
+    role: Optional[str]
+    first_name: Optional[str]
+    last_name: Optional[str]
+    department_id: Optional[int]
+    team_id: Optional[int]
+    is_active: Optional[bool]
+
+    @property
+    def name(self) -> str:
+        return f"{self.first_name or ''} {self.last_name or ''}".strip()
+
+    @classmethod
+    def from_employee(cls, emp) -> "Principal":
+        return cls(
+            id=emp.id,
+            email=emp.email,
+            role=emp.role,
+            first_name=emp.first_name,
+            last_name=emp.last_name,
+            department_id=emp.department_id,
+            team_id=emp.team_id,
+            is_active=emp.is_active,
+        )
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire `ttl` seconds after insertion."""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        if self.max_entries <= 0:
+            return
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def pop_where(self, predicate: Callable[[Any], bool]) -> int:
+        """Drop every entry whose value matches; returns how many were dropped."""
+        with self._lock:
+            keys = [key for key, (_, value) in self._data.items() if predicate(value)]
+            for key in keys:
+                del self._data[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        return {"entries": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+token_cache = TTLCache(AUTH_CACHE_TTL_SECONDS, AUTH_CACHE_MAX_ENTRIES)
+principal_cache = TTLCache(AUTH_CACHE_TTL_SECONDS, AUTH_CACHE_MAX_ENTRIES)
+
+
+def invalidate_principal(email: Optional[str]) -> None:
+    """Call after an employee's profile, role or status changes."""
+    if email:
+        principal_cache.pop(email)
+
+
+def invalidate_principals_in(team_ids: Iterable[int] = (), department_ids: Iterable[int] = ()) -> None:
+    """Call after teams or departments are deleted; their members' cached ids are stale."""
+    team_ids, department_ids = set(team_ids), set(department_ids)
+    principal_cache.pop_where(lambda p: p.team_id in team_ids or p.department_id in department_ids)
@@ -0,0 +1,25 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Opaque keyset cursor from the sort-key values of the last row of a page.
+    Datetimes/dates are carried as ISO strings.
+    """
+    raw = json.dumps([v.isoformat() if isinstance(v, (datetime, date)) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Inverse of encode_cursor; raises ValueError for anything it did not produce."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
@@ -0,0 +1,219 @@
+# app/utils/response_cache.py
+"""
+Cache for computed dashboard responses.
+
+Values are stored as JSON in Redis when REDIS_URL is reachable at startup,
+otherwise in a per-process TTLCache. Three properties matter for the
+dashboard aggregates that use it:
+
+  - per-call TTLs:   each endpoint passes its own TTL
+  - single flight:   concurrent misses for the same key in this process
+                     await one computation instead of each running it
+  - generations:     keys embed a per-namespace generation number;
+                     `invalidate(namespace)` bumps it, so every cached
+                     entry in the namespace is bypassed at once and old
+                     entries simply expire
+
+Writers should prefer `invalidate_on_commit(session, namespace)` so the
+bump happens only after the new rows are visible to readers.
+"""
+import asyncio
+import json
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+import redis.asyncio as aioredis
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import REDIS_URL, RESPONSE_CACHE_ENABLED, RESPONSE_CACHE_MAX_ENTRIES
+from app.utils.auth_cache import TTLCache
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_MISSING = object()
+_RETRY = object()  # the computation was cancelled; waiters start their own
+
+
+class ResponseCache:
+    def __init__(self, enabled: bool, max_entries: int):
+        self.enabled = enabled
+        self.redis = None
+        self._memory = TTLCache(0, max_entries)
+        self._generations: Dict[str, int] = defaultdict(int)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def init(self, url: Optional[str] = REDIS_URL) -> None:
+        """Connect to Redis if configured and reachable; otherwise stay in memory."""
+        self._loop = asyncio.get_running_loop()
+        if not (self.enabled and url):
+            return
+        client = aioredis.from_url(url, decode_responses=True)
+        try:
+            await client.ping()
+        except Exception as e:
+            logger.warning("Response cache: Redis unavailable (%s), using in-memory cache", e)
+            await client.aclose()
+            return
+        self.redis = client
+        logger.info("Response cache: using Redis")
+
+    async def close(self) -> None:
+        if self.redis is not None:
+            await self.redis.aclose()
+            self.redis = None
+
+    # ---------------------------
+    # Generations
+    # ---------------------------
+    async def _generation(self, namespace: str) -> int:
+        if self.redis is not None:
+            return int(await self.redis.get(f"cache:gen:{namespace}") or 0)
+        return self._generations[namespace]
+
+    async def _bump_redis(self, namespace: str) -> None:
+        try:
+            await self.redis.incr(f"cache:gen:{namespace}")
+        except Exception as e:
+            logger.error("Response cache: invalidating %s in Redis failed: %s", namespace, e)
+
+    def invalidate(self, namespace: str) -> None:
+        """
+        Drop every cached entry in `namespace`.
+
+        Safe to call from sync code, including worker threads; the Redis
+        update is scheduled on the event loop.
+        """
+        self._generations[namespace] += 1
+        if self.redis is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is not None:
+            task = loop.create_task(self._bump_redis(namespace))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        elif self._loop is not None and not self._loop.is_closed():
+            asyncio.run_coroutine_threadsafe(self._bump_redis(namespace), self._loop)
+
+    # ---------------------------
+    # Storage
+    # ---------------------------
+    async def _load(self, key: str) -> Any:
+        if self.redis is not None:
+            try:
+                raw = await self.redis.get(key)
+            except Exception as e:
+                logger.error("Response cache: Redis read failed: %s", e)
+                return _MISSING
+            return _MISSING if raw is None else json.loads(raw)
+        value = self._memory.get(key)
+        return _MISSING if value is None else value
+
+    async def _store(self, key: str, value: Any, ttl: float) -> None:
+        if self.redis is not None:
+            try:
+                await self.redis.set(key, json.dumps(value, default=str), ex=max(1, int(ttl)))
+            except Exception as e:
+                logger.error("Response cache: Redis write failed: %s", e)
+            return
+        self._memory.set(key, value, ttl=ttl)
+
+    # ---------------------------
+    # Public API
+    # ---------------------------
+    async def get_or_compute(
+        self,
+        namespace: str,
+        key: str,
+        ttl: float,
+        compute: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        Return the cached value for `key`, or await `compute()` and cache it.
+
+        `compute` must return something JSON-serializable. Errors are not
+        cached; they propagate to every caller waiting on that computation.
+        If the caller running it is cancelled (client gone), the waiters do
+        not inherit the cancellation: the next one runs its own `compute`.
+        """
+        if not self.enabled or ttl <= 0:
+            return await compute()
+
+        full_key = f"cache:{namespace}:{await self._generation(namespace)}:{key}"
+        while True:
+            value = await self._load(full_key)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+
+            flight = self._inflight.get(full_key)
+            if flight is None:
+                break
+            self.coalesced += 1
+            value = await asyncio.shield(flight)
+            if value is not _RETRY:
+                return value
+
+        self.misses += 1
+        flight = asyncio.get_running_loop().create_future()
+        self._inflight[full_key] = flight
+        try:
+            value = await compute()
+            await self._store(full_key, value, ttl)
+            flight.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            flight.set_result(_RETRY)
+            raise
+        except BaseException as e:
+            flight.set_exception(e)
+            # Mark retrieved so an unawaited failure is not logged
+            flight.exception()
+            raise
+        finally:
+            self._inflight.pop(full_key, None)
+
+    def stats(self) -> dict:
+        return {
+            "backend": "redis" if self.redis is not None else "memory",
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+        }
+
+
+response_cache = ResponseCache(enabled=RESPONSE_CACHE_ENABLED, max_entries=RESPONSE_CACHE_MAX_ENTRIES)
+
+
+# ---------------------------
+# Invalidate after the writer's transaction commits
+# ---------------------------
+_PENDING_KEY = "response_cache_invalidate"
+
+
+def invalidate_on_commit(session, namespace: str) -> None:
+    """Invalidate `namespace` once `session` (sync or async) commits; a rollback discards it."""
+    sync_session = getattr(session, "sync_session", session)
+    sync_session.info.setdefault(_PENDING_KEY, set()).add(namespace)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    for namespace in session.info.pop(_PENDING_KEY, ()):
+        response_cache.invalidate(namespace)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -1,9 +1,136 @@
+# app/utils/security.py
+"""
+Password hashing.
+
+bcrypt is deliberately slow, so hashing and verification run on a small
+dedicated thread pool instead of the shared request threadpool. A burst
+of logins then queues here (up to PASSWORD_HASH_MAX_QUEUE waiting jobs,
+beyond which callers get PasswordHasherBusy) while other endpoints keep
+their threads.
+
+The cost factor comes from BCRYPT_ROUNDS. Hashes made with a different
+cost still verify, and `verify_and_update` returns a replacement hash so
+login can upgrade them transparently.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.config import BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE
+
+# min == max == default: any other cost is reported as needing an update
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full; retry shortly."""
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._pending = 0       # submitted, not finished (queued + running)
+        self._running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait_ms = 0.0
+        self.total_run_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    def _submit(self, fn, *args) -> Future:
+        with self._lock:
+            if self._pending - self._running >= self.max_queue:
+                self.rejected += 1
+                raise PasswordHasherBusy("Password hashing queue is full")
+            self._pending += 1
+        return self._executor.submit(self._timed, time.perf_counter(), fn, *args)
+
+    def _timed(self, submitted: float, fn, *args):
+        started = time.perf_counter()
+        with self._lock:
+            self._running += 1
+        try:
+            return fn(*args)
+        finally:
+            finished = time.perf_counter()
+            wait_ms = (started - submitted) * 1000
+            with self._lock:
+                self._running -= 1
+                self._pending -= 1
+                self.completed += 1
+                self.total_wait_ms += wait_ms
+                self.total_run_ms += (finished - started) * 1000
+                self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    # Blocking variants, for sync code paths
+    def hash(self, password: str) -> str:
+        return self._submit(pwd_context.hash, password).result()
+
+    def verify(self, password: str, hashed: str) -> bool:
+        return self._submit(pwd_context.verify, password, hashed).result()
+
+    def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        return self._submit(pwd_context.verify_and_update, password, hashed).result()
+
+    def hash_many(self, passwords: List[str]) -> List[str]:
+        """
+        Hash a batch in parallel across the pool.
+
+        Keeps at most `workers` hashes in flight, so logins queued meanwhile
+        are interleaved instead of waiting behind the whole batch.
+        """
+        hashed: List[str] = []
+        for i in range(0, len(passwords), self.workers):
+            futures = [self._submit(pwd_context.hash, p) for p in passwords[i:i + self.workers]]
+            hashed.extend(f.result() for f in futures)
+        return hashed
+
+    # Awaitable variants, for async endpoints
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(pwd_context.hash, password))
+
+    async def verify_async(self, password: str, hashed: str) -> bool:
+        return await asyncio.wrap_future(self._submit(pwd_context.verify, password, hashed))
+
+    async def verify_and_update_async(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """(valid, new_hash); new_hash is set when `hashed` uses an outdated cost."""
+        return await asyncio.wrap_future(self._submit(pwd_context.verify_and_update, password, hashed))
+
+    def stats(self) -> dict:
+        with self._lock:
+            done = self.completed or 1
+            return {
+                "workers": self.workers,
+                "rounds": BCRYPT_ROUNDS,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "max_queue": self.max_queue,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self.total_wait_ms / done, 2),
+                "max_wait_ms": round(self.max_wait_ms, 2),
+                "avg_hash_ms": round(self.total_run_ms / done, 2),
+            }
+
+
+password_hasher = PasswordHasher(workers=PASSWORD_HASH_WORKERS, max_queue=PASSWORD_HASH_MAX_QUEUE)
+
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.verify(plain_password, hashed_password)
@@ -0,0 +1,73 @@
+# benchmarks/activity_ingest.py
+"""
+Activity ingestion rows/sec: one row per request vs batched inserts.
+
+Runs the write path behind each endpoint against the configured database:
+
+    single  POST /activities/       build_activity_values + insert_activity,
+                                    one INSERT and one commit per row
+    batch   POST /activities/batch  build_activity_values per row, then one
+                                    bulk_insert_activities per `--batch-size`
+
+Both include classification and the daily-rollup upsert, and exclude HTTP
+parsing, so the difference is the per-row round-trips and commits.
+
+    python -m benchmarks.activity_ingest --rows 5000 --batch-size 500
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from benchmarks.seed import create_tables
+
+from app.core.database import SessionLocal
+from app.schemas.activity import ActivityCreate
+from app.services.activity_service import build_activity_values, bulk_insert_activities, insert_activity
+from app.utils.auth_cache import Principal
+
+EMPLOYEE = Principal(id=1, email="bench@example.com", role="Employee", first_name="B", last_name=None,
+                     department_id=1, team_id=1, is_active=True)
+
+
+def activities(count: int) -> List[ActivityCreate]:
+    start = datetime(2026, 10, 1, 9)
+    return [
+        ActivityCreate(activity_type="app" if i % 2 else "website", name=f"App {i % 40}",
+                       timestamp=start + timedelta(seconds=5 * i))
+        for i in range(count)
+    ]
+
+
+def run(rows: int = 5000, batch_size: int = 500) -> Dict[str, float]:
+    """Rows per second for each path."""
+    create_tables()
+    items = activities(rows)
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        for item in items:
+            insert_activity(db, build_activity_values(item, EMPLOYEE, timestamp=item.timestamp))
+        single = rows / (time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for i in range(0, rows, batch_size):
+            chunk = items[i:i + batch_size]
+            bulk_insert_activities(db, [build_activity_values(a, EMPLOYEE, timestamp=a.timestamp) for a in chunk])
+        batch = rows / (time.perf_counter() - started)
+    finally:
+        db.close()
+    return {"rows": rows, "batch_size": batch_size, "single_rows_per_s": single, "batch_rows_per_s": batch}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    for name, value in run(args.rows, args.batch_size).items():
+        print(f"{name:>18}: {value:,.0f}" if isinstance(value, float) else f"{name:>18}: {value}")
+
+
+if __name__ == "__main__":
+    main()
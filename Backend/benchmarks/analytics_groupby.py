@@ -0,0 +1,90 @@
+# benchmarks/analytics_groupby.py
+"""
+Department analytics over a large activity table: counting in Python vs
+GROUP BY in the database.
+
+Seeds `--rows` activities (default 1M, a year of data) into one
+department, then answers GET /analytics/department/{id} both ways:
+
+    python  load every matching Activity ORM object and count activity_type
+            in a dict (the endpoint before aggregate_activity_counts)
+    sql     aggregate_activity_counts: GROUP BY activity_type in the database
+
+Reports wall time and peak Python memory (tracemalloc, in a second
+untimed pass) for each, and checks that both produce the same counts.
+
+    python -m benchmarks.analytics_groupby --rows 1000000
+"""
+import argparse
+import time
+import tracemalloc
+from typing import Callable, Dict, Tuple
+
+from benchmarks.seed import seed_activities
+
+from app.core.database import SessionLocal
+from app.models.activity import Activity
+from app.services.analytics_service import aggregate_activity_counts
+
+DEPARTMENT_ID = 1
+
+
+def count_in_python(db, department_id: int) -> Dict:
+    activities_by_type = {}
+    for act in db.query(Activity).filter(Activity.department_id == department_id).all():
+        activities_by_type[act.activity_type] = activities_by_type.get(act.activity_type, 0) + 1
+    return {"total_activities": sum(activities_by_type.values()), "activities_by_type": activities_by_type}
+
+
+def count_in_sql(db, department_id: int) -> Dict:
+    return aggregate_activity_counts(db, Activity.department_id, department_id)
+
+
+def _measure(fn: Callable, department_id: int) -> Tuple[Dict, float, float]:
+    # Timed and traced in separate passes: tracemalloc slows allocation-heavy code several-fold
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        result = fn(db, department_id)
+        elapsed = time.perf_counter() - started
+    finally:
+        db.close()
+    db = SessionLocal()
+    tracemalloc.start()
+    try:
+        fn(db, department_id)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        db.close()
+    return result, elapsed * 1000, peak / 2**20
+
+
+def run(rows: int = 1000000, seed: bool = True) -> Dict[str, Dict[str, float]]:
+    """Wall time (ms) and peak traced memory (MiB) per approach."""
+    if seed:
+        seed_activities(rows, departments=1)
+    sql_result, sql_ms, sql_mib = _measure(count_in_sql, DEPARTMENT_ID)
+    py_result, py_ms, py_mib = _measure(count_in_python, DEPARTMENT_ID)
+    if sql_result != py_result:
+        raise AssertionError(f"Counts differ: {sql_result} != {py_result}")
+    return {
+        "python": {"ms": py_ms, "peak_mib": py_mib},
+        "sql": {"ms": sql_ms, "peak_mib": sql_mib},
+        "activities": sql_result["total_activities"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--no-seed", action="store_true", help="reuse the rows already in DATABASE_URL")
+    args = parser.parse_args()
+    result = run(args.rows, seed=not args.no_seed)
+    print(f"activities: {result.pop('activities')}")
+    for approach, row in result.items():
+        print(f"{approach:>8}: {row['ms']:,.0f} ms, peak {row['peak_mib']:,.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
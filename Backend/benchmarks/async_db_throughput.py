@@ -0,0 +1,127 @@
+# benchmarks/async_db_throughput.py
+"""
+Concurrent throughput of the analytics endpoint on the sync and async
+database layers.
+
+Serves the same aggregate_activity_counts query two ways and drives each
+with `--concurrency` simultaneous clients over ASGI:
+
+    sync   def endpoint on a sync Session; each request holds a threadpool
+           worker for the whole query (the layout before the async engine)
+    async  async def endpoint on an AsyncSession (GET /analytics/employee/{id})
+
+Reports requests/s, p50/p99 latency and failed requests. With more
+concurrent requests than pooled connections the sync layout can stall:
+FastAPI validates a sync endpoint's response on a threadpool worker, and
+every worker may be blocked on a pool checkout waiting for a connection
+that only such a validation (and the session close after it) releases.
+Those requests fail after DB_POOL_TIMEOUT (5 s here unless set) and are
+counted as errors. On a local SQLite file the query itself is CPU-bound;
+point DATABASE_URL at PostgreSQL over the network to see workers waiting
+on I/O as well.
+
+    python -m benchmarks.async_db_throughput --rows 200000 --requests 2000 --concurrency 200
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import Dict
+
+# Fail stalled sync checkouts sooner; the async pool keeps the app's default wait
+os.environ.setdefault("DB_POOL_TIMEOUT", "5")
+os.environ.setdefault("ASYNC_DB_POOL_TIMEOUT", "30")
+
+from benchmarks.seed import seed_activities
+
+import anyio.to_thread
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy.orm import Session
+
+from app.core.database import async_engine, get_read_db
+from app.models.activity import Activity
+from app.routers import analytics_router
+from app.services.analytics_service import aggregate_activity_counts
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(analytics_router.router)
+
+    @app.get("/sync/analytics/employee/{employee_id}")
+    def sync_employee_analytics(employee_id: int, db: Session = Depends(get_read_db)) -> Dict:
+        return {"employee_id": employee_id, **aggregate_activity_counts(db, Activity.employee_id, employee_id)}
+
+    return app
+
+
+async def _drive(app: FastAPI, path: str, requests: int, concurrency: int, employees: int) -> Dict:
+    latencies = []
+    errors = 0
+    pending = iter(range(requests))
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        nonlocal errors
+        for i in pending:
+            started = time.perf_counter()
+            response = await client.get(path.format(employee_id=i % employees + 1))
+            if response.status_code != 200:
+                errors += 1  # e.g. pool checkout timeouts
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests_per_s": requests / elapsed,
+        "latency_ms_p50": statistics.median(latencies),
+        "latency_ms_p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        "errors": errors,
+    }
+
+
+async def run(
+    rows: int = 200000,
+    requests: int = 2000,
+    concurrency: int = 200,
+    employees: int = 100,
+    threads: int = 40,
+    seed: bool = True,
+) -> Dict[str, Dict]:
+    """Timings and error counts per layer; `threads` is the threadpool size (Starlette's default is 40)."""
+    if seed:
+        seed_activities(rows, employees=employees)
+    anyio.to_thread.current_default_thread_limiter().total_tokens = threads
+    app = build_app()
+    try:
+        return {
+            "sync": await _drive(app, "/sync/analytics/employee/{employee_id}", requests, concurrency, employees),
+            "async": await _drive(app, "/analytics/employee/{employee_id}", requests, concurrency, employees),
+        }
+    finally:
+        # aiosqlite connections run on their own threads, which would keep the process alive
+        await async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000, help="activities to seed first")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=40)
+    parser.add_argument("--no-seed", action="store_true", help="reuse the rows already in DATABASE_URL")
+    args = parser.parse_args()
+    result = asyncio.run(run(args.rows, args.requests, args.concurrency, threads=args.threads, seed=not args.no_seed))
+    for layer, row in result.items():
+        print(layer)
+        for name, value in row.items():
+            print(f"  {name:>16}: {value:.2f}" if isinstance(value, float) else f"  {name:>16}: {value}")
+
+
+if __name__ == "__main__":
+    main()
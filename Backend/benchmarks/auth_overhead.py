@@ -0,0 +1,84 @@
+# benchmarks/auth_overhead.py
+"""
+Per-request authentication overhead with and without the auth cache.
+
+Calls authenticate_token (the body of get_current_user) repeatedly for
+one employee's token:
+
+    uncached  both caches emptied before every call: JWT signature check
+              plus an employee lookup through the async engine, which is
+              what every request paid before the cache
+    cached    verified-token and principal cache hits, no database access
+
+Reports microseconds per call and the database queries issued.
+
+    python -m benchmarks.auth_overhead --calls 2000
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict
+
+from benchmarks.seed import create_tables
+
+from sqlalchemy import event
+
+from app.core.database import SessionLocal, async_engine
+from app.models.employee import Employee
+from app.utils.auth import authenticate_token, create_access_token
+from app.utils.auth_cache import principal_cache, token_cache
+
+EMAIL = "auth-bench@example.com"
+
+
+def _employee() -> None:
+    db = SessionLocal()
+    try:
+        if not db.query(Employee).filter(Employee.email == EMAIL).first():
+            db.add(Employee(first_name="Auth", last_name="Bench", email=EMAIL, password="x", role="Employee"))
+            db.commit()
+    finally:
+        db.close()
+
+
+async def _time(token: str, calls: int, cached: bool) -> Dict[str, float]:
+    queries = []
+    listener = lambda *args: queries.append(1)  # noqa: E731
+    event.listen(async_engine.sync_engine, "before_cursor_execute", listener)
+    try:
+        await authenticate_token(token)  # warm up
+        queries.clear()
+        started = time.perf_counter()
+        for _ in range(calls):
+            if not cached:
+                token_cache.clear()
+                principal_cache.clear()
+            await authenticate_token(token)
+        elapsed = time.perf_counter() - started
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", listener)
+    return {"us_per_call": elapsed / calls * 1e6, "queries_per_call": len(queries) / calls}
+
+
+async def run(calls: int = 2000) -> Dict[str, Dict[str, float]]:
+    create_tables()
+    _employee()
+    token = create_access_token(EMAIL, "Employee")
+    try:
+        return {"uncached": await _time(token, calls, False), "cached": await _time(token, calls, True)}
+    finally:
+        token_cache.clear()
+        principal_cache.clear()
+        await async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+    for mode, row in asyncio.run(run(args.calls)).items():
+        print(f"{mode:>9}: {row['us_per_call']:,.1f} us/call, {row['queries_per_call']:.2f} queries/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# benchmarks/realtime_encoding.py
+"""
+Encode cost and bytes on the wire for realtime frames.
+
+For a frame fanned out to N subscribers, compares serialising it once per
+subscriber (json.dumps in the send loop) with encoding it once through
+Frame and sharing the payload, in JSON and msgpack, and reports the
+payload size of each encoding and of the Redis envelope between workers.
+
+    python -m benchmarks.realtime_encoding --subscribers 5000
+"""
+import argparse
+import json
+import os
+import time
+from typing import Dict
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app.services.realtime_service import ENCODINGS, Frame, pack_envelope
+
+FRAMES = {
+    "activity": {
+        "type": "app",
+        "employee_id": 42,
+        "team_id": 3,
+        "department_id": 1,
+        "name": "Visual Studio Code",
+        "productive": "Yes",
+        "timestamp": "2026-10-18T09:30:00",
+    },
+    "state.delta": {
+        "type": "state.delta",
+        "epoch": "3f9a1c2b7d4e",
+        "seq": 10482,
+        "prev": 10417,
+        "employee_id": 42,
+        "changes": {"current_app": "Slack", "idle": False, "last_seen": "2026-10-18T09:30:05"},
+    },
+}
+
+
+def _best_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def run(subscribers: int = 5000, repeat: int = 5) -> Dict[str, Dict]:
+    """Per frame kind: encode time in ms for one fan-out, and payload sizes in bytes."""
+    results = {}
+    for kind, data in FRAMES.items():
+        row = {
+            "per_subscriber_json_ms": _best_ms(
+                lambda: [json.dumps(data, default=str) for _ in range(subscribers)], repeat
+            ),
+            "json_bytes": len(json.dumps(data, default=str).encode()),
+        }
+        for encoding in ENCODINGS:
+            def encode_once(encoding=encoding):
+                frame = Frame(data)
+                for _ in range(subscribers):
+                    frame.encode(encoding)
+
+            payload = Frame(data).encode(encoding)
+            row[f"shared_{encoding}_ms"] = _best_ms(encode_once, repeat)
+            row[f"shared_{encoding}_bytes"] = len(payload.encode() if isinstance(payload, str) else payload)
+        row["redis_envelope_bytes"] = len(pack_envelope(Frame(data), ["org", "team:3"], None))
+        results[kind] = row
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--subscribers", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    for kind, row in run(args.subscribers, args.repeat).items():
+        print(f"{kind} ({args.subscribers} subscribers)")
+        for name, value in row.items():
+            print(f"  {name:>24}: {value:.3f}" if isinstance(value, float) else f"  {name:>24}: {value}")
+
+
+if __name__ == "__main__":
+    main()
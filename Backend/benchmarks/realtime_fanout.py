@@ -0,0 +1,126 @@
+# benchmarks/realtime_fanout.py
+"""
+Fan-out latency for the realtime WebSocket hub.
+
+Connects N in-memory sockets to a ConnectionManager, publishes frames to
+a topic every socket holds, and reports how long publish() blocks and
+how long each socket waits for its copy (p50 / p99 / max, measured from
+the publish call to the socket's send). With --redis the frame goes
+through RedisFanout on a fakeredis server first, as it would between
+workers.
+
+    python -m benchmarks.realtime_fanout --sockets 5000 --rounds 20
+    python -m benchmarks.realtime_fanout --sockets 5000 --redis
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import Dict, List
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app.services.realtime_service import ConnectionManager, Frame
+from app.utils.auth_cache import Principal
+
+TOPIC = "org"
+FRAME = {
+    "type": "app",
+    "employee_id": 42,
+    "team_id": 3,
+    "department_id": 1,
+    "name": "Visual Studio Code",
+    "productive": "Yes",
+    "timestamp": "2026-10-18T09:30:00",
+}
+
+
+class TimedSocket:
+    """Stands in for a WebSocket; records when each frame reached it."""
+
+    def __init__(self, round_state: dict):
+        self.round_state = round_state
+
+    async def send_text(self, payload):
+        state = self.round_state
+        state["latencies"].append(time.perf_counter() - state["published_at"])
+        if len(state["latencies"]) == state["expected"]:
+            state["done"].set()
+
+    send_bytes = send_text
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(sockets: int = 5000, rounds: int = 20, encoding: str = "json", redis: bool = False) -> Dict:
+    """Returns publish and delivery timings in milliseconds, plus the delivered count."""
+    manager = ConnectionManager()
+    state = {"latencies": [], "expected": sockets, "published_at": 0.0, "done": asyncio.Event()}
+    subs = []
+    for i in range(sockets):
+        principal = Principal(id=i + 1, email=f"user{i}@example.com", role="Employee", first_name="U",
+                              last_name=None, department_id=1, team_id=(i % 50) + 1, is_active=True)
+        subs.append(manager.connect(TimedSocket(state), principal, [TOPIC, f"team:{principal.team_id}"], encoding))
+
+    fanout = None
+    if redis:
+        import fakeredis
+
+        from app.services.realtime_presence import RedisFanout
+
+        fanout = RedisFanout(fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer()), manager)
+        await fanout.start()
+
+    publish_ms, delivery = [], []
+    delivered = 0
+    try:
+        for _ in range(rounds):
+            state["latencies"] = []
+            state["done"] = asyncio.Event()
+            state["published_at"] = time.perf_counter()
+            if fanout is not None:
+                await fanout.publish(Frame(FRAME), [TOPIC], None)
+            else:
+                manager.publish(Frame(FRAME), [TOPIC])
+            publish_ms.append((time.perf_counter() - state["published_at"]) * 1000)
+            await asyncio.wait_for(state["done"].wait(), 30)
+            delivered += len(state["latencies"])
+            delivery.extend(latency * 1000 for latency in state["latencies"])
+    finally:
+        if fanout is not None:
+            await fanout.stop()
+        for sub in subs:
+            await manager.disconnect(sub)
+
+    return {
+        "sockets": sockets,
+        "rounds": rounds,
+        "delivered": delivered,
+        "publish_ms_p50": statistics.median(publish_ms),
+        "delivery_ms_p50": _percentile(delivery, 50),
+        "delivery_ms_p99": _percentile(delivery, 99),
+        "delivery_ms_max": max(delivery),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sockets", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--encoding", choices=("json", "msgpack"), default="json")
+    parser.add_argument("--redis", action="store_true", help="route frames through RedisFanout on fakeredis")
+    args = parser.parse_args()
+    result = asyncio.run(run(args.sockets, args.rounds, args.encoding, args.redis))
+    for name, value in result.items():
+        print(f"{name:>16}: {value:.2f}" if isinstance(value, float) else f"{name:>16}: {value}")
+
+
+if __name__ == "__main__":
+    main()
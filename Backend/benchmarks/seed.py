@@ -0,0 +1,60 @@
+# benchmarks/seed.py
+"""
+Synthetic data for the database benchmarks.
+
+Import this before any `app` module: without DATABASE_URL it points the
+app at a fresh SQLite file in a temporary directory. Set DATABASE_URL to
+run a benchmark against PostgreSQL instead (use a scratch database; the
+benchmarks add rows).
+"""
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "benchmark.db"))
+
+from sqlalchemy import insert
+
+from app.core.database import Base, engine
+# Every model, so relationships between them can be configured
+from app.models import (  # noqa: F401
+    activity, activity_rollup, alert, attendance, department, employee, leave, notification,
+    productive_entity, productivity, project, report_log, screenshot, setting, task, team,
+)
+from app.models.activity import Activity
+
+ACTIVITY_TYPES = ("app", "website", "idle", "meeting")
+START = datetime(2025, 10, 1)
+
+
+def create_tables() -> None:
+    Base.metadata.create_all(bind=engine)
+
+
+def activity_rows(count: int, employees: int = 100, teams: int = 10, departments: int = 2, days: int = 365):
+    """`count` activity rows spread over `employees` and `days`, as insert() values."""
+    step = timedelta(days=days) / max(count, 1)
+    for i in range(count):
+        employee_id = i % employees + 1
+        team_id = employee_id % teams + 1
+        yield {
+            "employee_id": employee_id,
+            "team_id": team_id,
+            "department_id": team_id % departments + 1,
+            "activity_type": ACTIVITY_TYPES[i % len(ACTIVITY_TYPES)],
+            "name": f"App {i % 50}",
+            "productive": "Yes" if i % 3 else "No",
+            "timestamp": START + step * i,
+        }
+
+
+def seed_activities(count: int, chunk: int = 10000, **spread) -> None:
+    """Insert `count` synthetic activities in multi-row chunks."""
+    create_tables()
+    rows = activity_rows(count, **spread)
+    with engine.begin() as conn:
+        while True:
+            batch = [row for _, row in zip(range(chunk), rows)]
+            if not batch:
+                break
+            conn.execute(insert(Activity), batch)
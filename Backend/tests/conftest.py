@@ -0,0 +1,44 @@
+# tests/conftest.py
+"""
+Tests run against a throwaway SQLite database (DATABASE_URL is read at
+import time, so it is set before anything from `app` is imported).
+Run from Backend/:  python -m pytest -q
+"""
+import os
+import tempfile
+
+_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="backend-tests-"), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_PATH}"
+os.environ.setdefault("REDIS_URL", "redis://127.0.0.1:1")  # nothing listens: in-memory fallbacks
+os.environ.setdefault("BCRYPT_ROUNDS", "4")  # the minimum; hashing cost is not under test
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app  # noqa: E402  registers every model and creates the tables
+from app.core.database import Base, SessionLocal, engine
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        with engine.begin() as conn:
+            for table in reversed(Base.metadata.sorted_tables):
+                conn.execute(table.delete())
+
+
+@pytest.fixture
+def client(db):
+    """TestClient with startup run (creates the default admin, sam@example.com)."""
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def admin_headers(client):
+    response = client.post("/auth/login", json={"email": "sam@example.com", "password": "sam123"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
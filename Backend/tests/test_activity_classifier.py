@@ -0,0 +1,96 @@
+# tests/test_activity_classifier.py
+import threading
+import time
+
+from app.services.activity_classifier import ActivityClassifier, ProductiveMatcher
+
+
+def test_stale_matcher_refreshes_in_background():
+    classifier = ActivityClassifier(refresh_seconds=0)
+    old = ProductiveMatcher([("slack", "app", True)])
+    new = ProductiveMatcher([("slack", "app", False)])
+    classifier._matcher = old
+    reloads = []
+
+    def slow_reload(db=None):
+        reloads.append(1)
+        time.sleep(0.3)  # a slow catalogue query
+        classifier._matcher = new
+        classifier._loaded_at = time.monotonic()
+
+    classifier.reload = slow_reload
+
+    started = time.perf_counter()
+    assert classifier.classify("app", "Slack") == "Yes"  # served from the stale matcher
+    assert classifier.classify("app", "Slack") == "Yes"
+    assert time.perf_counter() - started < 0.1
+
+    deadline = time.monotonic() + 2
+    while classifier._matcher is not new and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert reloads == [1]  # one refresh at a time
+    assert classifier.classify("app", "Slack") == "No"
+
+
+class SlowSession:
+    """Stands in for a Session whose catalogue query returns `rows` after a delay."""
+
+    def __init__(self, rows, delay=0.0):
+        self.rows = rows
+        self.delay = delay
+
+    def query(self, *columns):
+        return self
+
+    def all(self):
+        time.sleep(self.delay)
+        return self.rows
+
+
+def test_slow_refresh_does_not_undo_a_later_reload():
+    classifier = ActivityClassifier(refresh_seconds=60)
+    stale = threading.Thread(target=classifier.reload, args=(SlowSession([("slack", "app", True)], 0.3),))
+    stale.start()
+    time.sleep(0.05)  # the refresh has read the catalogue before the admin's edit
+    classifier.reload(SlowSession([("slack", "app", False)]))
+    stale.join()
+
+    assert classifier.classify("app", "Slack") == "No"
+
+
+def test_exact_app_names_match_case_insensitively():
+    matcher = ProductiveMatcher([("Visual Studio Code", "app", True), ("Steam", "app", False)])
+    assert matcher.match("app", "visual studio code ") is True
+    assert matcher.match("app", "STEAM") is False
+    assert matcher.match("app", "Steam Link") is None
+    assert matcher.match("app", None) is None
+
+
+def test_website_suffixes_match_subdomains_and_the_longest_wins():
+    matcher = ProductiveMatcher([
+        ("youtube.com", "website", False),
+        ("studio.youtube.com", "website", True),
+        ("https://www.GitHub.com/", "website", True),
+    ])
+    assert matcher.match("website", "https://m.youtube.com/watch?v=1") is False
+    assert matcher.match("website", "studio.youtube.com") is True
+    assert matcher.match("website", "api.studio.youtube.com:443/x") is True
+    assert matcher.match("website", "www.github.com") is True
+    assert matcher.match("website", "github.com") is None  # only www.github.com was catalogued
+    assert matcher.match("website", "notyoutube.com") is None
+    # Websites are not looked up as app names and vice versa
+    assert matcher.match("app", "youtube.com") is None
+
+
+def test_wildcards_apply_after_exact_entries():
+    matcher = ProductiveMatcher([
+        ("jetbrains *", "app", True),
+        ("jetbrains toolbox", "app", False),
+        ("*.slack.com", "website", True),
+        ("game?", "app", False),
+    ])
+    assert matcher.match("app", "JetBrains PyCharm") is True
+    assert matcher.match("app", "JetBrains Toolbox") is False
+    assert matcher.match("app", "games") is False
+    assert matcher.match("app", "gamess") is None
+    assert matcher.match("website", "https://acme.slack.com/messages") is True
@@ -0,0 +1,17 @@
+# tests/test_activity_partition_service.py
+from fastapi.testclient import TestClient
+
+from app import main
+from app.services.activity_partition_service import run_maintenance
+
+
+def test_maintenance_task_is_cancelled_on_shutdown(db):
+    with TestClient(main.app):
+        task = main.maintenance_task
+        assert task is not None and not task.done()
+    assert task.cancelled()
+
+
+def test_maintenance_runs_without_lock_off_postgres(db):
+    # SQLite has no advisory locks (and a single process); the round always runs
+    assert run_maintenance() == {"created": [], "retired": [], "skipped": False}
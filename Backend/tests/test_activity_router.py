@@ -0,0 +1,36 @@
+# tests/test_activity_router.py
+import pytest
+
+from app.utils.pagination import encode_cursor
+
+NDJSON = {"Accept": "application/x-ndjson"}
+
+
+@pytest.mark.parametrize("query", ["start=yesterday", "end=2026-13-40"])
+def test_ndjson_rejects_malformed_dates_before_streaming(client, admin_headers, query):
+    response = client.get(f"/activities/me?{query}", headers={**admin_headers, **NDJSON})
+    assert response.status_code == 400
+
+
+def test_ndjson_streams_valid_range(client, admin_headers):
+    client.post("/activities/", json={"activity_type": "app", "name": "Editor"}, headers=admin_headers)
+    response = client.get("/activities/me?start=2000-01-01", headers={**admin_headers, **NDJSON})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [line for line in response.text.splitlines() if line]
+
+
+@pytest.mark.parametrize("values", [[1, 2], ["2026-10-01T00:00:00", "x"], [None, None], ["not a date", 1]])
+def test_cursor_with_wrong_value_types_is_rejected(client, admin_headers, values):
+    response = client.get(f"/activities/me?cursor={encode_cursor(*values)}", headers=admin_headers)
+    assert response.status_code == 400
+
+
+def test_next_cursor_header_is_readable_cross_origin(client, admin_headers):
+    for name in ("One", "Two"):
+        client.post("/activities/", json={"activity_type": "app", "name": name}, headers=admin_headers)
+    response = client.get(
+        "/activities/me?limit=1", headers={**admin_headers, "Origin": "http://localhost:5173"}
+    )
+    assert response.headers["X-Next-Cursor"]
+    assert "x-next-cursor" in response.headers["Access-Control-Expose-Headers"].lower()
@@ -0,0 +1,82 @@
+# tests/test_activity_write_buffer.py
+import asyncio
+
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.services.activity_write_buffer import ActivityWriteBuffer, QueueFullError
+
+
+class FlakyWriter:
+    """Fails while `outages` lasts, then rejects rows marked "bad" (the whole call fails)."""
+
+    def __init__(self, outages: int = 0):
+        self.outages = outages
+        self.written = []
+        self.calls = 0
+
+    def __call__(self, db, rows):
+        self.calls += 1
+        if self.outages:
+            self.outages -= 1
+            raise OperationalError("INSERT", {}, Exception("connection refused"))
+        if any(row.get("bad") for row in rows):
+            raise IntegrityError("INSERT", {}, Exception("violates foreign key"))
+        self.written.extend(row["n"] for row in rows)
+
+
+def _buffer(writer, max_attempts=3):
+    return ActivityWriteBuffer(
+        writer, max_rows=1000, flush_rows=100, flush_interval=0.01,
+        max_attempts=max_attempts, retry_backoff=0.01,
+    )
+
+
+async def _ingest(buffer, rows, settle=0.3):
+    await buffer.start()
+    buffer.submit(rows)
+    await asyncio.sleep(settle)
+    await buffer.stop()
+
+
+def test_poison_row_is_isolated_and_dropped_after_retries():
+    writer = FlakyWriter()
+    buffer = _buffer(writer)
+    rows = [{"n": n, "bad": n == 17} for n in range(40)]
+
+    asyncio.run(_ingest(buffer, rows))
+
+    assert sorted(writer.written) == [n for n in range(40) if n != 17]
+    stats = buffer.stats()
+    assert stats["flushed_rows"] == 39
+    assert stats["dropped_rows"] == 1
+    assert stats["retried_rows"] == 2  # attempts 1 and 2 re-queued, attempt 3 drops
+    assert stats["queue_depth"] == 0
+
+
+def test_transient_failure_is_retried_without_loss():
+    writer = FlakyWriter(outages=2)
+    buffer = _buffer(writer)
+
+    asyncio.run(_ingest(buffer, [{"n": n} for n in range(10)]))
+
+    assert sorted(writer.written) == list(range(10))
+    assert writer.calls == 3  # no bisecting on connection errors
+    assert buffer.stats()["dropped_rows"] == 0
+
+
+def test_retrying_rows_count_towards_capacity():
+    writer = FlakyWriter(outages=1000)
+    buffer = ActivityWriteBuffer(writer, max_rows=10, flush_rows=10, flush_interval=0.01, retry_backoff=60)
+
+    async def scenario():
+        await buffer.start()
+        buffer.submit([{"n": n} for n in range(10)])
+        await asyncio.sleep(0.1)
+        assert buffer.depth == 10
+        with pytest.raises(QueueFullError):
+            buffer.submit([{"n": 10}])
+        await buffer.stop()
+
+    asyncio.run(scenario())
+    assert buffer.stats()["dropped_rows"] == 10
@@ -0,0 +1,107 @@
+# tests/test_analytics_service.py
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.core.database import engine
+from app.models.activity import Activity
+from app.models.department import Department
+from app.models.employee import Employee
+from app.models.team import Team
+from app.services import rollup_service
+from app.services.activity_service import list_activities_page
+from app.services.analytics_service import (
+    aggregate_activity_counts,
+    calculate_department_productivity,
+    calculate_team_productivity,
+    unproductive_counts,
+)
+from app.services.rollup_service import productive_counts, rebuild_rollup
+
+START = datetime(2026, 10, 1)
+END = datetime(2026, 10, 8)
+
+
+@contextmanager
+def count_queries():
+    counter = {"count": 0}
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        counter["count"] += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+
+def _department(db, teams, members_per_team):
+    dept = Department(name=f"Dept {teams}x{members_per_team}")
+    db.add(dept)
+    db.flush()
+    team_ids = []
+    for t in range(teams):
+        team = Team(name=f"Team {t}", department_id=dept.id)
+        db.add(team)
+        db.flush()
+        team_ids.append(team.id)
+        for m in range(members_per_team):
+            emp = Employee(first_name="Q", last_name=str(m), email=f"q{dept.id}.{t}.{m}@example.com",
+                           password="x", team_id=team.id, department_id=dept.id)
+            db.add(emp)
+            db.flush()
+            for productive in ("Yes", "No"):
+                db.add(Activity(employee_id=emp.id, team_id=team.id, department_id=dept.id,
+                                activity_type="app", name="Editor", productive=productive,
+                                timestamp=START.replace(hour=10)))
+    db.commit()
+    rebuild_rollup(db, START.date(), START.date())
+    return dept.id, team_ids
+
+
+@pytest.mark.parametrize("start, end", [(START, END), (START.replace(hour=9), END)])
+def test_team_productivity_query_count_is_constant(db, start, end):
+    counts = []
+    for members in (1, 5, 25):
+        _, (team_id,) = _department(db, 1, members)
+        with count_queries() as queries:
+            result = calculate_team_productivity(db, team_id, start, end)
+        assert result["team_score"] == 50.0
+        counts.append(queries["count"])
+    assert len(set(counts)) == 1, counts
+
+
+def test_department_productivity_query_count_is_constant(db):
+    counts = []
+    for teams in (1, 4, 12):
+        dept_id, _ = _department(db, teams, 3)
+        with count_queries() as queries:
+            result = calculate_department_productivity(db, dept_id, START, END)
+        assert result["department_score"] == 50.0
+        counts.append(queries["count"])
+    assert len(set(counts)) == 1, counts
+
+
+@pytest.mark.parametrize("rollup_reads", [False, True])
+def test_every_range_query_is_half_open(db, monkeypatch, rollup_reads):
+    monkeypatch.setattr(rollup_service, "ACTIVITY_ROLLUP_READS_ENABLED", rollup_reads)
+    emp = Employee(first_name="R", email="range@example.com", password="x")
+    db.add(emp)
+    db.flush()
+    for ts in (START, START + timedelta(days=3), END):  # the last one is on the boundary
+        db.add(Activity(employee_id=emp.id, activity_type="app", name="Game", productive="No", timestamp=ts))
+    db.commit()
+    rebuild_rollup(db, START.date(), END.date())
+
+    following = END + timedelta(days=1)
+    for lower, upper, expected in [(START, END, 2), (END, following, 1)]:
+        assert aggregate_activity_counts(
+            db, Activity.employee_id, emp.id, lower.isoformat(), upper.isoformat()
+        )["total_activities"] == expected
+        rows, _ = list_activities_page(db, emp.id, lower.isoformat(), upper.isoformat())
+        assert len(rows) == expected
+        assert productive_counts(db, [emp.id], lower, upper)[emp.id] == (expected, 0)
+        assert unproductive_counts(db, [emp.id], lower, upper) == {"Game": expected}
@@ -0,0 +1,66 @@
+# tests/test_auth_cache.py
+import pytest
+
+from app.models.department import Department
+from app.models.team import Team
+from app.utils.auth_cache import Principal, principal_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_principal_cache():
+    principal_cache.clear()
+    yield
+    principal_cache.clear()
+
+
+def _cache(email, team_id=None, department_id=None):
+    principal_cache.set(email, Principal(id=1000, email=email, role="Employee", first_name="C",
+                                         last_name=None, department_id=department_id, team_id=team_id,
+                                         is_active=True))
+
+
+def _team(db, dept_name="Ops"):
+    dept = Department(name=dept_name)
+    db.add(dept)
+    db.flush()
+    team = Team(name="Night shift", department_id=dept.id)
+    db.add(team)
+    db.commit()
+    return dept.id, team.id
+
+
+def test_deleting_a_team_evicts_its_members(client, admin_headers, db):
+    dept_id, team_id = _team(db)
+    _cache("member@x.com", team_id=team_id, department_id=dept_id)
+    _cache("colleague@x.com", team_id=team_id + 1, department_id=dept_id)
+
+    assert client.delete(f"/teams/{team_id}", headers=admin_headers).status_code == 200
+
+    assert principal_cache.get("member@x.com") is None
+    assert principal_cache.get("colleague@x.com") is not None
+
+
+def test_deleting_a_department_evicts_members_of_it_and_its_teams(client, admin_headers, db):
+    dept_id, team_id = _team(db)
+    _cache("direct@x.com", department_id=dept_id)
+    _cache("via-team@x.com", team_id=team_id)
+    _cache("elsewhere@x.com", department_id=dept_id + 1)
+
+    assert client.delete(f"/departments/{dept_id}", headers=admin_headers).status_code == 200
+
+    assert principal_cache.get("direct@x.com") is None
+    assert principal_cache.get("via-team@x.com") is None
+    assert principal_cache.get("elsewhere@x.com") is not None
+
+
+def test_leave_and_attendance_handlers_work_with_a_cached_principal(client, admin_headers):
+    client.get("/attendance/today", headers=admin_headers)  # warm the principal cache
+    assert principal_cache.get("sam@example.com") is not None
+
+    assert client.post("/attendance/punch_in", headers=admin_headers).status_code == 200
+    response = client.post(
+        "/leave/apply?leave_type=Annual&start_date=2030-01-06&end_date=2030-01-07", headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert "submitted by" in response.json()["message"]
+    assert len(client.get("/leave/my", headers=admin_headers).json()) == 1
@@ -0,0 +1,46 @@
+# tests/test_benchmarks.py
+"""Small runs of the non-realtime benchmarks/ scripts, so they keep working as the code changes."""
+import asyncio
+
+from app.models.activity import Activity
+from app.models.employee import Employee
+
+from benchmarks import (
+    activity_classifier, activity_ingest, analytics_groupby, async_db_throughput, auth_overhead, employee_import,
+)
+
+
+def test_classifier_benchmark_runs():
+    result = activity_classifier.run(entities=200, calls=2000, distinct=100)
+    assert result["warm_per_s"] > 0 and result["uncached_per_s"] > 0
+
+
+def test_async_db_benchmark_runs(db):
+    result = asyncio.run(async_db_throughput.run(rows=500, requests=20, concurrency=4, employees=5))
+    assert set(result) == {"sync", "async"}
+    assert result["sync"]["errors"] == result["async"]["errors"] == 0
+
+
+def test_ingest_benchmark_runs(db):
+    result = activity_ingest.run(rows=40, batch_size=10)
+    assert result["single_rows_per_s"] > 0 and result["batch_rows_per_s"] > 0
+    assert db.query(Activity).count() == 80
+
+
+def test_analytics_groupby_benchmark_agrees(db):
+    result = analytics_groupby.run(rows=400)
+    assert result["activities"] == 400
+    assert result["sql"]["peak_mib"] < result["python"]["peak_mib"]
+
+
+def test_auth_overhead_benchmark_skips_the_database_when_cached(db):
+    result = asyncio.run(auth_overhead.run(calls=20))
+    assert result["uncached"]["queries_per_call"] == 1
+    assert result["cached"]["queries_per_call"] == 0
+
+
+def test_employee_import_benchmark_runs(db):
+    before = db.query(Employee).count()
+    result = employee_import.run(count=30, single=10)
+    assert result["failed"] == 0
+    assert db.query(Employee).count() == before + 40
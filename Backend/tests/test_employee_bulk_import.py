@@ -0,0 +1,72 @@
+# tests/test_employee_bulk_import.py
+import pytest
+
+from app.models.department import Department
+from app.models.employee import Employee
+from app.schemas.employee_schema import EmployeeCreate
+from app.services.employee_service import bulk_create_employees
+from app.utils.security import PasswordHasherBusy, password_hasher
+
+
+def _new(email, **kwargs):
+    return EmployeeCreate(first_name="B", last_name="Ulk", email=email, password="pw123456", **kwargs)
+
+
+def _busy(passwords):
+    raise PasswordHasherBusy("Password hashing queue is full")
+
+
+def test_existing_email_matches_case_insensitively(db, monkeypatch):
+    monkeypatch.setattr(password_hasher, "hash_many", lambda passwords: ["hashed"] * len(passwords))
+    db.add(Employee(first_name="Sam", email="Sam@X.com", password="x"))
+    db.commit()
+
+    results = bulk_create_employees(db, [_new("sam@x.com"), _new("new@x.com")])
+
+    assert results[0] == (None, "Email already exists")
+    assert results[1][0] is not None and results[1][1] is None
+
+
+def test_busy_hasher_writes_nothing(db, monkeypatch):
+    monkeypatch.setattr(password_hasher, "hash_many", _busy)
+
+    with pytest.raises(PasswordHasherBusy):
+        bulk_create_employees(db, [_new("a@x.com", department_id=41, team_id=42)])
+    db.rollback()
+
+    assert db.query(Department).count() == 0
+    assert db.query(Employee).count() == 0
+
+
+def test_busy_hasher_returns_503(client, admin_headers, monkeypatch):
+    monkeypatch.setattr(password_hasher, "hash_many", _busy)
+    response = client.post(
+        "/employees/bulk",
+        json=[{"first_name": "B", "email": "b@x.com", "password": "pw123456"}],
+        headers=admin_headers,
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+
+
+def test_csv_rows_not_matching_the_header_are_rejected(client, admin_headers, monkeypatch):
+    monkeypatch.setattr(password_hasher, "hash_many", lambda passwords: ["hashed"] * len(passwords))
+    body = (
+        "first_name,last_name,email,password\n"
+        "Short,Row,short@x.com\n"
+        "Long,Row,long@x.com,pw123456,extra\n"
+        "Good,Row,good@x.com,pw123456\n"
+    )
+    response = client.post(
+        "/employees/bulk",
+        content=body,
+        headers={**admin_headers, "Content-Type": "text/csv"},
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["status"] for r in results] == ["error", "error", "created"]
+    assert "password" in results[0]["error"]
+    assert "more cell" in results[1]["error"]
+    assert response.json()["created"] == 1
@@ -0,0 +1,37 @@
+# tests/test_employee_collections.py
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.models.employee import Employee
+from app.models.screenshot import Screenshot
+
+
+def test_screenshot_pages_follow_the_cursor(client, admin_headers, db):
+    emp = Employee(first_name="S", email="shots@example.com", password="x")
+    db.add(emp)
+    db.flush()
+    # No timestamp given: the server default applies, so all three tie on it
+    db.add_all([Screenshot(employee_id=emp.id, image_path=f"uploads/screenshots/{n}.png") for n in range(3)])
+    db.commit()
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = client.get(f"/employees/{emp.id}/screenshots", params=params, headers=admin_headers)
+        assert response.status_code == 200
+        seen += [s["id"] for s in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert sorted(seen) == sorted(s.id for s in db.query(Screenshot).filter(Screenshot.employee_id == emp.id))
+    assert len(seen) == 3
+
+
+def test_screenshot_timestamp_cannot_be_null(db):
+    emp = Employee(first_name="S", email="null-shot@example.com", password="x")
+    db.add(emp)
+    db.flush()
+    db.add(Screenshot(employee_id=emp.id, image_path="uploads/screenshots/x.png", timestamp=None))
+    with pytest.raises(IntegrityError):
+        db.commit()
+    db.rollback()
@@ -0,0 +1,80 @@
+# tests/test_productivity_service.py
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.models.activity import Activity
+from app.models.activity_rollup import ActivityDailyRollup
+from app.models.employee import Employee
+from app.models.productivity import Productivity
+from app.services import productivity_service
+from app.services.admin_productivity_service import get_org_summary
+from app.services.productivity_service import calculate_employee_productivity, upsert_daily_productivity
+
+DAY = date(2026, 10, 2)
+
+
+def _employee(db, **kwargs):
+    emp = Employee(first_name="P", last_name="Test", email="p@example.com", password="x", **kwargs)
+    db.add(emp)
+    db.commit()
+    return emp
+
+
+def _activity(db, emp, productive, day=DAY):
+    db.add(Activity(employee_id=emp.id, activity_type="app", name="Game", productive=productive,
+                    timestamp=datetime.combine(day, datetime.min.time()).replace(hour=10)))
+    db.add(ActivityDailyRollup(employee_id=emp.id, day=day, activity_type="app",
+                               productive=productive or "", activity_count=1))
+    db.commit()
+
+
+@pytest.mark.parametrize("rollup_reads", [True, False])
+def test_all_unproductive_day_scores_zero(db, monkeypatch, rollup_reads):
+    monkeypatch.setattr(productivity_service, "ACTIVITY_ROLLUP_READS_ENABLED", rollup_reads)
+    emp = _employee(db)
+    _activity(db, emp, "No")
+
+    assert upsert_daily_productivity(db, DAY, DAY)["inserted"] == 1
+
+    row = db.query(Productivity).filter_by(employee_id=emp.id).one()
+    assert row.period == str(DAY)
+    assert row.score == 0
+
+
+def test_daily_rows_do_not_copy_lifetime_totals(db):
+    emp = _employee(db, productivity_score=87.5, tasks_completed=40)
+    _activity(db, emp, "Yes")
+
+    upsert_daily_productivity(db, DAY, DAY)
+    assert upsert_daily_productivity(db, DAY, DAY) == {"inserted": 0, "updated": 1, "written": 1}
+
+    row = db.query(Productivity).filter_by(employee_id=emp.id).one()
+    assert row.score == 100
+    assert row.average_score == 0
+    assert row.tasks_completed == 0
+
+
+@pytest.mark.parametrize("rollup_reads", [True, False])
+def test_my_productivity_scores_today_like_the_daily_rows(db, monkeypatch, rollup_reads):
+    monkeypatch.setattr(productivity_service, "ACTIVITY_ROLLUP_READS_ENABLED", rollup_reads)
+    monkeypatch.setattr("app.services.rollup_service.ACTIVITY_ROLLUP_READS_ENABLED", rollup_reads)
+    today = date.today()
+    emp = _employee(db)
+    _activity(db, emp, "Yes", today)
+    _activity(db, emp, "No", today - timedelta(days=1))
+
+    assert calculate_employee_productivity(db, emp.id).score == 100
+    upsert_daily_productivity(db, today, today)
+
+    row = db.query(Productivity).filter_by(employee_id=emp.id, period=str(today)).one()
+    assert row.score == 100
+
+
+def test_admin_summary_does_not_report_zeroed_task_totals(db):
+    emp = _employee(db)
+    _activity(db, emp, "Yes")
+    upsert_daily_productivity(db, DAY, DAY)
+
+    summary = get_org_summary(db, DAY, DAY)
+    assert summary == {"average_productivity_score": 100.0, "average_hours_logged": 0.0}
@@ -0,0 +1,87 @@
+# tests/test_query_plans.py
+"""
+Query-plan regression checks for the activity, attendance, leave and
+screenshot hot paths.
+
+The real queries are captured as they run and re-planned with SQLite's
+EXPLAIN QUERY PLAN: each must SEARCH its table through the composite
+index from migration 0001, never SCAN it, and never sort the result in
+a temporary B-tree when the index already provides the order. SQLite
+plans from the schema alone, so a query rewritten in a way no index can
+serve (a function around the column, a missing leading column) fails
+here the same way it would fall back to a sequential scan on PostgreSQL.
+"""
+import re
+from contextlib import contextmanager
+from datetime import date, datetime
+
+from sqlalchemy import event
+
+from app.core.database import engine
+from app.models.activity import Activity
+from app.services.analytics_service import aggregate_activity_counts, unproductive_counts
+
+
+@contextmanager
+def captured_selects():
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+
+def query_plan(statement, parameters):
+    with engine.connect() as conn:
+        return [row[3] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+
+
+def assert_index_search(statements, table, index, ordered=False):
+    reading = [s for s in statements if re.search(rf"\bFROM {table}\b", s[0])]
+    assert reading, f"no query on {table} was captured"
+    for statement, parameters in reading:
+        plan = query_plan(statement, parameters)
+        detail = "\n".join(plan)
+        assert any(line.startswith(f"SEARCH {table} USING") and index in line for line in plan), (
+            f"{table} is not searched through {index}:\n{detail}\n{statement}"
+        )
+        assert not any(line == f"SCAN {table}" or line.startswith(f"SCAN {table} ") for line in plan), detail
+        if ordered:
+            assert "USE TEMP B-TREE FOR ORDER BY" not in detail, detail
+
+
+def test_analytics_counts_use_scope_timestamp_indexes(db):
+    for column, index in [
+        (Activity.employee_id, "ix_activities_employee_id_timestamp"),
+        (Activity.team_id, "ix_activities_team_id_timestamp"),
+        (Activity.department_id, "ix_activities_department_id_timestamp"),
+    ]:
+        with captured_selects() as statements:
+            aggregate_activity_counts(db, column, 1, start="2026-10-01", end="2026-10-31", bucket="day")
+        assert_index_search(statements, "activities", index)
+
+
+def test_bottleneck_counts_use_employee_timestamp_index(db):
+    with captured_selects() as statements:
+        unproductive_counts(db, [1, 2], datetime(2026, 10, 1), datetime(2026, 11, 1))
+    assert_index_search(statements, "activities", "ix_activities_employee_id_timestamp")
+
+
+def test_attendance_and_leave_lookups_use_indexes(client, admin_headers):
+    with captured_selects() as statements:
+        client.get("/attendance/today", headers=admin_headers)
+        client.get("/attendance/summary?start_date=2026-10-01&end_date=2026-10-31", headers=admin_headers)
+    assert_index_search(statements, "attendance", "ix_attendance_employee_id_date", ordered=True)
+    assert_index_search(statements, "leaves", "ix_leaves_employee_id_start_date_end_date")
+
+
+def test_screenshot_page_uses_employee_timestamp_index(client, admin_headers):
+    with captured_selects() as statements:
+        client.get("/screenshots/1?page=2", headers=admin_headers)
+    assert_index_search(statements, "screenshots", "ix_screenshots_employee_id_timestamp", ordered=True)
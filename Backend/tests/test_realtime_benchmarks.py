@@ -0,0 +1,23 @@
+# tests/test_realtime_benchmarks.py
+"""Small runs of the benchmarks/ scripts, so they keep working as the code changes."""
+import asyncio
+
+import pytest
+
+from app.services.realtime_service import ENCODINGS
+from benchmarks import realtime_encoding, realtime_fanout
+
+
+@pytest.mark.parametrize("redis", [False, True])
+def test_fanout_reaches_every_socket(redis):
+    result = asyncio.run(realtime_fanout.run(sockets=200, rounds=3, redis=redis))
+    assert result["delivered"] == 600
+    assert result["delivery_ms_p99"] >= result["delivery_ms_p50"]
+
+
+def test_encoding_report_covers_every_frame_and_encoding():
+    results = realtime_encoding.run(subscribers=50, repeat=1)
+    assert set(results) == set(realtime_encoding.FRAMES)
+    for row in results.values():
+        for encoding in ENCODINGS:
+            assert row[f"shared_{encoding}_bytes"] <= row["json_bytes"]
@@ -0,0 +1,148 @@
+# tests/test_realtime_presence.py
+"""PresenceRegistry against fakeredis, one FakeServer standing in for the shared Redis."""
+import asyncio
+
+import pytest
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+
+from app.core.config import REALTIME_PRESENCE_TTL_SECONDS
+from app.routers import realtime_router
+from app.services import realtime_presence
+from app.services.realtime_presence import WORKERS_KEY, PresenceRegistry
+from app.utils.auth import create_access_token
+from app.utils.auth_cache import Principal, principal_cache
+
+
+def _principal(id, team_id=None, department_id=None, role="Employee"):
+    return Principal(id=id, email=f"e{id}@example.com", role=role, first_name="E", last_name=str(id),
+                     department_id=department_id, team_id=team_id, is_active=True)
+
+
+def _registry(server, worker_id):
+    return PresenceRegistry(FakeRedis(server=server), worker_id=worker_id)
+
+
+def test_online_merges_an_employee_connected_to_several_workers():
+    async def scenario():
+        server = FakeServer()
+        a, b = _registry(server, "a"), _registry(server, "b")
+        await a.connected(_principal(1))
+        await a.connected(_principal(1))
+        await b.connected(_principal(1))
+        await b.connected(_principal(2))
+        return await a.online(), await b.online()
+
+    seen_by_a, seen_by_b = asyncio.run(scenario())
+    assert seen_by_a == seen_by_b
+    assert [e["employee_id"] for e in seen_by_a] == [1, 2]
+    assert seen_by_a[0]["connections"] == 3
+    assert seen_by_a[0]["workers"] == {"a": 2, "b": 1}
+    assert seen_by_a[1]["workers"] == {"b": 1}
+
+
+def test_disconnect_removes_the_employee_once_their_last_socket_closes():
+    async def scenario():
+        registry = _registry(FakeServer(), "a")
+        await registry.connected(_principal(1))
+        await registry.connected(_principal(1))
+        await registry.disconnected(_principal(1))
+        still_online = await registry.online()
+        await registry.disconnected(_principal(1))
+        return still_online, await registry.online()
+
+    still_online, after = asyncio.run(scenario())
+    assert still_online[0]["connections"] == 1
+    assert after == []
+
+
+def test_heartbeat_rewrites_entries_and_refreshes_their_ttl():
+    async def scenario():
+        server = FakeServer()
+        registry = _registry(server, "a")
+        await registry.connected(_principal(1))
+        redis = FakeRedis(server=server)
+        await redis.delete(registry.key)  # as if the hash had expired
+        await registry.heartbeat()
+        return await redis.ttl(registry.key), await registry.online()
+
+    ttl, online = asyncio.run(scenario())
+    assert 0 < ttl <= REALTIME_PRESENCE_TTL_SECONDS
+    assert [e["employee_id"] for e in online] == [1]
+
+
+def test_workers_without_a_heartbeat_drop_out_after_the_ttl(monkeypatch):
+    async def scenario():
+        server = FakeServer()
+        alive, crashed = _registry(server, "alive"), _registry(server, "crashed")
+        await alive.connected(_principal(1))
+        await crashed.connected(_principal(2))
+
+        later = realtime_presence.time.time() + REALTIME_PRESENCE_TTL_SECONDS + 1
+        monkeypatch.setattr(realtime_presence.time, "time", lambda: later)
+        await alive.heartbeat()
+        online = await alive.online()
+        workers = await FakeRedis(server=server).zrange(WORKERS_KEY, 0, -1)
+        return online, workers
+
+    online, workers = asyncio.run(scenario())
+    assert [e["employee_id"] for e in online] == [1]
+    assert workers == [b"alive"]
+
+
+def test_stop_removes_the_worker():
+    async def scenario():
+        server = FakeServer()
+        a, b = _registry(server, "a"), _registry(server, "b")
+        await a.connected(_principal(1))
+        await b.connected(_principal(2))
+        await b.stop()
+        return await a.online()
+
+    assert [e["employee_id"] for e in asyncio.run(scenario())] == [1]
+
+
+@pytest.fixture
+def shared_presence(client, monkeypatch):
+    """Employees 1-4 online across two workers, served by GET /realtime/online."""
+    server = FakeServer()
+
+    async def connect():
+        a, b = _registry(server, "a"), _registry(server, "b")
+        await a.connected(_principal(1, team_id=10, department_id=100))
+        await a.connected(_principal(2, team_id=11, department_id=100))
+        await b.connected(_principal(3, team_id=20, department_id=200))
+        await b.connected(_principal(4))
+
+    asyncio.run(connect())
+    monkeypatch.setattr(realtime_router, "presence", _registry(server, "api"))
+    yield
+    principal_cache.clear()
+
+
+def _headers(principal):
+    principal_cache.set(principal.email, principal)
+    return {"Authorization": f"Bearer {create_access_token(principal.email, principal.role)}"}
+
+
+def _online_ids(client, principal):
+    response = client.get("/realtime/online", headers=_headers(principal))
+    assert response.status_code == 200
+    return [e["employee_id"] for e in response.json()]
+
+
+def test_admins_see_everyone_online(client, shared_presence):
+    assert _online_ids(client, _principal(90, role="Admin")) == [1, 2, 3, 4]
+
+
+def test_managers_see_their_team_and_department(client, shared_presence):
+    assert _online_ids(client, _principal(91, team_id=10, role="Manager")) == [1]
+    assert _online_ids(client, _principal(92, department_id=100, role="Manager")) == [1, 2]
+    assert _online_ids(client, _principal(93, team_id=20, department_id=100, role="Manager")) == [1, 2, 3]
+    # No team or department: nothing, not everyone without one
+    assert _online_ids(client, _principal(94, role="Manager")) == []
+
+
+def test_employees_cannot_list_who_is_online(client, shared_presence):
+    response = client.get("/realtime/online", headers=_headers(_principal(95)))
+    assert response.status_code == 403
@@ -0,0 +1,179 @@
+# tests/test_realtime_service.py
+import asyncio
+import time
+
+from app.services import realtime_service
+from app.services.realtime_service import ConnectionManager, IngestLimiter, TokenBucket, ingest_totals
+from app.utils.auth_cache import Principal
+
+ADMIN = Principal(id=1, email="a@example.com", role="Admin", first_name="A", last_name=None,
+                  department_id=None, team_id=None, is_active=True)
+
+
+class FakeSocket:
+    def __init__(self, fail: bool = False, delay: float = 0.0):
+        self.fail = fail
+        self.delay = delay
+        self.sent = []
+        self.close_code = None
+
+    async def send_text(self, payload):
+        if self.fail:
+            raise RuntimeError("connection reset")
+        await asyncio.sleep(self.delay)
+        self.sent.append(payload)
+
+    send_bytes = send_text
+
+    async def close(self, code: int = 1000):
+        self.close_code = code
+
+
+async def _deliver(socket, settle=0.1):
+    manager = ConnectionManager()
+    sub = manager.connect(socket, ADMIN, ["org"])
+    manager.publish({"type": "app", "name": "Slack"}, ["org"])
+    await asyncio.sleep(settle)
+    await manager.disconnect(sub)
+    return sub
+
+
+def test_failed_send_closes_socket_with_1011():
+    socket = FakeSocket(fail=True)
+    sub = asyncio.run(_deliver(socket))
+    assert sub.closed
+    assert socket.close_code == 1011
+
+
+def test_failed_subscriber_stops_receiving_before_disconnect():
+    async def scenario():
+        manager = ConnectionManager()
+        sub = manager.connect(FakeSocket(fail=True), ADMIN, ["org", "team:3"])
+        manager.publish({"type": "app"}, ["org"])
+        await asyncio.sleep(0.1)
+        # The receive loop has not ended yet, but nothing routes to the dead socket
+        assert manager.publish({"type": "app"}, ["org", "team:3"]) == 0
+        assert manager.local_topics == []
+        await manager.disconnect(sub)
+        assert manager.stats()["connections"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_send_timeout_closes_socket_with_1013(monkeypatch):
+    monkeypatch.setattr(realtime_service, "REALTIME_SEND_TIMEOUT_SECONDS", 0.05)
+    socket = FakeSocket(delay=1)
+    asyncio.run(_deliver(socket, settle=0.2))
+    assert socket.close_code == 1013
+
+
+def test_healthy_socket_stays_open():
+    socket = FakeSocket()
+    asyncio.run(_deliver(socket))
+    assert len(socket.sent) == 1
+    assert socket.close_code is None
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_passes_a_burst_then_refills_at_the_rate(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(realtime_service.time, "monotonic", clock)
+    bucket = TokenBucket(rate=2, burst=3)
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+    assert bucket.wait_time() == 0.5
+    clock.now += 0.25
+    assert bucket.wait_time() == 0.25
+    clock.now += 0.25
+    assert bucket.try_acquire() and not bucket.try_acquire()
+    clock.now += 60  # never more than the burst
+    assert sum(bucket.try_acquire() for _ in range(10)) == 3
+
+
+def test_token_bucket_without_a_rate_is_unlimited():
+    bucket = TokenBucket(rate=0, burst=1)
+    assert all(bucket.try_acquire() for _ in range(100))
+    assert bucket.wait_time() == 0.0
+
+
+class Recorder:
+    def __init__(self):
+        self.frames = []
+
+    async def __call__(self, frame, key):
+        self.frames.append(frame["n"])
+
+
+def test_limiter_forwards_a_burst_immediately():
+    async def scenario():
+        publish = Recorder()
+        limiter = IngestLimiter(publish, rate=0.001, burst=3)
+        for n in range(3):
+            await limiter.submit({"n": n}, f"k{n}")
+        forwarded = list(publish.frames)
+        await limiter.close()
+        return forwarded, limiter
+
+    forwarded, limiter = asyncio.run(scenario())
+    assert forwarded == [0, 1, 2]
+    assert limiter._flusher is None
+
+
+def test_limiter_keeps_the_latest_frame_per_key_over_the_limit():
+    async def scenario():
+        publish = Recorder()
+        limiter = IngestLimiter(publish, rate=50, burst=1)
+        before = dict(ingest_totals)
+        await limiter.submit({"n": 0}, "app")
+        await limiter.submit({"n": 1}, "app")
+        await limiter.submit({"n": 2}, "idle")
+        await limiter.submit({"n": 3}, "app")  # replaces 1, keeps its place ahead of "idle"
+        coalesced = ingest_totals["coalesced"] - before["coalesced"]
+        await asyncio.sleep(0.2)
+        await limiter.close()
+        return publish.frames, coalesced
+
+    frames, coalesced = asyncio.run(scenario())
+    assert frames == [0, 3, 2]
+    assert coalesced == 1
+
+
+def test_limiter_drops_the_oldest_key_beyond_max_pending():
+    async def scenario():
+        publish = Recorder()
+        limiter = IngestLimiter(publish, rate=50, burst=1, max_pending=2)
+        before = dict(ingest_totals)
+        for n in range(4):
+            await limiter.submit({"n": n}, f"k{n}")
+        dropped = ingest_totals["dropped"] - before["dropped"]
+        await asyncio.sleep(0.2)
+        await limiter.close()
+        return publish.frames, dropped
+
+    frames, dropped = asyncio.run(scenario())
+    assert frames == [0, 2, 3]
+    assert dropped == 1
+
+
+def test_limiter_never_lets_a_new_frame_overtake_queued_ones():
+    async def scenario():
+        publish = Recorder()
+        limiter = IngestLimiter(publish, rate=50, burst=1)
+        await limiter.submit({"n": 0}, "a")
+        await limiter.submit({"n": 1}, "b")
+        time.sleep(0.05)  # a token is free again, but the flusher has not run yet
+        await limiter.submit({"n": 2}, "c")
+        queued = list(publish.frames)
+        await asyncio.sleep(0.2)
+        await limiter.close()
+        return queued, publish.frames
+
+    queued, frames = asyncio.run(scenario())
+    assert queued == [0]
+    assert frames == [0, 1, 2]
@@ -0,0 +1,142 @@
+# tests/test_realtime_state.py
+import asyncio
+
+from app.services.realtime_service import ConnectionManager, Subscriber
+from app.services.realtime_state import STATE_CHANNEL, LiveState, LiveStateTable
+from app.utils.auth_cache import Principal
+
+MANAGER = Principal(id=50, email="m@example.com", role="Manager", first_name="M", last_name=None,
+                    department_id=None, team_id=3, is_active=True)
+
+
+def _employee(employee_id, team_id=3):
+    return {"employee_id": employee_id, "name": f"E{employee_id}", "team_id": team_id, "department_id": None}
+
+
+def _seen(minute):
+    return f"2030-01-01T09:{minute:02d}:00"
+
+
+class RecordingRedis:
+    def __init__(self):
+        self.published = []
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+
+
+def _queued(sub):
+    return [frame.data for frame in sub._queue.values()]
+
+
+def _subscriber(manager, topics):
+    sub = Subscriber(None, MANAGER)  # never started: frames stay queued for inspection
+    manager.subscribe(sub, topics)
+    return sub
+
+
+def test_apply_returns_only_changed_fields_and_chains_prev():
+    table = LiveStateTable()
+    first = table.apply(_employee(1), {"current_app": "Slack", "last_seen": _seen(0)})
+    assert first["seq"] == 1 and first["prev"] == 0
+    assert first["changes"] == {"name": "E1", "team_id": 3, "current_app": "Slack", "last_seen": _seen(0)}
+
+    table.apply(_employee(2), {"current_app": "Jira", "last_seen": _seen(0)})
+    second = table.apply(_employee(1), {"current_app": "Slack", "idle": True, "last_seen": _seen(1)})
+    assert second["seq"] == 3 and second["prev"] == 1
+    assert second["changes"] == {"idle": True, "last_seen": _seen(1)}
+
+
+def test_apply_ignores_no_op_and_older_updates():
+    table = LiveStateTable()
+    table.apply(_employee(1), {"current_app": "Slack", "last_seen": _seen(5)})
+    assert table.apply(_employee(1), {"current_app": "Slack"}) is None
+    assert table.apply(_employee(1), {"current_app": "Mail", "last_seen": _seen(4)}) is None
+    assert table.seq == 1
+
+
+def test_replay_is_limited_to_the_buffer_and_the_topics():
+    table = LiveStateTable(history=3)
+    for minute in range(5):
+        table.apply(_employee(minute % 2 + 1, team_id=minute % 2 + 3), {"last_seen": _seen(minute)})
+
+    # seqs 3-5 are buffered, so resuming from 2 onwards works
+    assert [d["seq"] for d in table.replay(2, ["org"])] == [3, 4, 5]
+    assert [d["seq"] for d in table.replay(2, ["team:3"])] == [3, 5]
+    assert table.replay(5, ["org"]) == []
+    assert table.replay(1, ["org"]) is None  # seq 2 fell out of the buffer
+    assert table.replay(6, ["org"]) is None  # ahead of this table
+
+
+def test_sync_resumes_with_the_missed_deltas():
+    manager = ConnectionManager()
+    live = LiveState(manager)
+    live.apply({"employee": _employee(1), "changes": {"current_app": "Slack"}})
+    live.apply({"employee": _employee(2, team_id=4), "changes": {"current_app": "Jira"}})
+    live.apply({"employee": _employee(1), "changes": {"current_app": "Mail"}})
+
+    sub = _subscriber(manager, ["team:3"])
+    live.sync(sub, since_seq=1, epoch=live.table.epoch)
+    frames = _queued(sub)
+    assert frames[0] == {"type": "state.resume", "epoch": live.table.epoch, "since_seq": 1, "seq": 3}
+    assert [f["seq"] for f in frames[1:]] == [3]
+    assert sub.topics == {"team:3", "state:team:3"}
+
+    # Later deltas reach it through the state topic
+    live.apply({"employee": _employee(1), "changes": {"current_app": "Zoom"}})
+    assert _queued(sub)[-1]["seq"] == 4
+
+
+def test_sync_falls_back_to_a_snapshot():
+    manager = ConnectionManager()
+    live = LiveState(manager, history=1)
+    live.apply({"employee": _employee(1), "changes": {"current_app": "Slack"}})
+    live.apply({"employee": _employee(2, team_id=4), "changes": {"current_app": "Jira"}})
+    live.apply({"employee": _employee(1), "changes": {"current_app": "Mail"}})
+
+    for since_seq, epoch in [(2, "another-worker"), (1, live.table.epoch), (None, None)]:
+        sub = _subscriber(manager, ["team:3"])
+        live.sync(sub, since_seq=since_seq, epoch=epoch)
+        (snapshot,) = _queued(sub)
+        assert snapshot["type"] == "state.snapshot" and snapshot["seq"] == 3
+        assert [(e["employee_id"], e["current_app"]) for e in snapshot["employees"]] == [(1, "Mail")]
+
+
+def test_sync_follows_subscription_changes():
+    manager = ConnectionManager()
+    live = LiveState(manager)
+    sub = _subscriber(manager, ["team:3", "team:4"])
+    live.sync(sub)
+    manager.unsubscribe(sub, ["team:4"])
+    live.sync(sub)
+    assert sub.topics == {"team:3", "state:team:3"}
+
+
+def test_a_late_worker_is_seeded_by_the_running_ones():
+    async def scenario():
+        running, late = LiveState(ConnectionManager()), LiveState(ConnectionManager())
+        running.client, late.client = RecordingRedis(), RecordingRedis()
+        running.apply({"employee": _employee(1), "changes": {"current_app": "Slack", "last_seen": _seen(0)}})
+        running.apply({"employee": _employee(2), "changes": {"current_app": "Jira", "last_seen": _seen(0)}})
+        # Updated on the late worker after it started: the older row must not win
+        late.apply({"employee": _employee(2), "changes": {"current_app": "Zoom", "last_seen": _seen(9)}})
+
+        dashboard = _subscriber(late.manager, ["team:3"])
+        late.sync(dashboard)
+
+        await late.request_rows()
+        (channel, request), = late.client.published
+        assert channel == STATE_CHANNEL
+        late.handle_redis(request.encode())  # its own request comes back too and is ignored
+        running.handle_redis(request.encode())
+        await asyncio.sleep(0)
+        (_, reply), = running.client.published
+        running.handle_redis(reply.encode())  # addressed to the late worker only
+        late.handle_redis(reply.encode())
+        return running, late, dashboard
+
+    running, late, dashboard = asyncio.run(scenario())
+    assert running.table.seq == 2
+    assert {r["employee_id"]: r["current_app"] for r in late.table.rows()} == {1: "Slack", 2: "Zoom"}
+    seeded = _queued(dashboard)[-1]
+    assert seeded["employee_id"] == 1 and seeded["changes"]["current_app"] == "Slack"
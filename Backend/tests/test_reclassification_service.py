@@ -0,0 +1,90 @@
+# tests/test_reclassification_service.py
+import threading
+import time
+from datetime import date, datetime
+
+import pytest
+
+from app.models.activity import Activity
+from app.models.employee import Employee
+from app.models.productivity import Productivity
+from app.services import reclassification_service
+from app.services.activity_classifier import ProductiveMatcher, classifier
+from app.services.reclassification_service import ReclassificationJob, resume_job
+from app.utils.response_cache import response_cache
+
+DAY = date(2026, 9, 14)
+
+
+def test_job_refreshes_productivity_and_invalidates_cache(db, monkeypatch):
+    monkeypatch.setattr(classifier, "_matcher", ProductiveMatcher([("slack", "app", True)]))
+    monkeypatch.setattr(classifier, "_loaded_at", time.monotonic())
+    emp = Employee(first_name="R", email="r@example.com", password="x")
+    db.add(emp)
+    db.commit()
+    for hour, name in [(9, "Slack"), (10, "Solitaire")]:
+        db.add(Activity(employee_id=emp.id, activity_type="app", name=name, productive="No",
+                        timestamp=datetime(DAY.year, DAY.month, DAY.day, hour)))
+    db.commit()
+    generation = response_cache._generations["productivity"]
+
+    job = ReclassificationJob(DAY, DAY, chunk_size=1)
+    reclassification_service._run(job)
+
+    assert job.status == "completed", job.error
+    assert job.updated == 1
+    row = db.query(Productivity).filter_by(employee_id=emp.id, period=str(DAY)).one()
+    assert row.score == 50
+    assert response_cache._generations["productivity"] > generation
+
+
+def test_concurrent_resumes_start_one_run(monkeypatch):
+    runs = []
+    release = threading.Event()
+
+    def fake_run(job):
+        runs.append(job.id)
+        release.wait(2)
+        job.status = "completed"
+
+    launch = reclassification_service._launch
+
+    def slow_launch(job):
+        time.sleep(0.05)  # widen the window between the status check and the launch
+        launch(job)
+
+    monkeypatch.setattr(reclassification_service, "_run", fake_run)
+    monkeypatch.setattr(reclassification_service, "_launch", slow_launch)
+    job = ReclassificationJob(DAY, DAY, chunk_size=10)
+    job.status = "failed"
+    monkeypatch.setitem(reclassification_service.jobs, job.id, job)
+
+    barrier = threading.Barrier(8)
+    outcomes = []
+
+    def resume():
+        barrier.wait()
+        try:
+            resume_job(job.id)
+            outcomes.append("resumed")
+        except ValueError:
+            outcomes.append("rejected")
+
+    threads = [threading.Thread(target=resume) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    release.set()
+    job._thread.join()
+
+    assert outcomes.count("resumed") == 1
+    assert runs == [job.id]
+
+
+def test_resume_rejects_running_job(monkeypatch):
+    job = ReclassificationJob(DAY, DAY, chunk_size=10)
+    job.status = "running"
+    monkeypatch.setitem(reclassification_service.jobs, job.id, job)
+    with pytest.raises(ValueError):
+        resume_job(job.id)
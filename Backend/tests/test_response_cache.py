@@ -0,0 +1,111 @@
+# tests/test_response_cache.py
+import asyncio
+
+import pytest
+
+from app.models.employee import Employee
+from app.utils.response_cache import ResponseCache, invalidate_on_commit, response_cache
+
+
+class SlowCompute:
+    def __init__(self, value, delay=0.05, error=None):
+        self.value = value
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+def test_concurrent_misses_share_one_computation():
+    async def scenario():
+        cache = ResponseCache(enabled=True, max_entries=10)
+        compute = SlowCompute({"n": 1})
+        values = await asyncio.gather(*(cache.get_or_compute("ns", "k", 30, compute) for _ in range(5)))
+        cached = await cache.get_or_compute("ns", "k", 30, compute)
+        return cache, compute, values, cached
+
+    cache, compute, values, cached = asyncio.run(scenario())
+    assert compute.calls == 1
+    assert values == [{"n": 1}] * 5 and cached == {"n": 1}
+    assert (cache.misses, cache.coalesced, cache.hits) == (1, 4, 1)
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    async def scenario():
+        cache = ResponseCache(enabled=True, max_entries=10)
+        failing = SlowCompute(None, error=RuntimeError("db down"))
+        results = await asyncio.gather(
+            *(cache.get_or_compute("ns", "k", 30, failing) for _ in range(3)), return_exceptions=True
+        )
+        return results, await cache.get_or_compute("ns", "k", 30, SlowCompute(2, delay=0))
+
+    results, retried = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert retried == 2
+
+
+def test_a_cancelled_leader_does_not_cancel_its_waiters():
+    async def scenario():
+        cache = ResponseCache(enabled=True, max_entries=10)
+        compute = SlowCompute("fresh", delay=0.1)
+        leader = asyncio.create_task(cache.get_or_compute("ns", "k", 30, compute))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(cache.get_or_compute("ns", "k", 30, compute)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return compute, await asyncio.gather(*waiters)
+
+    compute, values = asyncio.run(scenario())
+    assert values == ["fresh"] * 3
+    assert compute.calls == 2  # the leader's, then one shared by the waiters
+
+
+def test_invalidate_on_commit_waits_for_the_commit(db):
+    generation = response_cache._generations["test"]
+    db.query(Employee).count()  # in a transaction, as a writer would be
+    invalidate_on_commit(db, "test")
+    db.rollback()
+    db.commit()
+    assert response_cache._generations["test"] == generation
+
+    invalidate_on_commit(db, "test")
+    assert response_cache._generations["test"] == generation
+    db.commit()
+    assert response_cache._generations["test"] == generation + 1
+
+
+def _overall_score(client):
+    return client.get("/productivity/summary").json()["overall_score"]
+
+
+def test_summary_is_invalidated_by_employee_writes(client, admin_headers, db):
+    response_cache.invalidate("productivity")
+    admin = db.query(Employee).filter(Employee.email == "sam@example.com").one()
+    admin.productivity_score = 80.0
+    db.commit()
+    assert _overall_score(client) == 80.0
+
+    # An ORM update
+    admin.productivity_score = 60.0
+    db.commit()
+    assert _overall_score(client) == 60.0
+
+    # A new employee (score 0) through the API
+    response = client.post("/employees/", headers=admin_headers, json={
+        "first_name": "New", "email": "new@example.com", "password": "pw123456",
+    })
+    assert response.status_code == 201
+    assert _overall_score(client) == 30.0
+
+    # A bulk UPDATE statement
+    db.query(Employee).update({Employee.productivity_score: 90.0})
+    db.commit()
+    assert _overall_score(client) == 90.0